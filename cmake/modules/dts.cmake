@@ -17,7 +17,8 @@ find_package(Dtc 1.4.6)
 #
 #   - To other arbitrary Python scripts (like twister) using a
 #     serialized edtlib.EDT object in Python's pickle format
-#     (https://docs.python.org/3/library/pickle.html)
+#     (https://docs.python.org/3/library/pickle.html), and as a
+#     read-only snapshot which loads without edtlib (see edtsnapshot.py)
 #
 #   - To users as a final devicetree source (DTS) file which can
 #     be used for debugging
@@ -55,7 +56,7 @@ find_package(Dtc 1.4.6)
 #    - DTS_ROOT_BINDINGS is set to a ;-list of locations where DT
 #      bindings were found
 #    - ${PROJECT_BINARY_DIR}/zephyr.dts exists
-#    - ${PROJECT_BINARY_DIR}/edt.pickle exists
+#    - ${PROJECT_BINARY_DIR}/edt.pickle and edt.snapshot exist
 #    - ${KCONFIG_BINARY_DIR}/Kconfig.dts exists
 #    - the build system will be regenerated if any devicetree files
 #      used in this build change, including transitive includes
@@ -98,6 +99,8 @@ set(DT_SCRIPTS                  ${ZEPHYR_BASE}/scripts/dts)
 set(GEN_DEFINES_SCRIPT          ${DT_SCRIPTS}/gen_defines.py)
 # The edtlib.EDT object in pickle format.
 set(EDT_PICKLE                  ${PROJECT_BINARY_DIR}/edt.pickle)
+# Read-only snapshot of the edtlib.EDT object, see edtsnapshot.py.
+set(EDT_SNAPSHOT                ${PROJECT_BINARY_DIR}/edt.snapshot)
 # The generated file containing the final DTS, for debugging.
 set(ZEPHYR_DTS                  ${PROJECT_BINARY_DIR}/zephyr.dts)
 # The generated C header needed by <zephyr/devicetree.h>
@@ -248,13 +251,19 @@ set_property(DIRECTORY APPEND PROPERTY
 #
 
 string(REPLACE ";" " " EXTRA_DTC_FLAGS_RAW "${EXTRA_DTC_FLAGS}")
+# Index of the bindings in DTS_ROOT_BINDINGS, shared between builds
+# using the same bindings directories.
+string(MD5 DTS_BINDINGS_HASH "${DTS_ROOT_BINDINGS}")
+set(DTS_BINDING_CACHE ${USER_CACHE_DIR}/edt-bindings-${DTS_BINDINGS_HASH}.pickle)
 set(CMD_GEN_DEFINES ${PYTHON_EXECUTABLE} ${GEN_DEFINES_SCRIPT}
 --dts ${DTS_POST_CPP}
 --dtc-flags '${EXTRA_DTC_FLAGS_RAW}'
 --bindings-dirs ${DTS_ROOT_BINDINGS}
+--binding-cache ${DTS_BINDING_CACHE}
 --header-out ${DEVICETREE_GENERATED_H}.new
 --dts-out ${ZEPHYR_DTS}.new # for debugging and dtc
 --edt-pickle-out ${EDT_PICKLE}
+--edt-snapshot-out ${EDT_SNAPSHOT}
 ${EXTRA_GEN_DEFINES_ARGS}
 )
 
@@ -30,7 +30,7 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'python-devicetree',
                                 'src'))
 
-from devicetree import edtlib
+from devicetree import edtlib, edtsnapshot
 
 class LogFormatter(logging.Formatter):
     '''A log formatter that prints the level name in lower case,
@@ -63,7 +63,8 @@ def main():
                          default_prop_types=True,
                          infer_binding_for_paths=["/zephyr,user"],
                          werror=args.edtlib_Werror,
-                         vendor_prefixes=vendor_prefixes)
+                         vendor_prefixes=vendor_prefixes,
+                         binding_cache=args.binding_cache)
     except edtlib.EDTError as e:
         sys.exit(f"devicetree error: {e}")
 
@@ -145,6 +146,9 @@ def main():
     if args.edt_pickle_out:
         write_pickled_edt(edt, args.edt_pickle_out)
 
+    if args.edt_snapshot_out:
+        edtsnapshot.write_snapshot(edt, args.edt_snapshot_out)
+
 
 def setup_edtlib_logging():
     # The edtlib module emits logs using the standard 'logging' module.
@@ -194,9 +198,15 @@ def parse_args():
                              "as a debugging aid)")
     parser.add_argument("--edt-pickle-out",
                         help="path to write pickled edtlib.EDT object to")
+    parser.add_argument("--edt-snapshot-out",
+                        help="path to write an edtsnapshot file to, which "
+                             "loads faster than the pickled edtlib.EDT")
     parser.add_argument("--vendor-prefixes", action='append', default=[],
                         help="vendor-prefixes.txt path; used for validation; "
                              "may be given multiple times")
+    parser.add_argument("--binding-cache",
+                        help="path to a binding index file, shared between "
+                             "builds to avoid parsing all bindings each time")
     parser.add_argument("--edtlib-Werror", action="store_true",
                         help="if set, edtlib-specific warnings become errors. "
                              "(this does not apply to warnings shared "
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure dtlib parsing of the preprocessed board devicetrees in boards/.
+
+Every boards/<arch>/<board>/*.dts file is run through the C preprocessor the
+way dts.cmake does it (once, the results are kept in --cache-dir if given),
+then each preprocessed file is parsed with dtlib.DT() --runs times. The
+total and slowest parse times are printed, and the lexer alone is measured
+by reading all tokens of each file. With --dump, the str() of every parsed
+devicetree is written to a directory, so the output of different dtlib
+versions can be compared with 'diff -r'.
+
+    python3 bench_dtlib_parse.py --cache-dir /tmp/dts-pre --dump /tmp/dts-out
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from devicetree import dtlib
+
+
+def preprocess(cpp, dts_file, out_file):
+    """Runs the C preprocessor like zephyr_dt_preprocess(), True on success."""
+    arch = os.path.relpath(dts_file, os.path.join(ZEPHYR_BASE, "boards")).split(os.sep)[0]
+    include_opts = []
+    for dts_root in [os.path.dirname(dts_file), ZEPHYR_BASE]:
+        for path in ["include", "include/zephyr", "dts/common", f"dts/{arch}", "dts"]:
+            full_path = os.path.join(dts_root, path)
+            if os.path.isdir(full_path):
+                include_opts += ["-isystem", full_path]
+    ret = subprocess.run(
+        [cpp, "-x", "assembler-with-cpp", "-nostdinc", *include_opts,
+         "-include", dts_file, "-undef", "-D__DTS__", "-E", "-o", out_file,
+         os.path.join(ZEPHYR_BASE, "misc/empty_file.c")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return ret.returncode == 0
+
+
+def preprocess_boards(cpp, cache_dir, boards):
+    """
+    Preprocesses the devicetrees of the board directories matching the glob
+    'boards' into cache_dir, reusing files preprocessed earlier. Returns the
+    number of devicetrees found and a dict mapping the names of the ones that
+    could be preprocessed to their output files.
+    """
+    dts_files = sorted(glob.glob(os.path.join(ZEPHYR_BASE, "boards", boards, "*.dts")))
+    jobs = {}
+    for dts_file in dts_files:
+        name = os.path.splitext(os.path.basename(dts_file))[0]
+        pre_file = os.path.join(cache_dir, f"{name}.dts.pre")
+        if os.path.exists(pre_file):
+            jobs[name] = pre_file
+        else:
+            jobs[name] = (dts_file, pre_file)
+
+    def run_cpp(item):
+        name, job = item
+        if isinstance(job, str) or preprocess(cpp, *job):
+            return name, job if isinstance(job, str) else job[1]
+        return name, None
+
+    with ThreadPoolExecutor() as executor:
+        pre_files = {name: pre_file
+                     for name, pre_file in executor.map(run_cpp, jobs.items())
+                     if pre_file}
+    return len(dts_files), pre_files
+
+
+def lex(path):
+    """Reads all tokens of 'path' with the dtlib lexer, returns the count."""
+    dt = dtlib.DT(None)
+    dt.filename = path
+    with open(path, encoding="utf-8") as f:
+        dt._file_contents = f.read()
+    dt._tok_i = dt._tok_end_i = 0
+    dt._filestack = []
+    dt._lexer_state = dtlib._DEFAULT
+    dt._saved_token = None
+    dt._lineno = 1
+    count = 0
+    while dt._next_token().id not in (dtlib._T.EOF, dtlib._T.BAD):
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--cpp", default="cpp",
+                        help="C preprocessor (default: cpp)")
+    parser.add_argument("--cache-dir",
+                        help="Directory for the preprocessed files, reused "
+                        "by later runs (default: a temporary directory)")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Number of times each file is parsed")
+    parser.add_argument("--dump", metavar="DIR",
+                        help="Write str() of each parsed devicetree to DIR")
+    parser.add_argument("--boards", default="*/*",
+                        help="Glob below boards/ selecting board directories "
+                        "(default: */*)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-dtlib-") as tmp:
+        cache_dir = args.cache_dir or tmp
+        os.makedirs(cache_dir, exist_ok=True)
+
+        num_dts, pre_files = preprocess_boards(args.cpp, cache_dir, args.boards)
+        size = sum(os.path.getsize(path) for path in pre_files.values())
+        print(f"{len(pre_files)} of {num_dts} devicetrees preprocessed, "
+              f"{size / 1024 / 1024:.1f} MiB")
+
+        lex_time = 0.0
+        tokens = 0
+        for path in pre_files.values():
+            start = time.perf_counter()
+            tokens += lex(path)
+            lex_time += time.perf_counter() - start
+        print(f"  lex: {lex_time:.3f}s ({tokens} tokens)")
+
+        parse_times = {}
+        failed = 0
+        for name, path in sorted(pre_files.items()):
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                try:
+                    dt = dtlib.DT(path, include_path=[])
+                except dtlib.DTError:
+                    failed += 1
+                    break
+                elapsed = time.perf_counter() - start
+                parse_times[name] = min(parse_times.get(name, elapsed), elapsed)
+            else:
+                if args.dump:
+                    os.makedirs(args.dump, exist_ok=True)
+                    with open(os.path.join(args.dump, f"{name}.dts"), "w",
+                              encoding="utf-8") as f:
+                        f.write(str(dt))
+
+        slowest = max(parse_times, key=parse_times.get)
+        print(f"parse: {sum(parse_times.values()):.3f}s "
+              f"({len(parse_times)} devicetrees, {failed} failed), "
+              f"slowest {slowest} {parse_times[slowest] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
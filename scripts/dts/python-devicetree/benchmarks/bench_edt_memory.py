@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure the memory used by edtlib.EDT objects for the boards in boards/.
+
+The board devicetrees are preprocessed like in bench_dtlib_parse.py, then an
+EDT is built for each of them and all EDTs are kept alive at once, like doc
+builds and multi-board tools do. The growth of the process RSS and the
+number of devicetree nodes and properties are printed. With --tracemalloc,
+the size of the memory blocks allocated while building the EDTs is printed
+too, which is more precise but much slower.
+
+    python3 bench_edt_memory.py --cache-dir /tmp/dts-pre
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_dtlib_parse import ZEPHYR_BASE, preprocess_boards
+
+from devicetree import dtlib, edtlib
+
+
+def rss():
+    """Returns the resident set size of this process in bytes."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--cpp", default="cpp",
+                        help="C preprocessor (default: cpp)")
+    parser.add_argument("--cache-dir",
+                        help="Directory for the preprocessed files and the "
+                        "binding index, reused by later runs (default: a "
+                        "temporary directory)")
+    parser.add_argument("--boards", default="*/*",
+                        help="Glob below boards/ selecting board directories "
+                        "(default: */*)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also measure allocations with tracemalloc")
+    args = parser.parse_args()
+
+    # Board devicetree warnings aren't of interest here
+    logging.getLogger("devicetree.edtlib").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(prefix="bench-edt-memory-") as tmp:
+        cache_dir = args.cache_dir or tmp
+        os.makedirs(cache_dir, exist_ok=True)
+        num_dts, pre_files = preprocess_boards(args.cpp, cache_dir, args.boards)
+        bindings_dirs = [os.path.join(ZEPHYR_BASE, "dts/bindings")]
+        binding_cache = os.path.join(cache_dir, "edt-bindings.pickle")
+
+        # Warm up the binding index and the imports, so that they don't count
+        edtlib.EDT(next(iter(pre_files.values())), bindings_dirs,
+                   binding_cache=binding_cache)
+
+        edts = []
+        failed = 0
+        gc.collect()
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_before = rss()
+        start = time.perf_counter()
+        for name, path in sorted(pre_files.items()):
+            try:
+                edts.append(edtlib.EDT(path, bindings_dirs,
+                                       binding_cache=binding_cache))
+            except (dtlib.DTError, edtlib.EDTError):
+                failed += 1
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        rss_growth = rss() - rss_before
+        if args.tracemalloc:
+            traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+    nodes = sum(len(edt.nodes) for edt in edts)
+    props = sum(len(node.props) for edt in edts for node in edt.nodes)
+    dt_props = sum(len(node._node.props) for edt in edts for node in edt.nodes)
+    print(f"{len(edts)} EDTs of {num_dts} devicetrees ({failed} failed) built "
+          f"in {elapsed:.1f}s: {nodes} nodes, {props} edtlib and {dt_props} "
+          f"dtlib properties")
+    print(f"RSS growth: {rss_growth / 2**20:.1f} MiB, "
+          f"{rss_growth / len(edts) / 1024:.0f} KiB per EDT")
+    if args.tracemalloc:
+        print(f"tracemalloc: {traced / 2**20:.1f} MiB, "
+              f"{traced / len(edts) / 1024:.0f} KiB per EDT")
+
+
+if __name__ == "__main__":
+    main()
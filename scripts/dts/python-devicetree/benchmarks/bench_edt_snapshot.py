@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Compare loading edt.pickle with loading edt.snapshot.
+
+An EDT is either built from a preprocessed DTS file (--dts, --bindings-dirs)
+or taken from a build directory (--build-dir, with zephyr/edt.pickle). It is
+written as a pickle and as a snapshot, and each file is loaded --runs times
+in a fresh Python process, including the module imports. After loading, the
+queries used by twister filters are run: compat2okay for every compatible,
+the aliases and status of every node, the chosen nodes and the labels. With
+--props, the properties of every node are read as well, like Kconfig
+functions do for the nodes they look up. Load time, query time and peak RSS
+of the process are printed per format.
+
+    python3 bench_edt_snapshot.py --build-dir build/nrf52840dk
+"""
+
+import argparse
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+DEVICETREE_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, DEVICETREE_SRC)
+
+
+# Run in a fresh process per load, importing only what the format needs.
+# Prints load time, query time and peak RSS in kilobytes. ru_maxrss would
+# include the RSS of this process, as it is kept across exec on Linux, so
+# VmHWM is used instead.
+CHILD = """
+import sys, time
+fmt, path, props = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+start = time.perf_counter()
+if fmt == "pickle":
+    import pickle
+    with open(path, "rb") as f:
+        edt = pickle.load(f)
+else:
+    from devicetree import edtsnapshot
+    edt = edtsnapshot.load_snapshot(path)
+loaded = time.perf_counter()
+for compat in list(edt.compat2nodes):
+    edt.compat2okay.get(compat)
+for node in edt.nodes:
+    node.aliases, node.status, node.parent
+    if props:
+        node.props, node.regs
+for name in list(edt.chosen_nodes):
+    edt.chosen_node(name)
+for label in edt.label2node:
+    edt.label2node.get(label).status
+queried = time.perf_counter()
+with open("/proc/self/status") as f:
+    rss = next(line.split()[1] for line in f if line.startswith("VmHWM:"))
+print(loaded - start, queried - loaded, rss)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--dts", help="Preprocessed DTS file")
+    parser.add_argument("--bindings-dirs", nargs="+",
+                        default=[os.path.join(ZEPHYR_BASE, "dts/bindings")],
+                        help="Bindings directories for --dts")
+    parser.add_argument("--build-dir",
+                        help="Zephyr build directory with zephyr/edt.pickle")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="Number of processes started per format")
+    parser.add_argument("--props", action="store_true",
+                        help="Also read the properties of every node")
+    args = parser.parse_args()
+
+    from devicetree import edtlib, edtsnapshot
+
+    if args.build_dir:
+        with open(os.path.join(args.build_dir, "zephyr", "edt.pickle"), "rb") as f:
+            edt = pickle.load(f)
+    elif args.dts:
+        edt = edtlib.EDT(args.dts, args.bindings_dirs)
+    else:
+        parser.error("one of --dts or --build-dir is required")
+
+    with tempfile.TemporaryDirectory(prefix="bench-edt-") as tmp:
+        files = {
+            "pickle": os.path.join(tmp, "edt.pickle"),
+            "snapshot": os.path.join(tmp, "edt.snapshot"),
+        }
+        with open(files["pickle"], "wb") as f:
+            pickle.dump(edt, f, protocol=4)
+        edtsnapshot.write_snapshot(edt, files["snapshot"])
+
+        print(f"{len(edt.nodes)} nodes")
+        env = dict(os.environ, PYTHONPATH=DEVICETREE_SRC)
+        for fmt, path in files.items():
+            command = [sys.executable, "-c", CHILD, fmt, path,
+                       "1" if args.props else "0"]
+            loads, queries, rss = [], [], []
+            for _ in range(args.runs):
+                out = subprocess.run(command, env=env, check=True,
+                                     stdout=subprocess.PIPE, text=True).stdout
+                load_time, query_time, max_rss = out.split()
+                loads.append(float(load_time) * 1000)
+                queries.append(float(query_time) * 1000)
+                rss.append(int(max_rss) / 1024)
+            print(f"{fmt:>8}: {os.path.getsize(path) / 1024:.0f} KiB, "
+                  f"load {statistics.median(loads):.1f} ms, "
+                  f"queries {statistics.median(queries):.1f} ms, "
+                  f"max RSS {statistics.median(rss):.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -80,6 +80,12 @@ class Node:
       The DT instance this node belongs to.
     """
 
+    # Devicetrees have many nodes and properties, and tools keep many
+    # devicetrees around at once. Slots make each instance a lot smaller than
+    # a __dict__. Remember to update this list if you add an attribute.
+    __slots__ = ("_name", "props", "nodes", "labels", "parent", "dt",
+                 "_omit_if_no_ref", "_is_referenced")
+
     #
     # Public interface
     #
@@ -290,6 +296,10 @@ class Property:
       The Node the property is on.
     """
 
+    # See Node.__slots__
+    __slots__ = ("name", "value", "labels", "offset_labels", "node",
+                 "_label_offset_lst", "_markers")
+
     #
     # Public interface
     #
@@ -637,10 +647,11 @@ class Property:
         if marker_type is _MarkerType.PHANDLE:
             self.value += b"\0\0\0\0"
 
-class _T(enum.IntEnum):
-    # Token IDs used by the DT lexer.
+class _T:
+    # Token IDs used by the DT lexer. These are plain ints rather than an
+    # enum.IntEnum, as token IDs are looked up and compared for every token,
+    # and enum member lookups are slow.
 
-    # These values must be contiguous and start from 1.
     INCLUDE = 1
     LINE = 2
     STRING = 3
@@ -655,15 +666,12 @@ class _T(enum.IntEnum):
     CHAR_LITERAL = 12
     REF = 13
     INCBIN = 14
-    SKIP = 15
-    EOF = 16
-
-    # These values must be larger than the above contiguous range.
-    NUM = 17
-    PROPNODENAME = 18
-    MISC = 19
-    BYTE = 20
-    BAD = 21
+    EOF = 15
+    NUM = 16
+    PROPNODENAME = 17
+    MISC = 18
+    BYTE = 19
+    BAD = 20
 
 class _FileStackElt(NamedTuple):
     # Used for maintaining the /include/ stack.
@@ -680,7 +688,8 @@ class _Token(NamedTuple):
     val: _TokVal
 
     def __repr__(self):
-        id_repr = _T(self.id).name
+        id_repr = next(name for name, val in vars(_T).items()
+                       if val == self.id)
         return f'Token(id=_T.{id_repr}, val={repr(self.val)})'
 
 class DT:
@@ -1545,64 +1554,50 @@ class DT:
             return tmp
 
         while True:
-            tok_id = None
-
-            match = _token_re.match(self._file_contents, self._tok_end_i)
-            if match:
-                tok_id = match.lastindex
-                if tok_id == _T.CHAR_LITERAL:
-                    val = self._unescape(match.group(tok_id).encode("utf-8"))
-                    if len(val) != 1:
-                        self._parse_error("character literals must be length 1")
-                    tok_val = ord(val)
-                else:
-                    tok_val = match.group(tok_id)
-
-            elif self._lexer_state is _DEFAULT:
-                match = _num_re.match(self._file_contents, self._tok_end_i)
-                if match:
-                    tok_id = _T.NUM
-                    num_s = match.group(1)
-                    tok_val = int(num_s,
-                                  16 if num_s.startswith(("0x", "0X")) else
-                                  8 if num_s[0] == "0" else
-                                  10)
-
-            elif self._lexer_state is _EXPECT_PROPNODENAME:
-                match = _propnodename_re.match(self._file_contents,
-                                               self._tok_end_i)
-                if match:
-                    tok_id = _T.PROPNODENAME
-                    tok_val = match.group(1)
-                    self._lexer_state = _DEFAULT
-
-            else:  # self._lexer_state is _EXPECT_BYTE
-                match = _byte_re.match(self._file_contents, self._tok_end_i)
-                if match:
-                    tok_id = _T.BYTE
-                    tok_val = int(match.group(), 16)
-
-            if not tok_id:
-                match = _misc_re.match(self._file_contents, self._tok_end_i)
-                if match:
-                    tok_id = _T.MISC
-                    tok_val = match.group()
-                else:
-                    self._tok_i = self._tok_end_i
-                    # Could get here due to a node/property naming appearing in
-                    # an unexpected context as well as for bad characters in
-                    # files. Generate a token for it so that the error can
-                    # trickle up to some context where we can give a more
-                    # helpful error message.
-                    return _Token(_T.BAD, "<unknown token>")
-
-            self._tok_i = match.start()
+            token_re, token_ids = _token_res[self._lexer_state]
+            match = token_re.match(self._file_contents, self._tok_end_i)
+            if not match:
+                # Skip whitespace and comments up to the bad token, so that
+                # the error points at it
+                match = _skip_re.match(self._file_contents, self._tok_end_i)
+                self._lineno += match.group().count("\n")
+                self._tok_i = self._tok_end_i = match.end()
+                # Could get here due to a node/property naming appearing in
+                # an unexpected context as well as for bad characters in
+                # files. Generate a token for it so that the error can
+                # trickle up to some context where we can give a more
+                # helpful error message.
+                return _Token(_T.BAD, "<unknown token>")
+
+            # Group 1 holds the whitespace and comments before the token.
+            # Errors while converting the token value point at the last of
+            # them, or at the previous token if there are none.
+            skip_start, tok_start = match.span(1)
+            if skip_start != tok_start:
+                self._tok_i = match.start(2)
+                self._lineno += self._file_contents.count(
+                    "\n", skip_start, tok_start)
+
+            tok_id = token_ids[match.lastindex]
+            tok_val = match.group(match.lastindex)
+            if tok_id == _T.NUM:
+                tok_val = int(tok_val,
+                              16 if tok_val.startswith(("0x", "0X")) else
+                              8 if tok_val[0] == "0" else
+                              10)
+            elif tok_id == _T.PROPNODENAME:
+                self._lexer_state = _DEFAULT
+            elif tok_id == _T.BYTE:
+                tok_val = int(tok_val, 16)
+            elif tok_id == _T.CHAR_LITERAL:
+                val = self._unescape(tok_val.encode("utf-8"))
+                if len(val) != 1:
+                    self._parse_error("character literals must be length 1")
+                tok_val = ord(val)
+
+            self._tok_i = tok_start
             self._tok_end_i = match.end()
 
-            if tok_id == _T.SKIP:
-                self._lineno += tok_val.count("\n")
-                continue
-
             # /include/ is handled in the lexer in the C tools as well, and can
             # appear anywhere
             if tok_id == _T.INCLUDE:
@@ -2104,69 +2099,95 @@ _DEFAULT = 0
 _EXPECT_PROPNODENAME = 1
 _EXPECT_BYTE = 2
 
-_num_re = re.compile(r"(0[xX][0-9a-fA-F]+|[0-9]+)(?:ULL|UL|LL|U|L)?")
-
-# A leading \ is allowed property and node names, probably to allow weird node
-# names that would clash with other stuff
-_propnodename_re = re.compile(r"\\?([a-zA-Z0-9,._+*#?@-]+)")
-
 # Node names are more restrictive than property names.
 _nodename_chars = set(string.ascii_letters + string.digits + ',._+-@')
 
-# Misc. tokens that are tried after a property/node name. This is important, as
-# there's overlap with the allowed characters in names.
-_misc_re = re.compile(
-    "|".join(re.escape(pat) for pat in (
-        "==", "!=", "!", "=", ",", ";", "+", "-", "*", "/", "%", "~", "?", ":",
-        "^", "(", ")", "{", "}", "[", "]", "<<", "<=", "<", ">>", ">=", ">",
-        "||", "|", "&&", "&")))
-
-_byte_re = re.compile(r"[0-9a-fA-F]{2}")
-
 # Matches a backslash escape within a 'bytes' array. Captures the 'c' part of
 # '\c', where c might be a single character or an octal/hex escape.
 _unescape_re = re.compile(br'\\([0-7]{1,3}|x[0-9A-Fa-f]{1,2}|.)')
 
+# Whitespace, a C comment, or a C++ comment. MULTILINE is needed for C++
+# comments.
+_skip_pattern = r"(\s+|/\*(?:.|\n)*?\*/|//.*$)"
+_skip_re = re.compile(_skip_pattern + "*", re.MULTILINE | re.ASCII)
+
 def _init_tokens():
-    # Builds a (<token 1>)|(<token 2>)|... regex and returns it. The
-    # way this is constructed makes the token's value as an int appear
-    # in match.lastindex after a match.
-
-    # Each pattern must have exactly one capturing group, which can capture any
-    # part of the pattern. This makes match.lastindex match the token type.
-    # _Token.val is based on the captured string.
-    token_spec = {
-        _T.INCLUDE: r'(/include/\s*"(?:[^\\"]|\\.)*")',
+    # Builds one regex per lexer state, of the form
+    #
+    #   <skip>(?:(<token 1>)|(<token 2>)|...)
+    #
+    # and returns a list of (regex, token IDs) tuples indexed by lexer state.
+    # The tokens are tried in order, and a single match() returns the next
+    # token along with the whitespace and comments before it, instead of
+    # trying several regexes and looping over skipped text.
+    #
+    # <skip> is any number of _skip_pattern, wrapped as (?=(...))\1.
+    # Lookaheads never backtrack, so this makes it atomic: a comment can't be
+    # partly backtracked into to match e.g. a '/' token after it. Group 1 is
+    # all the skipped text and group 2 the last whitespace or comment in it.
+    #
+    # Each token pattern must have exactly one capturing group, which can
+    # capture any part of the pattern. _Token.val is based on the captured
+    # string. The token IDs tuple maps match.lastindex to the token type.
+
+    # Tokens tried first in all lexer states
+    token_spec = [
+        (_T.INCLUDE, r'(/include/\s*"(?:[^\\"]|\\.)*")'),
         # #line directive or GCC linemarker
-        _T.LINE:
-        r'^#(?:line)?[ \t]+([0-9]+[ \t]+"(?:[^\\"]|\\.)*")(?:[ \t]+[0-9]+){0,4}',
-
-        _T.STRING: r'"((?:[^\\"]|\\.)*)"',
-        _T.DTS_V1: r"(/dts-v1/)",
-        _T.PLUGIN: r"(/plugin/)",
-        _T.MEMRESERVE: r"(/memreserve/)",
-        _T.BITS: r"(/bits/)",
-        _T.DEL_PROP: r"(/delete-property/)",
-        _T.DEL_NODE: r"(/delete-node/)",
-        _T.OMIT_IF_NO_REF: r"(/omit-if-no-ref/)",
-        _T.LABEL: r"([a-zA-Z_][a-zA-Z0-9_]*):",
-        _T.CHAR_LITERAL: r"'((?:[^\\']|\\.)*)'",
-        _T.REF: r"&([a-zA-Z_][a-zA-Z0-9_]*|{[a-zA-Z0-9,._+*#?@/-]*})",
-        _T.INCBIN: r"(/incbin/)",
-        # Whitespace, C comments, and C++ comments
-        _T.SKIP: r"(\s+|(?:/\*(?:.|\n)*?\*/)|//.*$)",
+        (_T.LINE,
+         r'^#(?:line)?[ \t]+([0-9]+[ \t]+"(?:[^\\"]|\\.)*")(?:[ \t]+[0-9]+){0,4}'),
+
+        (_T.STRING, r'"((?:[^\\"]|\\.)*)"'),
+        (_T.DTS_V1, r"(/dts-v1/)"),
+        (_T.PLUGIN, r"(/plugin/)"),
+        (_T.MEMRESERVE, r"(/memreserve/)"),
+        (_T.BITS, r"(/bits/)"),
+        (_T.DEL_PROP, r"(/delete-property/)"),
+        (_T.DEL_NODE, r"(/delete-node/)"),
+        (_T.OMIT_IF_NO_REF, r"(/omit-if-no-ref/)"),
+        (_T.LABEL, r"([a-zA-Z_][a-zA-Z0-9_]*):"),
+        (_T.CHAR_LITERAL, r"'((?:[^\\']|\\.)*)'"),
+        (_T.REF, r"&([a-zA-Z_][a-zA-Z0-9_]*|{[a-zA-Z0-9,._+*#?@/-]*})"),
+        (_T.INCBIN, r"(/incbin/)"),
         # Return a token for end-of-file so that the parsing code can
         # always assume that there are more tokens when looking
         # ahead. This simplifies things.
-        _T.EOF: r"(\Z)",
+        (_T.EOF, r"(\Z)"),
+    ]
+
+    # Tokens tried next, depending on the lexer state
+    state_spec = {
+        _DEFAULT:
+        (_T.NUM, r"(0[xX][0-9a-fA-F]+|[0-9]+)(?:ULL|UL|LL|U|L)?"),
+        # A leading \ is allowed property and node names, probably to allow
+        # weird node names that would clash with other stuff
+        _EXPECT_PROPNODENAME:
+        (_T.PROPNODENAME, r"\\?([a-zA-Z0-9,._+*#?@-]+)"),
+        _EXPECT_BYTE:
+        (_T.BYTE, r"([0-9a-fA-F]{2})"),
     }
 
-    # MULTILINE is needed for C++ comments and #line directives
-    return re.compile("|".join(token_spec[tok_id] for tok_id in
-                               range(1, _T.EOF + 1)),
-                      re.MULTILINE | re.ASCII)
-
-_token_re = _init_tokens()
+    # Misc. tokens that are tried last, after a property/node name. This is
+    # important, as there's overlap with the allowed characters in names.
+    misc_spec = (_T.MISC, "(" + "|".join(re.escape(pat) for pat in (
+        "==", "!=", "!", "=", ",", ";", "+", "-", "*", "/", "%", "~", "?", ":",
+        "^", "(", ")", "{", "}", "[", "]", "<<", "<=", "<", ">>", ">=", ">",
+        "||", "|", "&&", "&")) + ")")
+
+    token_res = []
+    for state in (_DEFAULT, _EXPECT_PROPNODENAME, _EXPECT_BYTE):
+        spec = token_spec + [state_spec[state], misc_spec]
+        # MULTILINE is needed for C++ comments and #line directives
+        token_re = re.compile(
+            f"(?=({_skip_pattern}*))\\1(?:" +
+            "|".join(pattern for _, pattern in spec) + ")",
+            re.MULTILINE | re.ASCII)
+        token_res.append((token_re,
+                          (None, None, None) + tuple(tok_id for tok_id, _ in spec)))
+
+    return token_res
+
+_token_res = _init_tokens()
 
 _TYPE_TO_N_BYTES = {
     _MarkerType.UINT8: 1,
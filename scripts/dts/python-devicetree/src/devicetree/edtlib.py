@@ -74,6 +74,7 @@ from typing import Any, Callable, Dict, Iterable, List, NoReturn, \
     Optional, Set, TYPE_CHECKING, Tuple, Union
 import logging
 import os
+import pickle
 import re
 
 import yaml
@@ -163,7 +164,8 @@ class Binding:
 
     def __init__(self, path: Optional[str], fname2path: Dict[str, str],
                  raw: Any = None, require_compatible: bool = True,
-                 require_description: bool = True):
+                 require_description: bool = True,
+                 include_cache: Optional[Dict[str, dict]] = None):
         """
         Binding constructor.
 
@@ -191,9 +193,18 @@ class Binding:
           "description:" line. If False, a missing "description:" is
           not an error. Either way, "description:" must be a string
           if it is present in the binding.
+
+        include_cache:
+          Optional dict used to cache the contents of included files,
+          after merging their own includes. It may be shared by Binding
+          objects created with the same 'fname2path', so that each
+          included file is read and merged only once. Cached contents are
+          copied before they are merged into a binding.
         """
         self.path: Optional[str] = path
         self._fname2path: Dict[str, str] = fname2path
+        self._include_cache: Dict[str, dict] = \
+            {} if include_cache is None else include_cache
 
         if raw is None:
             if path is None:
@@ -217,7 +228,8 @@ class Binding:
                 path, fname2path,
                 raw=raw["child-binding"],
                 require_compatible=False,
-                require_description=False)
+                require_description=False,
+                include_cache=self._include_cache)
         else:
             self.child_binding = None
 
@@ -233,6 +245,10 @@ class Binding:
             if key.endswith("-cells"):
                 self.specifier2cells[key[:-len("-cells")]] = val
 
+        # The include cache is only used while merging includes. Don't keep
+        # a reference to it, so it isn't pickled along with the binding.
+        del self._include_cache
+
     def __repr__(self) -> str:
         if self.compatible:
             compat = f" for compatible '{self.compatible}'"
@@ -341,6 +357,13 @@ class Binding:
         # any bindings it lists in 'include:' into it. 'fname' is just the
         # basename of the file, so we check that there aren't multiple
         # candidates.
+        #
+        # The merged contents are kept in self._include_cache. The caller
+        # gets a copy, as it may filter the contents and merges them into
+        # the including binding.
+
+        if fname in self._include_cache:
+            return deepcopy(self._include_cache[fname])
 
         path = self._fname2path.get(fname)
 
@@ -352,7 +375,8 @@ class Binding:
             if not isinstance(contents, dict):
                 _err(f'{path}: invalid contents, expected a mapping')
 
-        return self._merge_includes(contents, path)
+        self._include_cache[fname] = self._merge_includes(contents, path)
+        return deepcopy(self._include_cache[fname])
 
     def _check(self, require_compatible: bool, require_description: bool):
         # Does sanity checking on the binding.
@@ -673,6 +697,11 @@ class Property:
       in the binding), or None if spec.enum is None.
     """
 
+    # Like dtlib.Node.__slots__. These dataclasses list their slots by hand,
+    # as dataclass(slots=True) needs Python 3.10. Their fields can't have
+    # defaults as a result.
+    __slots__ = ("spec", "val", "node")
+
     spec: PropertySpec
     val: PropertyValType
     node: 'Node'
@@ -727,6 +756,8 @@ class Register:
       The length of the register in bytes
     """
 
+    __slots__ = ("node", "name", "addr", "size")
+
     node: 'Node'
     name: Optional[str]
     addr: Optional[int]
@@ -765,6 +796,10 @@ class Range:
       The size of the range in the child address space, or None if the
       child's #size-cells equals 0.
     """
+    __slots__ = ("node", "child_bus_cells", "child_bus_addr",
+                 "parent_bus_cells", "parent_bus_addr", "length_cells",
+                 "length")
+
     node: 'Node'
     child_bus_cells: int
     child_bus_addr: Optional[int]
@@ -806,6 +841,8 @@ class ControllerAndData:
     basename:
       Basename for the controller when supporting named cells
     """
+    __slots__ = ("node", "controller", "data", "name", "basename")
+
     node: 'Node'
     controller: 'Node'
     data: dict
@@ -838,6 +875,8 @@ class PinCtrl:
           pinctrl-0 = <&state_1 &state_2>;
     """
 
+    __slots__ = ("node", "name", "conf_nodes")
+
     node: 'Node'
     name: Optional[str]
     conf_nodes: List['Node']
@@ -989,6 +1028,13 @@ class Node:
       True if the node is a PCI device.
     """
 
+    # Like dtlib.Node.__slots__, but with a __dict__ as well. Scripts attach
+    # their own attributes to Nodes, e.g. z_path_id in gen_defines.py.
+    __slots__ = ("edt", "dep_ordinal", "matching_compat", "binding_path",
+                 "compats", "ranges", "regs", "props", "interrupts",
+                 "pinctrls", "bus_node", "_node", "_binding", "_child2index",
+                 "__dict__")
+
     def __init__(self,
                  dt_node: dtlib_Node,
                  edt: 'EDT',
@@ -1884,7 +1930,8 @@ class EDT:
                  support_fixed_partitions_on_any_bus: bool = True,
                  infer_binding_for_paths: Optional[Iterable[str]] = None,
                  vendor_prefixes: Optional[Dict[str, str]] = None,
-                 werror: bool = False):
+                 werror: bool = False,
+                 binding_cache: Optional[str] = None):
         """EDT constructor.
 
         dts:
@@ -1924,6 +1971,14 @@ class EDT:
           If True, some edtlib specific warnings become errors. This currently
           errors out if 'dts' has any deprecated properties set, or an unknown
           vendor prefix is used.
+
+        binding_cache (default: None):
+          Path to a binding index file. If given, the compatible and the
+          parsed contents, with includes merged, of every binding in
+          'bindings_dirs' are kept in this file, so that later EDT instances
+          don't have to read and parse the binding files again. The index is
+          rebuilt when a binding file is added, removed or modified. The
+          file may be shared between builds.
         """
         # All instance attributes should be initialized here.
         # This makes it easy to keep track of them, which makes
@@ -1949,6 +2004,7 @@ class EDT:
         self._infer_binding_for_paths: Set[str] = set(infer_binding_for_paths or [])
         self._vendor_prefixes: Dict[str, str] = vendor_prefixes or {}
         self._werror: bool = bool(werror)
+        self._binding_cache: Optional[str] = binding_cache
 
         # Other internal state
         self._compat2binding: Dict[Tuple[str, Optional[str]], Binding] = {}
@@ -2038,7 +2094,8 @@ class EDT:
             support_fixed_partitions_on_any_bus=self._fixed_partitions_no_bus,
             infer_binding_for_paths=set(self._infer_binding_for_paths),
             vendor_prefixes=dict(self._vendor_prefixes),
-            werror=self._werror
+            werror=self._werror,
+            binding_cache=self._binding_cache
         )
         ret.dts_path = self.dts_path
         ret._dt = deepcopy(self._dt, memo)
@@ -2137,6 +2194,9 @@ class EDT:
         #
         # Only bindings for 'compatible' strings that appear in the devicetree
         # are loaded.
+        #
+        # With a binding cache, bindings found in the index are created from
+        # their indexed contents instead of reading the binding files.
 
         dt_compats = _dt_compats(self._dt)
         # Searches for any 'compatible' string mentioned in the devicetree
@@ -2145,32 +2205,24 @@ class EDT:
             "|".join(re.escape(compat) for compat in dt_compats)
         ).search
 
-        for binding_path in self._binding_paths:
-            with open(binding_path, encoding="utf-8") as f:
-                contents = f.read()
-
-            # As an optimization, skip parsing files that don't contain any of
-            # the .dts 'compatible' strings, which should be reasonably safe
-            if not dt_compats_search(contents):
-                continue
-
-            # Load the binding and check that it actually matches one of the
-            # compatibles. Might get false positives above due to comments and
-            # stuff.
+        # Included files shared by the bindings, see Binding.__init__()
+        include_cache: Dict[str, dict] = {}
 
-            try:
-                # Parsed PyYAML output (Python lists/dictionaries/strings/etc.,
-                # representing the file)
-                raw = yaml.load(contents, Loader=_BindingLoader)
-            except yaml.YAMLError as e:
-                _err(
-                        f"'{binding_path}' appears in binding directories "
-                        f"but isn't valid YAML: {e}")
-                continue
+        index = self._binding_index(include_cache) if self._binding_cache \
+            else {}
 
-            # Convert the raw data to a Binding object, erroring out
-            # if necessary.
-            binding = self._binding(raw, binding_path, dt_compats)
+        for binding_path in self._binding_paths:
+            if binding_path in index:
+                compatible, raw_pickle = index[binding_path]
+                if compatible not in dt_compats:
+                    continue
+                binding = Binding(binding_path, self._binding_fname2path,
+                                  raw=pickle.loads(raw_pickle),
+                                  include_cache=include_cache)
+            else:
+                binding = self._binding_from_file(binding_path, dt_compats,
+                                                  dt_compats_search,
+                                                  include_cache)
 
             # Register the binding in self._compat2binding, along with
             # any child bindings that have their own compatibles.
@@ -2179,10 +2231,108 @@ class EDT:
                     self._register_binding(binding)
                 binding = binding.child_binding
 
+    def _binding_from_file(self,
+                           binding_path: str,
+                           dt_compats: Set[str],
+                           dt_compats_search: Callable,
+                           include_cache: Dict[str, dict]
+                           ) -> Optional[Binding]:
+        # Reads the binding file 'binding_path' and returns a Binding object
+        # for it, or None if it isn't a binding for any of 'dt_compats'.
+
+        with open(binding_path, encoding="utf-8") as f:
+            contents = f.read()
+
+        # As an optimization, skip parsing files that don't contain any of
+        # the .dts 'compatible' strings, which should be reasonably safe
+        if not dt_compats_search(contents):
+            return None
+
+        # Load the binding and check that it actually matches one of the
+        # compatibles. Might get false positives above due to comments and
+        # stuff.
+
+        try:
+            # Parsed PyYAML output (Python lists/dictionaries/strings/etc.,
+            # representing the file)
+            raw = yaml.load(contents, Loader=_BindingLoader)
+        except yaml.YAMLError as e:
+            _err(
+                    f"'{binding_path}' appears in binding directories "
+                    f"but isn't valid YAML: {e}")
+
+        # Convert the raw data to a Binding object, erroring out
+        # if necessary.
+        return self._binding(raw, binding_path, dt_compats, include_cache)
+
+    def _binding_index(self, include_cache: Dict[str, dict]
+                       ) -> Dict[str, Tuple[Optional[str], bytes]]:
+        # Returns a dict that maps binding paths to (<compatible>, <raw>)
+        # tuples, where <raw> is the pickled contents of the binding after
+        # merging includes, as found in Binding.raw.
+        #
+        # The index is read from self._binding_cache if it was created for
+        # the same binding files, which are compared by path, modification
+        # time and size. Otherwise, it is built and saved there.
+        #
+        # Binding files that can't be indexed, because they are not valid
+        # YAML or not valid bindings, are left out of the index. They are
+        # processed as if there was no cache, so that they only cause errors
+        # if the devicetree uses them.
+
+        assert self._binding_cache
+        key = [(path, stat.st_mtime_ns, stat.st_size)
+               for path, stat in ((path, os.stat(path))
+                                  for path in self._binding_paths)]
+
+        try:
+            with open(self._binding_cache, "rb") as f:
+                cache = pickle.load(f)
+            if cache["version"] == _BINDING_INDEX_VERSION and \
+               cache["key"] == key:
+                return cache["index"]
+        except Exception:
+            # Missing, outdated or corrupt index
+            pass
+
+        index: Dict[str, Tuple[Optional[str], bytes]] = {}
+        for binding_path in self._binding_paths:
+            try:
+                with open(binding_path, encoding="utf-8") as f:
+                    raw = yaml.load(f, Loader=_BindingLoader)
+                if raw is None or \
+                   (isinstance(raw, dict) and "compatible" not in raw):
+                    # Not a binding with a compatible, never loaded on its own
+                    index[binding_path] = (None, b"")
+                    continue
+                binding = Binding(binding_path, self._binding_fname2path,
+                                  raw=raw, include_cache=include_cache)
+            except Exception:
+                # Left out of the index, see above. Errors must only be
+                # reported for bindings that the devicetree uses.
+                continue
+            index[binding_path] = (binding.compatible,
+                                   pickle.dumps(binding.raw))
+
+        # Write to a temporary file first, as the index may be shared with
+        # other builds running concurrently
+        tmp_path = f"{self._binding_cache}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"version": _BINDING_INDEX_VERSION, "key": key,
+                             "index": index}, f)
+            os.replace(tmp_path, self._binding_cache)
+        except OSError as e:
+            _LOG.warning(f"could not write binding index "
+                         f"'{self._binding_cache}': {e}")
+
+        return index
+
     def _binding(self,
                  raw: Optional[dict],
                  binding_path: str,
-                 dt_compats: Set[str]) -> Optional[Binding]:
+                 dt_compats: Set[str],
+                 include_cache: Dict[str, dict]) -> Optional[Binding]:
         # Convert a 'raw' binding from YAML to a Binding object and return it.
         #
         # Error out if the raw data looks like an invalid binding.
@@ -2202,7 +2352,8 @@ class EDT:
             return None
 
         # Initialize and return the Binding object.
-        return Binding(binding_path, self._binding_fname2path, raw=raw)
+        return Binding(binding_path, self._binding_fname2path, raw=raw,
+                       include_cache=include_cache)
 
     def _register_binding(self, binding: Binding) -> None:
         # Do not allow two different bindings to have the same
@@ -2356,9 +2507,10 @@ def bindings_from_paths(yaml_paths: List[str],
 
     ret = []
     fname2path = {os.path.basename(path): path for path in yaml_paths}
+    include_cache: Dict[str, dict] = {}
     for path in yaml_paths:
         try:
-            ret.append(Binding(path, fname2path))
+            ret.append(Binding(path, fname2path, include_cache=include_cache))
         except EDTError:
             if ignore_errors:
                 continue
@@ -3186,6 +3338,10 @@ def _err(msg) -> NoReturn:
 # Logging object
 _LOG = logging.getLogger(__name__)
 
+# Version of the EDT binding_cache file format. Increase it whenever the
+# indexed contents change.
+_BINDING_INDEX_VERSION = 1
+
 # Regular expression for non-alphanumeric-or-underscore characters.
 _NOT_ALPHANUM_OR_UNDERSCORE = re.compile(r'\W', re.ASCII)
 
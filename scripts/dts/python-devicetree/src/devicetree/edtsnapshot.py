@@ -0,0 +1,337 @@
+# Copyright (c) 2023 Intel Corporation
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""
+Read-only snapshot of an edtlib.EDT, for scripts that only query the final
+devicetree.
+
+Loading edt.pickle requires importing edtlib and rebuilding the complete
+object graph, including the dtlib tree and the bindings. A snapshot only
+holds the information used to answer questions about the devicetree:
+nodes, compatibles, labels, aliases, chosen nodes, registers and property
+values. Loading it doesn't import edtlib, and nodes are only decoded when
+their details are first accessed.
+
+Write a snapshot with write_snapshot() and load it with load_snapshot().
+The EDTSnapshot and Node classes here provide the following subset of the
+edtlib.EDT and edtlib.Node attributes, with the same names and meanings, so
+that code querying an EDT can use a snapshot instead:
+
+  EDTSnapshot: nodes, compat2nodes, compat2okay, label2node, chosen_nodes,
+  chosen_node(), get_node(), dts_path, bindings_dirs
+
+  Node: path, name, unit_addr, description, status, aliases, labels,
+  parent, children, compats, matching_compat, binding_path, dep_ordinal,
+  buses, on_buses, read_only, regs, props, gpio_hogs
+"""
+
+# File format
+#
+# The first line is "EDT-SNAPSHOT <version> <header length>\n". It is
+# followed by the header, a JSON object with the EDT-level data and one
+# entry per node, and then the node records, which are JSON objects too.
+#
+# Nodes are referred to by their index in the header 'nodes' list. Each
+# node entry is [path, status, parent index, aliases, record offset, record
+# length], where the record offset is relative to the end of the header.
+# Only the node entries are decoded when a snapshot is loaded, records are
+# decoded on first use.
+#
+# In property values, nodes are encoded as {"node": <index>}, bytes as
+# {"bytes": <hex string>} and ControllerAndData entries as {"cad":
+# [<node index>, <controller index>, <data>, <name>, <basename>]}.
+
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+
+_MAGIC = b"EDT-SNAPSHOT"
+
+# Increase whenever the format changes
+_VERSION = 1
+
+#
+# Public classes
+#
+
+
+class EDTError(Exception):
+    "Exception raised for failed lookups, like edtlib.EDTError"
+
+
+class Register(NamedTuple):
+    "A register of a node, see edtlib.Register"
+    node: 'Node'
+    name: Optional[str]
+    addr: Optional[int]
+    size: Optional[int]
+
+
+class ControllerAndData(NamedTuple):
+    "An entry of a 'phandle-array' property, see edtlib.ControllerAndData"
+    node: 'Node'
+    controller: 'Node'
+    data: dict
+    name: Optional[str]
+    basename: Optional[str]
+
+
+class Property(NamedTuple):
+    "A property of a node, see edtlib.Property"
+    node: 'Node'
+    name: str
+    type: str
+    val: Any
+
+
+class Node:
+    """
+    Represents a node in an EDTSnapshot. See the module docstring for the
+    available attributes, which match edtlib.Node.
+
+    The path, status, aliases and parent attributes are available without
+    decoding the node record.
+    """
+
+    # Attributes stored in the node record
+    _RECORD_ATTRS = frozenset([
+        "name", "unit_addr", "description", "labels", "children", "compats",
+        "matching_compat", "binding_path", "dep_ordinal", "buses",
+        "on_buses", "read_only", "regs", "props", "gpio_hogs"])
+
+    __slots__ = ("_snapshot", "_index", "_parent", "_record", "path",
+                 "status", "aliases")
+
+    def __init__(self, snapshot: 'EDTSnapshot', index: int, path: str,
+                 status: str, parent: Optional[int], aliases: List[str]):
+        self._snapshot: 'EDTSnapshot' = snapshot
+        self._index: int = index
+        self._parent: Optional[int] = parent
+        self._record: Optional[Dict[str, Any]] = None
+        self.path: str = path
+        self.status: str = status
+        self.aliases: List[str] = aliases
+
+    @property
+    def parent(self) -> Optional['Node']:
+        "See the class docstring"
+        if self._parent is None:
+            return None
+        return self._snapshot.nodes[self._parent]
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes that aren't set, i.e. the ones kept in
+        # the node record, which is decoded on first access
+
+        if name not in Node._RECORD_ATTRS:
+            raise AttributeError(name)
+        if self._record is None:
+            self._record = self._snapshot._decode_record(self._index)
+        return self._record[name]
+
+    def __repr__(self) -> str:
+        return f"<Node {self.path} in snapshot of '{self._snapshot.dts_path}'>"
+
+
+class EDTSnapshot:
+    """
+    Represents a devicetree loaded from a snapshot written by
+    write_snapshot(). See the module docstring for the available
+    attributes, which match edtlib.EDT.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        EDTSnapshot constructor.
+
+        data:
+          Contents of a snapshot file. Use load_snapshot() to load a file.
+        """
+        self._data: bytes = data
+
+        first_line_end = data.find(b"\n")
+        try:
+            magic, version, header_len = data[:first_line_end].split()
+        except ValueError:
+            raise EDTError("not an EDT snapshot") from None
+        if magic != _MAGIC or int(version) != _VERSION:
+            raise EDTError(f"unsupported EDT snapshot version {version!r}")
+        header_start = first_line_end + 1
+        self._records_start: int = header_start + int(header_len)
+
+        header = json.loads(self._data[header_start:self._records_start])
+
+        self.dts_path: str = header["dts_path"]
+        self.bindings_dirs: List[str] = header["bindings_dirs"]
+        self.nodes: List[Node] = []
+        self._record_spans: List[List[int]] = []
+        for i, (path, status, parent, aliases, offset, length) in \
+                enumerate(header["nodes"]):
+            self.nodes.append(Node(self, i, path, status, parent, aliases))
+            self._record_spans.append([offset, length])
+
+        nodes = self.nodes
+        self.compat2nodes: Dict[str, List[Node]] = {
+            compat: [nodes[i] for i in indices]
+            for compat, indices in header["compat2nodes"].items()}
+        self.compat2okay: Dict[str, List[Node]] = {
+            compat: [nodes[i] for i in indices]
+            for compat, indices in header["compat2okay"].items()}
+        self.label2node: Dict[str, Node] = {
+            label: nodes[i] for label, i in header["label2node"].items()}
+        self.chosen_nodes: Dict[str, Node] = {
+            name: nodes[i] for name, i in header["chosen_nodes"].items()}
+
+        self._path2node: Dict[str, Node] = {node.path: node for node in nodes}
+        self._alias2node: Dict[str, Node] = {
+            alias: node for node in nodes for alias in node.aliases}
+
+    def chosen_node(self, name: str) -> Optional[Node]:
+        """
+        Returns the Node pointed at by the property named 'name' in /chosen,
+        or None if the property is missing
+        """
+        return self.chosen_nodes.get(name)
+
+    def get_node(self, path: str) -> Node:
+        """
+        Returns the Node at the DT path or alias 'path'. Raises EDTError if
+        the path or alias doesn't exist.
+        """
+        if not path.startswith("/"):
+            # First component must be an alias, like in edtlib
+            alias, _, rest = path.partition("/")
+            if alias not in self._alias2node:
+                raise EDTError(f"no alias '{alias}' found -- did you forget "
+                               "the leading '/' in the node path?")
+            node_path = self._alias2node[alias].path
+            if rest:
+                node_path = node_path.rstrip("/") + "/" + rest
+        else:
+            node_path = path
+
+        node = self._path2node.get(node_path.rstrip("/") or "/")
+        if node is None:
+            raise EDTError(f"no node with path '{path}'")
+        return node
+
+    def __repr__(self) -> str:
+        return f"<EDTSnapshot for '{self.dts_path}'>"
+
+    def _decode_record(self, index: int) -> Dict[str, Any]:
+        # Decodes the record of the node with index 'index' into a dict of
+        # its attributes
+
+        offset, length = self._record_spans[index]
+        start = self._records_start + offset
+        record = json.loads(self._data[start:start + length])
+
+        nodes = self.nodes
+        record["children"] = {name: nodes[i]
+                              for name, i in record["children"].items()}
+        node = nodes[index]
+        record["regs"] = [Register(node, *reg) for reg in record["regs"]]
+        record["props"] = {
+            name: Property(node, name, prop_type, self._decode_val(val))
+            for name, (prop_type, val) in record["props"].items()}
+        record["gpio_hogs"] = self._decode_val(record["gpio_hogs"])
+        return record
+
+    def _decode_val(self, val: Any) -> Any:
+        # Decodes an encoded property value, see the file format description
+
+        if isinstance(val, list):
+            return [self._decode_val(elm) for elm in val]
+        if isinstance(val, dict):
+            if "node" in val:
+                return self.nodes[val["node"]]
+            if "bytes" in val:
+                return bytes.fromhex(val["bytes"])
+            node, controller, data, name, basename = val["cad"]
+            return ControllerAndData(self.nodes[node], self.nodes[controller],
+                                     data, name, basename)
+        return val
+
+#
+# Public functions
+#
+
+
+def load_snapshot(path: str) -> EDTSnapshot:
+    """
+    Loads the snapshot file at 'path' and returns an EDTSnapshot.
+    """
+    with open(path, "rb") as f:
+        return EDTSnapshot(f.read())
+
+
+def write_snapshot(edt: Any, path: str) -> None:
+    """
+    Writes a snapshot of 'edt', an edtlib.EDT, to 'path'.
+    """
+    # Imported here, so loading snapshots doesn't need edtlib
+    from devicetree import edtlib
+
+    node2index = {node: i for i, node in enumerate(edt.nodes)}
+
+    def encode(val):
+        if isinstance(val, list):
+            return [encode(elm) for elm in val]
+        if isinstance(val, edtlib.Node):
+            return {"node": node2index[val]}
+        if isinstance(val, bytes):
+            return {"bytes": val.hex()}
+        if isinstance(val, edtlib.ControllerAndData):
+            return {"cad": [node2index[val.node], node2index[val.controller],
+                            val.data, val.name, val.basename]}
+        return val
+
+    records = []
+    node_entries = []
+    offset = 0
+    for node in edt.nodes:
+        record = json.dumps({
+            "name": node.name,
+            "unit_addr": node.unit_addr,
+            "description": node.description,
+            "labels": node.labels,
+            "children": {name: node2index[child]
+                         for name, child in node.children.items()},
+            "compats": node.compats,
+            "matching_compat": node.matching_compat,
+            "binding_path": node.binding_path,
+            "dep_ordinal": node.dep_ordinal,
+            "buses": node.buses,
+            "on_buses": node.on_buses,
+            "read_only": node.read_only,
+            "regs": [[reg.name, reg.addr, reg.size] for reg in node.regs],
+            "props": {name: [prop.type, encode(prop.val)]
+                      for name, prop in node.props.items()},
+            "gpio_hogs": encode(node.gpio_hogs),
+        }, separators=(",", ":")).encode("utf-8")
+
+        node_entries.append([
+            node.path, node.status,
+            node2index[node.parent] if node.parent else None,
+            node.aliases, offset, len(record)])
+        records.append(record)
+        offset += len(record)
+
+    header = json.dumps({
+        "dts_path": edt.dts_path,
+        "bindings_dirs": edt.bindings_dirs,
+        "nodes": node_entries,
+        "compat2nodes": {compat: [node2index[node] for node in nodes]
+                         for compat, nodes in edt.compat2nodes.items()},
+        "compat2okay": {compat: [node2index[node] for node in nodes]
+                        for compat, nodes in edt.compat2okay.items()},
+        "label2node": {label: node2index[node]
+                       for label, node in edt.label2node.items()},
+        "chosen_nodes": {name: node2index[node]
+                         for name, node in edt.chosen_nodes.items()},
+    }, separators=(",", ":")).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(b"%s %d %d\n" % (_MAGIC, _VERSION, len(header)))
+        f.write(header)
+        for record in records:
+            f.write(record)
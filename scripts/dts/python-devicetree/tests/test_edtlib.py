@@ -7,6 +7,8 @@ import io
 from logging import WARNING
 import os
 from pathlib import Path
+import shutil
+from unittest import mock
 
 import pytest
 
@@ -365,6 +367,39 @@ def test_include_filters():
         assert set(child.prop2specs.keys()) == {'child-prop-1', 'child-prop-2',
                                                 'x', 'z'}  # root level 'y' is blocked
 
+def test_include_cache():
+    '''Test that included files are shared through include_cache.'''
+
+    fname2path = {'include.yaml': 'test-bindings-include/include.yaml',
+                  'include-2.yaml': 'test-bindings-include/include-2.yaml'}
+    include_cache = {}
+
+    with from_here(), mock.patch("devicetree.edtlib.yaml.load",
+                                 wraps=edtlib.yaml.load) as yaml_load:
+        # Filters applied to the cached contents must not leak into other
+        # bindings including the same file
+        binding = edtlib.Binding("test-bindings-include/allowlist.yaml",
+                                 fname2path, include_cache=include_cache)
+        assert set(binding.prop2specs.keys()) == {'x'}
+
+        binding = edtlib.Binding("test-bindings-include/blocklist.yaml",
+                                 fname2path, include_cache=include_cache)
+        assert set(binding.prop2specs.keys()) == {'y', 'z'}
+
+        binding = edtlib.Binding("test-bindings-include/filter-child-bindings.yaml",
+                                 fname2path, include_cache=include_cache)
+        assert set(binding.child_binding.prop2specs.keys()) == {'child-prop-2'}
+
+        binding = edtlib.Binding("test-bindings-include/include-no-list.yaml",
+                                 fname2path, include_cache=include_cache)
+        assert set(binding.prop2specs.keys()) == {'x', 'y', 'z'}
+        assert set(binding.child_binding.prop2specs.keys()) == \
+            {'child-prop-1', 'child-prop-2'}
+
+    included = [call for call in yaml_load.call_args_list
+                if call.args[0].name.endswith('include.yaml')]
+    assert len(included) == 1
+    assert 'include.yaml' in include_cache
 
 def test_bus():
     '''Test 'bus:' and 'on-bus:' in bindings'''
@@ -732,7 +767,42 @@ def test_wrong_props():
         assert value_str.endswith("but no 'specifier-space' was provided.")
 
 
-def test_deepcopy():
+def test_binding_cache(tmp_path):
+    '''Test EDT binding_cache, the persistent binding index'''
+
+    bindings_dir = tmp_path / "test-bindings"
+    shutil.copytree(os.path.join(HERE, "test-bindings"), bindings_dir)
+    cache = tmp_path / "index.pickle"
+
+    def compat2raw(edt):
+        return {key: (binding.path, binding.raw)
+                for key, binding in edt._compat2binding.items()}
+
+    with from_here():
+        edt = edtlib.EDT("test.dts", [str(bindings_dir)])
+        cold = edtlib.EDT("test.dts", [str(bindings_dir)],
+                          binding_cache=str(cache))
+        assert cache.exists()
+        with mock.patch("devicetree.edtlib.yaml.load",
+                        side_effect=AssertionError("binding file parsed")):
+            warm = edtlib.EDT("test.dts", [str(bindings_dir)],
+                              binding_cache=str(cache))
+
+    assert compat2raw(cold) == compat2raw(edt)
+    assert compat2raw(warm) == compat2raw(edt)
+    assert warm.get_node("/props").props["int"].val == \
+        edt.get_node("/props").props["int"].val
+
+    # A modified binding invalidates the index
+    props_binding = bindings_dir / "props.yaml"
+    props_binding.write_text(props_binding.read_text().replace(
+        "Device.props test", "Device.props test, modified"))
+    with from_here():
+        edt = edtlib.EDT("test.dts", [str(bindings_dir)],
+                         binding_cache=str(cache))
+    assert edt.get_node("/props").description == "Device.props test, modified"
+
+def test_deepcopy(tmp_path):
     with from_here():
         # We intentionally use different kwarg values than the
         # defaults to make sure they're getting copied. This implies
@@ -745,7 +815,8 @@ def test_deepcopy():
                          support_fixed_partitions_on_any_bus=False,
                          infer_binding_for_paths=['/test-node'],
                          vendor_prefixes={'test-vnd': 'A test vendor'},
-                         werror=True)
+                         werror=True,
+                         binding_cache=str(tmp_path / "index.pickle"))
         edt_copy = deepcopy(edt)
 
     def equal_paths(list1, list2):
@@ -792,6 +863,7 @@ def test_deepcopy():
     assert edt_copy._vendor_prefixes == {"test-vnd": "A test vendor"}
     assert edt_copy._vendor_prefixes is not edt._vendor_prefixes
     assert edt_copy._werror
+    assert edt_copy._binding_cache == str(tmp_path / "index.pickle")
     test_equal_but_not_same("_compat2binding", equal_key2path)
     test_equal_but_not_same("_binding_paths")
     test_equal_but_not_same("_binding_fname2path")
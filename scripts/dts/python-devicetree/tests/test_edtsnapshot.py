@@ -0,0 +1,162 @@
+# Copyright (c) 2023 Intel Corporation
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from devicetree import edtlib, edtsnapshot
+
+# Test suite for edtsnapshot.py. The snapshot of test.dts is compared against
+# the edtlib.EDT it was written from.
+
+HERE = os.path.dirname(__file__)
+
+@pytest.fixture(scope="module")
+def edt_and_snapshot(tmp_path_factory):
+    cwd = os.getcwd()
+    try:
+        os.chdir(HERE)
+        edt = edtlib.EDT("test.dts", ["test-bindings"])
+    finally:
+        os.chdir(cwd)
+
+    path = tmp_path_factory.mktemp("snapshot") / "edt.snapshot"
+    edtsnapshot.write_snapshot(edt, str(path))
+    return edt, edtsnapshot.load_snapshot(str(path))
+
+def node_ref(node):
+    return node.path if node is not None else None
+
+def val_ref(val):
+    '''Converts a property value to something comparable across the EDT and
+    the snapshot, replacing nodes by their paths.'''
+
+    if isinstance(val, list):
+        return [val_ref(elm) for elm in val]
+    if isinstance(val, (edtlib.Node, edtsnapshot.Node)):
+        return val.path
+    if isinstance(val, (edtlib.ControllerAndData,
+                        edtsnapshot.ControllerAndData)):
+        return (val.node.path, val.controller.path, val.data, val.name,
+                val.basename)
+    return val
+
+def test_nodes(edt_and_snapshot):
+    '''Test that all nodes are restored with their attributes'''
+
+    edt, snapshot = edt_and_snapshot
+
+    assert snapshot.dts_path == edt.dts_path
+    assert snapshot.bindings_dirs == edt.bindings_dirs
+    assert [node.path for node in snapshot.nodes] == \
+        [node.path for node in edt.nodes]
+
+    for edt_node, node in zip(edt.nodes, snapshot.nodes):
+        for attr in ["path", "name", "unit_addr", "description", "status",
+                     "aliases", "labels", "compats", "matching_compat",
+                     "binding_path", "dep_ordinal", "buses", "on_buses",
+                     "read_only"]:
+            assert getattr(node, attr) == getattr(edt_node, attr), \
+                f"{attr} of {node.path}"
+
+        assert node_ref(node.parent) == node_ref(edt_node.parent)
+        assert {name: child.path for name, child in node.children.items()} == \
+            {name: child.path for name, child in edt_node.children.items()}
+        assert [(reg.node.path, reg.name, reg.addr, reg.size)
+                for reg in node.regs] == \
+            [(reg.node.path, reg.name, reg.addr, reg.size)
+             for reg in edt_node.regs]
+        assert {name: (prop.node.path, prop.type, val_ref(prop.val))
+                for name, prop in node.props.items()} == \
+            {name: (prop.node.path, prop.type, val_ref(prop.val))
+             for name, prop in edt_node.props.items()}
+        assert val_ref(node.gpio_hogs) == val_ref(edt_node.gpio_hogs)
+
+def test_lookups(edt_and_snapshot):
+    '''Test the EDT-level lookup tables and functions'''
+
+    edt, snapshot = edt_and_snapshot
+
+    def paths(compat2nodes):
+        return {compat: [node.path for node in nodes]
+                for compat, nodes in compat2nodes.items()}
+
+    assert paths(snapshot.compat2nodes) == paths(edt.compat2nodes)
+    assert paths(snapshot.compat2okay) == paths(edt.compat2okay)
+    assert {label: node.path for label, node in snapshot.label2node.items()} == \
+        {label: node.path for label, node in edt.label2node.items()}
+    assert {name: node.path for name, node in snapshot.chosen_nodes.items()} == \
+        {name: node.path for name, node in edt.chosen_nodes.items()}
+    assert snapshot.chosen_node("missing") is None
+
+    for path in ["/", "/props", "/props/", "/parent/child-2/grandchild"]:
+        assert snapshot.get_node(path).path == edt.get_node(path).path
+
+    with pytest.raises(edtsnapshot.EDTError):
+        snapshot.get_node("/missing")
+    with pytest.raises(edtsnapshot.EDTError):
+        snapshot.get_node("missing-alias")
+
+    # Node records are decoded on first use
+    node = snapshot.get_node("/props")
+    assert node.props["int"].val == 1
+    with pytest.raises(AttributeError):
+        node.missing
+
+def test_aliases_and_chosen(tmp_path):
+    '''Test aliases and /chosen, which test.dts doesn't have'''
+
+    dts = tmp_path / "test.dts"
+    dts.write_text("""
+/dts-v1/;
+
+/ {
+	aliases {
+		alias-parent = &parent;
+	};
+	chosen {
+		zephyr,console = &child;
+	};
+	parent: parent {
+		child: child {
+		};
+	};
+};
+""")
+    edt = edtlib.EDT(str(dts), [])
+    path = tmp_path / "edt.snapshot"
+    edtsnapshot.write_snapshot(edt, str(path))
+    snapshot = edtsnapshot.load_snapshot(str(path))
+
+    assert snapshot.get_node("/parent").aliases == ["alias-parent"]
+    assert snapshot.get_node("alias-parent").path == "/parent"
+    assert snapshot.get_node("alias-parent/child").path == "/parent/child"
+    assert snapshot.chosen_node("zephyr,console").path == "/parent/child"
+    assert list(snapshot.chosen_nodes) == ["zephyr,console"]
+    assert snapshot.label2node["child"].parent.path == "/parent"
+
+def test_load_without_edtlib(edt_and_snapshot, tmp_path):
+    '''Test that loading a snapshot doesn't import edtlib'''
+
+    edt, _ = edt_and_snapshot
+    path = tmp_path / "edt.snapshot"
+    edtsnapshot.write_snapshot(edt, str(path))
+
+    code = ("import sys; from devicetree import edtsnapshot; "
+            f"s = edtsnapshot.load_snapshot({str(path)!r}); "
+            "s.get_node('/props').props; "
+            "assert 'devicetree.edtlib' not in sys.modules")
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   env=dict(os.environ,
+                            PYTHONPATH=os.pathsep.join(sys.path)))
+
+def test_invalid_file(tmp_path):
+    '''Test that files that aren't snapshots are rejected'''
+
+    path = tmp_path / "edt.snapshot"
+    path.write_bytes(b"\x80\x04garbage\n")
+    with pytest.raises(edtsnapshot.EDTError):
+        edtsnapshot.load_snapshot(str(path))
@@ -0,0 +1,44 @@
+# Copyright (c) 2023 Intel Corporation
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import pickle
+import subprocess
+import sys
+
+from devicetree import edtsnapshot
+
+# Test suite for scripts/dts/gen_defines.py, which is the main user of
+# edtlib. It is run end-to-end on test.dts, like the build system runs it.
+
+HERE = os.path.dirname(__file__)
+GEN_DEFINES = os.path.join(HERE, "..", "..", "gen_defines.py")
+
+def test_gen_defines(tmp_path):
+    '''Test that gen_defines.py writes all of its outputs for test.dts'''
+
+    header = tmp_path / "devicetree_generated.h"
+    pickle_path = tmp_path / "edt.pickle"
+    snapshot_path = tmp_path / "edt.snapshot"
+    subprocess.run([sys.executable, GEN_DEFINES,
+                    "--dts", "test.dts",
+                    "--dtc-flags", "",
+                    "--bindings-dirs", "test-bindings",
+                    "--header-out", str(header),
+                    "--dts-out", str(tmp_path / "zephyr.dts"),
+                    "--edt-pickle-out", str(pickle_path),
+                    "--edt-snapshot-out", str(snapshot_path)],
+                   cwd=HERE, check=True)
+
+    header_text = header.read_text(encoding="utf-8")
+    assert "#define DT_N_S_props_PATH \"/props\"" in header_text
+    assert "#define DT_N_S_parent_S_child_1_PARENT DT_N_S_parent" in header_text
+
+    # Attributes set by gen_defines.py end up in the pickle
+    with open(pickle_path, "rb") as f:
+        edt = pickle.load(f)
+    assert edt.get_node("/props").z_path_id == "N_S_props"
+
+    snapshot = edtsnapshot.load_snapshot(str(snapshot_path))
+    assert [node.path for node in snapshot.nodes] == \
+        [node.path for node in edt.nodes]
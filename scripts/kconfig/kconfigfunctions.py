@@ -20,9 +20,16 @@ doc_mode = os.environ.get('KCONFIG_DOC_MODE') == "1"
 
 if not doc_mode:
     EDT_PICKLE = os.environ.get("EDT_PICKLE")
-
-    # The "if" handles a missing dts.
-    if EDT_PICKLE is not None and os.path.isfile(EDT_PICKLE):
+    EDT_SNAPSHOT = os.environ.get("EDT_SNAPSHOT")
+
+    # The "if" handles a missing dts. The snapshot is preferred, as it
+    # loads without edtlib and only decodes the nodes that are queried.
+    if EDT_SNAPSHOT is not None and os.path.isfile(EDT_SNAPSHOT):
+        from devicetree import edtsnapshot
+        edt = edtsnapshot.load_snapshot(EDT_SNAPSHOT)
+        # edtsnapshot provides the edtlib API used here, e.g. EDTError
+        edtlib = edtsnapshot
+    elif EDT_PICKLE is not None and os.path.isfile(EDT_PICKLE):
         with open(EDT_PICKLE, 'rb') as f:
             edt = pickle.load(f)
             edtlib = inspect.getmodule(edt)
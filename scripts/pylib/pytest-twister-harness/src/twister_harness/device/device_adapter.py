@@ -7,7 +7,6 @@ from __future__ import annotations
 import abc
 import logging
 import os
-import queue
 import re
 import shutil
 import threading
@@ -15,6 +14,7 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+from twister_harness.device.line_buffer import LineBuffer
 from twister_harness.exceptions import (
     TwisterHarnessException,
     TwisterHarnessTimeoutException,
@@ -33,7 +33,7 @@ class DeviceAdapter(abc.ABC):
         """
         self.device_config: DeviceConfig = device_config
         self.base_timeout: float = device_config.base_timeout
-        self._device_read_queue: queue.Queue = queue.Queue()
+        self._device_read_buffer: LineBuffer = LineBuffer()
         self._reader_thread: threading.Thread | None = None
         self._device_run: threading.Event = threading.Event()
         self._device_connected: threading.Event = threading.Event()
@@ -96,6 +96,7 @@ class DeviceAdapter(abc.ABC):
             return
         self._disconnect_device()
         self._device_connected.clear()
+        self._device_read_buffer.notify()
 
     def readline(self, timeout: float | None = None, print_output: bool = True) -> str:
         """
@@ -103,8 +104,8 @@ class DeviceAdapter(abc.ABC):
         base_timeout
         """
         timeout = timeout or self.base_timeout
-        if self.is_device_connected() or not self._device_read_queue.empty():
-            data = self._read_from_queue(timeout)
+        if self.is_device_connected() or not self._device_read_buffer.empty():
+            data = self._read_from_buffer(timeout)
         else:
             msg = 'No connection to the device and no more data to read.'
             logger.error(msg)
@@ -129,48 +130,45 @@ class DeviceAdapter(abc.ABC):
         2. If num_of_lines is provided - read until number of read lines is
            equal to num_of_lines (or until timeout)
         3. If none of above is provided - return immediately lines collected so
-           far in internal queue
+           far in internal buffer
 
-        If timeout is not provided, then use base_timeout
+        Lines already collected in internal buffer are checked at once, then
+        the method waits for new lines and returns as soon as the condition is
+        met. If timeout is not provided, then use base_timeout
         """
+        if not (regex or num_of_lines):
+            return self.readlines(print_output)
         timeout = timeout or self.base_timeout
-        if regex:
-            regex_compiled = re.compile(regex)
-        lines: list[str] = []
-        if regex or num_of_lines:
-            timeout_time: float = time.time() + timeout
-            while time.time() < timeout_time:
-                try:
-                    line = self.readline(0.1, print_output)
-                except TwisterHarnessTimeoutException:
-                    continue
-                lines.append(line)
-                if regex and regex_compiled.search(line):
-                    break
-                if num_of_lines and len(lines) == num_of_lines:
-                    break
-            else:
-                msg = 'Read from device timeout occurred'
+        regex_compiled = re.compile(regex) if regex else None
+        lines, found = self._device_read_buffer.get_until(
+            regex_compiled, num_of_lines, timeout, self.is_device_connected
+        )
+        if print_output:
+            for line in lines:
+                logger.debug('#: %s', line)
+        if not found:
+            if not self.is_device_connected() and self._device_read_buffer.empty():
+                msg = 'No connection to the device and no more data to read.'
                 logger.error(msg)
-                raise TwisterHarnessTimeoutException(msg)
-        else:
-            lines = self.readlines(print_output)
+                raise TwisterHarnessException(msg)
+            msg = 'Read from device timeout occurred'
+            logger.error(msg)
+            raise TwisterHarnessTimeoutException(msg)
         return lines
 
     def readlines(self, print_output: bool = True) -> list[str]:
         """
         Read all available output lines produced by device from internal buffer.
         """
-        lines: list[str] = []
-        while not self._device_read_queue.empty():
-            line = self.readline(0.1, print_output)
-            lines.append(line)
+        lines = self._device_read_buffer.get_all()
+        if print_output:
+            for line in lines:
+                logger.debug('#: %s', line)
         return lines
 
     def clear_buffer(self) -> None:
         """
-        Remove all available output produced by device from internal buffer
-        (queue).
+        Remove all available output produced by device from internal buffer.
         """
         self.readlines(print_output=False)
 
@@ -198,27 +196,28 @@ class DeviceAdapter(abc.ABC):
     def _handle_device_output(self) -> None:
         """
         This method is dedicated to run it in separate thread to read output
-        from device and put them into internal queue and save to log file.
+        from device and put them into internal buffer and save to log file.
         """
         with open(self.handler_log_path, 'a+') as log_file:
             while self.is_device_running():
                 if self.is_device_connected():
                     output = self._read_device_output().decode(errors='replace').strip()
                     if output:
-                        self._device_read_queue.put(output)
+                        self._device_read_buffer.put(output)
                         log_file.write(f'{output}\n')
                         log_file.flush()
                 else:
                     # ignore output from device
                     self._flush_device_output()
                     time.sleep(0.1)
-
-    def _read_from_queue(self, timeout: float) -> str:
-        """Read data from internal queue"""
-        try:
-            data: str | object = self._device_read_queue.get(timeout=timeout)
-        except queue.Empty as exc:
-            raise TwisterHarnessTimeoutException(f'Read from device timeout occurred ({timeout}s)') from exc
+        # wake up readers waiting for output of finished device
+        self._device_read_buffer.notify()
+
+    def _read_from_buffer(self, timeout: float) -> str:
+        """Read data from internal buffer"""
+        data = self._device_read_buffer.get(timeout)
+        if data is None:
+            raise TwisterHarnessTimeoutException(f'Read from device timeout occurred ({timeout}s)')
         return data
 
     def _join_reader_thread(self) -> None:
@@ -228,7 +227,7 @@ class DeviceAdapter(abc.ABC):
 
     def _clear_internal_resources(self) -> None:
         self._reader_thread = None
-        self._device_read_queue = queue.Queue()
+        self._device_read_buffer = LineBuffer()
         self._device_run.clear()
         self._device_connected.clear()
 
@@ -20,6 +20,8 @@ class FifoHandler:
     pipes).
     """
 
+    _READ_SIZE: int = 4096
+
     def __init__(self, fifo_path: str | Path, timeout: float):
         """
         :param fifo_path: path to basic fifo name
@@ -29,6 +31,7 @@ class FifoHandler:
         self._fifo_in_path = str(fifo_path) + '.in'
         self._fifo_out_file: io.FileIO | None = None
         self._fifo_in_file: io.FileIO | None = None
+        self._read_buffer: bytearray = bytearray()
         self._open_fifo_thread: threading.Thread | None = None
         self._opening_monitor_thread: threading.Thread | None = None
         self._fifo_opened: threading.Event = threading.Event()
@@ -97,6 +100,7 @@ class FifoHandler:
             self._opening_monitor_thread.join(timeout=1)
         self._opening_monitor_thread = None
         self._fifo_opened.clear()
+        self._read_buffer.clear()
 
         if self._fifo_out_file:
             self._fifo_out_file.close()
@@ -120,10 +124,37 @@ class FifoHandler:
             return False
 
     def read(self, __size: int = -1) -> bytes:
+        if self._read_buffer:
+            if __size < 0:
+                __size = len(self._read_buffer)
+            data = bytes(self._read_buffer[:__size])
+            del self._read_buffer[:__size]
+            return data
         return self._fifo_out_file.read(__size)  # type: ignore[union-attr]
 
     def readline(self, __size: int | None = None) -> bytes:
-        return self._fifo_out_file.readline(__size)  # type: ignore[union-attr]
+        """
+        Read one line. The FIFO is unbuffered, so instead of reading it byte
+        by byte, all available data is read at once and the remainder is kept
+        for the next calls.
+        """
+        while True:
+            end = self._read_buffer.find(b'\n') + 1
+            if end == 0 and __size is not None and len(self._read_buffer) >= __size:
+                end = __size
+            if end > 0:
+                if __size is not None:
+                    end = min(end, __size)
+                line = bytes(self._read_buffer[:end])
+                del self._read_buffer[:end]
+                return line
+            data = self._fifo_out_file.read(self._READ_SIZE)  # type: ignore[union-attr]
+            if not data:
+                # end of file, return what is left
+                line = bytes(self._read_buffer)
+                self._read_buffer.clear()
+                return line
+            self._read_buffer.extend(data)
 
     def write(self, __buffer: bytes) -> int:
         return self._fifo_in_file.write(__buffer)  # type: ignore[union-attr]
@@ -0,0 +1,89 @@
+# Copyright (c) 2023 Nordic Semiconductor ASA
+#
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import collections
+import re
+import threading
+import time
+from typing import Callable
+
+
+class LineBuffer:
+    """
+    Thread-safe buffer for lines read from a device. Lines are added by the
+    reader thread and a waiting consumer is woken up as soon as new data is
+    available.
+    """
+
+    def __init__(self, maxlen: int | None = None) -> None:
+        """
+        :param maxlen: maximum number of buffered lines, when exceeded the
+            oldest lines are dropped (unlimited by default)
+        """
+        self._lines: collections.deque[str] = collections.deque(maxlen=maxlen)
+        self._condition: threading.Condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def empty(self) -> bool:
+        return not self._lines
+
+    def put(self, line: str) -> None:
+        with self._condition:
+            self._lines.append(line)
+            self._condition.notify_all()
+
+    def notify(self) -> None:
+        """Wake up waiting consumers, e.g. when the device was disconnected."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def get(self, timeout: float | None = None) -> str | None:
+        """Remove and return the oldest line, None if timeout expired."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._lines, timeout):
+                return None
+            return self._lines.popleft()
+
+    def get_all(self) -> list[str]:
+        """Remove and return all buffered lines."""
+        with self._condition:
+            lines = list(self._lines)
+            self._lines.clear()
+        return lines
+
+    def get_until(
+            self,
+            regex: re.Pattern | None,
+            num_of_lines: int | None,
+            timeout: float,
+            is_open: Callable[[], bool],
+    ) -> tuple[list[str], bool]:
+        """
+        Remove and return lines up to and including the first one matching
+        regex, or until num_of_lines lines were collected. All lines buffered
+        so far are scanned at once, then the buffer is waited on for more.
+        Waiting stops when timeout expires or is_open returns false and the
+        buffer is empty.
+
+        :returns: collected lines and whether the condition was met
+        """
+        lines: list[str] = []
+        timeout_time: float = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._lines:
+                    line = self._lines.popleft()
+                    lines.append(line)
+                    if regex and regex.search(line):
+                        return lines, True
+                    if num_of_lines and len(lines) == num_of_lines:
+                        return lines, True
+                remaining = timeout_time - time.monotonic()
+                if remaining <= 0 or not is_open():
+                    return lines, False
+                self._condition.wait(remaining)
@@ -0,0 +1,74 @@
+# Copyright (c) 2023 Nordic Semiconductor ASA
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import re
+import threading
+import time
+
+from twister_harness.device.line_buffer import LineBuffer
+
+
+def test_if_line_buffer_returns_lines_in_order() -> None:
+    buffer = LineBuffer()
+    for line in ['first', 'second', 'third']:
+        buffer.put(line)
+    assert len(buffer) == 3
+    assert buffer.get(0.1) == 'first'
+    assert buffer.get_all() == ['second', 'third']
+    assert buffer.empty()
+    assert buffer.get(0.01) is None
+
+
+def test_if_line_buffer_drops_oldest_lines_when_full() -> None:
+    buffer = LineBuffer(maxlen=2)
+    for line in ['first', 'second', 'third']:
+        buffer.put(line)
+    assert buffer.get_all() == ['second', 'third']
+
+
+def test_if_get_until_scans_buffered_lines() -> None:
+    buffer = LineBuffer()
+    for line in ['uart:~$ help', 'line 1', 'uart:~$', 'line 2']:
+        buffer.put(line)
+    lines, found = buffer.get_until(re.compile(r'uart:~\$$'), None, 0.1, lambda: True)
+    assert found
+    assert lines == ['uart:~$ help', 'line 1', 'uart:~$']
+    lines, found = buffer.get_until(None, 1, 0.1, lambda: True)
+    assert found
+    assert lines == ['line 2']
+
+
+def test_if_get_until_wakes_up_on_new_line() -> None:
+    buffer = LineBuffer()
+
+    def produce() -> None:
+        time.sleep(0.05)
+        buffer.put('not yet')
+        buffer.put('done')
+        buffer.put('after')
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    start = time.monotonic()
+    lines, found = buffer.get_until(re.compile('done'), None, 5.0, lambda: True)
+    elapsed = time.monotonic() - start
+    thread.join()
+    assert found
+    assert lines == ['not yet', 'done']
+    assert elapsed < 1.0
+    assert buffer.get_all() == ['after']
+
+
+def test_if_get_until_stops_on_timeout_or_closed_device() -> None:
+    buffer = LineBuffer()
+    buffer.put('line')
+    lines, found = buffer.get_until(re.compile('done'), None, 0.05, lambda: True)
+    assert not found
+    assert lines == ['line']
+
+    start = time.monotonic()
+    lines, found = buffer.get_until(re.compile('done'), None, 5.0, lambda: False)
+    assert not found
+    assert lines == []
+    assert time.monotonic() - start < 1.0
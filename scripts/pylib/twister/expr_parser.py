@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import copy
+import functools
 import logging
 import os
 import re
@@ -226,10 +227,7 @@ def ast_expr(ast, env, edt):
         return bool(re.match(ast[2], ast_sym(ast[1], env)))
     elif ast[0] == "dt_compat_enabled":
         compat = ast[1][0]
-        for node in edt.nodes:
-            if compat in node.compats and node.status == "okay":
-                return True
-        return False
+        return bool(edt.compat2okay.get(compat))
     elif ast[0] == "dt_alias_exists":
         alias = ast[1][0]
         for node in edt.nodes:
@@ -302,19 +300,22 @@ def ast_handle_dt_enabled_alias_with_parent_compat(edt, alias, compat):
 
 mutex = threading.Lock()
 
+@functools.lru_cache(maxsize=1024)
+def parse_ast(expr_text):
+    """Parse a text representation of an expression in our language.
+    The same expression is usually evaluated for many platforms, so the
+    resulting AST is cached. It must not be modified."""
+
+    # Like it's C counterpart, state machine is not thread-safe
+    with mutex:
+        return parser.parse(expr_text)
+
 def parse(expr_text, env, edt):
     """Given a text representation of an expression in our language,
     use the provided environment to determine whether the expression
     is true or false"""
 
-    # Like it's C counterpart, state machine is not thread-safe
-    mutex.acquire()
-    try:
-        ast = parser.parse(expr_text)
-    finally:
-        mutex.release()
-
-    return ast_expr(ast, env, edt)
+    return ast_expr(parse_ast(expr_text), env, edt)
 
 # Just some test code
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2023 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+@functools.lru_cache(maxsize=65536)
+def _hash_file_cached(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_file(path):
+    """Content hash of a file, None if it cannot be read."""
+    try:
+        st = os.stat(path)
+        return _hash_file_cached(path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def hash_tree(path):
+    """
+    Content hash of all files below path, including their relative paths.
+    Computed once per process, the application sources do not change while
+    twister is running.
+    """
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for name in sorted(filenames):
+            file_path = os.path.join(dirpath, name)
+            h.update(os.path.relpath(file_path, path).encode())
+            h.update((hash_file(file_path) or "").encode())
+    return h.hexdigest()
+
+
+def read_build_inputs(build_dir):
+    """
+    List the Kconfig and devicetree files a build consumed, from the Kconfig
+    file list (zephyr/kconfig/sources.txt) and the devicetree dependency
+    file (zephyr/zephyr.dts.d) generated during the CMake configuration.
+    """
+    inputs = set()
+
+    kconfig_list = os.path.join(build_dir, "zephyr", "kconfig", "sources.txt")
+    if os.path.exists(kconfig_list):
+        with open(kconfig_list, "r") as fp:
+            inputs.update(line.strip() for line in fp if line.strip())
+
+    dts_deps = os.path.join(build_dir, "zephyr", "zephyr.dts.d")
+    if os.path.exists(dts_deps):
+        with open(dts_deps, "r") as fp:
+            # make rule: "target: dep1 dep2 \<newline> dep3 ..."
+            deps = fp.read().split(":", 1)[-1]
+        inputs.update(d for d in deps.split() if d != "\\")
+
+    return sorted(inputs)
+
+
+def read_compiler_deps(build_dir, ninja="ninja"):
+    """
+    List the source and header files the compiler read during a build, from
+    the Ninja dependency log (ninja -t deps). Files in the build directory
+    are left out, they are generated from the other inputs. Returns None if
+    the log cannot be read, e.g. for builds using another generator.
+    """
+    build_dir = os.path.abspath(build_dir)
+    try:
+        out = subprocess.run([ninja, "-C", build_dir, "-t", "deps"],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                             check=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    deps = set()
+    for line in out.splitlines():
+        # "target: #deps N, deps mtime M (VALID)" followed by indented deps
+        if not line.startswith((" ", "\t")):
+            continue
+        path = line.strip()
+        if not os.path.isabs(path):
+            path = os.path.normpath(os.path.join(build_dir, path))
+        if path.startswith(build_dir + os.sep):
+            continue
+        deps.add(path)
+
+    return sorted(deps)
+
+
+class BuildCache:
+    """
+    Local content-addressed cache of build artifacts.
+
+    An entry is stored under <cache_dir>/<key>/ together with a manifest
+    listing the cached files and the content hashes of the files the build
+    consumed: Kconfig and devicetree files and every source and header file
+    the compiler read. An entry is only used if those inputs are unchanged. Entries are evicted least recently used first
+    once the total size exceeds max_size bytes.
+    """
+
+    MANIFEST = "manifest.json"
+    VERSION = 1
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def compute_key(cls, **components):
+        """Build the cache key from JSON serializable components."""
+        data = json.dumps({"version": cls.VERSION, **components}, sort_keys=True)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _load_manifest(self, key):
+        manifest_path = os.path.join(self._entry_dir(key), self.MANIFEST)
+        try:
+            with open(manifest_path, "r") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, key):
+        """Return the manifest of a valid entry for key, None otherwise."""
+        manifest = self._load_manifest(key)
+        if manifest is None:
+            return None
+
+        for path, digest in manifest.get("inputs", {}).items():
+            if hash_file(path) != digest:
+                logger.debug(f"Build cache entry {key} outdated by {path}")
+                return None
+
+        return manifest
+
+    def restore(self, key, build_dir):
+        """
+        Copy the files of a valid entry for key into build_dir. Returns the
+        entry manifest, or None on a cache miss.
+        """
+        manifest = self.lookup(key)
+        if manifest is None:
+            return None
+
+        entry_dir = self._entry_dir(key)
+        try:
+            for name in manifest["files"]:
+                dst = os.path.join(build_dir, name)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(os.path.join(entry_dir, name), dst)
+            # mark entry as recently used
+            os.utime(os.path.join(entry_dir, self.MANIFEST))
+        except OSError as e:
+            # entry evicted by another process in the meantime
+            logger.debug(f"Cannot restore build cache entry {key}: {e}")
+            return None
+
+        return manifest
+
+    def store(self, key, build_dir, files, run_id):
+        """
+        Store files (relative to build_dir) under key. The entry is created in
+        a temporary directory and renamed, so concurrent writers of the same
+        key do not interfere.
+        """
+        entry_dir = self._entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+
+        tmp_dir = f"{entry_dir}.tmp.{os.getpid()}"
+        stored = []
+        size = 0
+        try:
+            for name in files:
+                src = os.path.join(build_dir, name)
+                if not os.path.isfile(src):
+                    continue
+                dst = os.path.join(tmp_dir, name)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(src, dst)
+                stored.append(name)
+                size += os.path.getsize(dst)
+
+            compiler_deps = read_compiler_deps(build_dir)
+            if compiler_deps is None:
+                # without the compiled sources, changes outside of the
+                # application would go unnoticed
+                logger.debug(f"No dependency log in {build_dir}, not caching it")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
+
+            inputs = {}
+            for path in read_build_inputs(build_dir) + compiler_deps:
+                digest = hash_file(path)
+                if digest is None:
+                    # an input we cannot verify later, do not cache this build
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    return
+                inputs[path] = digest
+
+            manifest = {
+                "files": stored,
+                "inputs": inputs,
+                "run_id": run_id,
+                "size": size,
+            }
+            os.makedirs(tmp_dir, exist_ok=True)
+            with open(os.path.join(tmp_dir, self.MANIFEST), "w") as fp:
+                json.dump(manifest, fp)
+
+            os.rename(tmp_dir, entry_dir)
+        except OSError as e:
+            logger.debug(f"Cannot store build cache entry {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_size."""
+        entries = []
+        total = 0
+        for key in os.listdir(self.cache_dir):
+            manifest_path = os.path.join(self._entry_dir(key), self.MANIFEST)
+            try:
+                with open(manifest_path, "r") as fp:
+                    size = json.load(fp).get("size", 0)
+                mtime = os.path.getmtime(manifest_path)
+            except (OSError, ValueError):
+                continue
+            entries.append((mtime, key, size))
+            total += size
+
+        for _, key, size in sorted(entries):
+            if total <= self.max_size:
+                break
+            logger.debug(f"Evicting build cache entry {key}")
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
@@ -5,11 +5,11 @@
 
 import os
 import logging
+import multiprocessing
 import pathlib
 import shutil
 import subprocess
 import glob
-import re
 
 logger = logging.getLogger('twister')
 logger.setLevel(logging.DEBUG)
@@ -36,81 +36,115 @@ class CoverageTool:
         logger.debug(f"Select {tool} as the coverage tool...")
         return t
 
+    # Number of hex digits decoded and written at once
+    HEX_CHUNK_SIZE = 1 << 16
+
     @staticmethod
-    def retrieve_gcov_data(input_file):
-        logger.debug("Working on %s" % input_file)
-        extracted_coverage_info = {}
+    def extract_gcov_data(input_file):
+        """
+        Create the gcda files dumped to a handler.log.
+
+        The log is read line by line and the hex dump of each file is
+        decoded in chunks straight into the file. The files are written
+        under a temporary name and only renamed once the end of the dump is
+        found, so an incomplete dump does not leave gcda files behind.
+
+        @return dict with 'complete', False if the dump is incomplete, and
+            'created', False if a gcda file could not be created
+        """
         capture_data = False
         capture_complete = False
+        gcda_created = True
+        written = {}
         with open(input_file, 'r') as fp:
-            for line in fp.readlines():
-                if re.search("GCOV_COVERAGE_DUMP_START", line):
-                    capture_data = True
+            for line in fp:
+                if not capture_data:
+                    # Loop until the coverage data is found.
+                    if "GCOV_COVERAGE_DUMP_START" in line:
+                        capture_data = True
                     continue
-                if re.search("GCOV_COVERAGE_DUMP_END", line):
+                if "GCOV_COVERAGE_DUMP_END" in line:
                     capture_complete = True
                     break
-                # Loop until the coverage data is found.
-                if not capture_data:
+                if not line.startswith("*"):
                     continue
-                if line.startswith("*"):
-                    sp = line.split("<")
-                    if len(sp) > 1:
-                        # Remove the leading delimiter "*"
-                        file_name = sp[0][1:]
-                        # Remove the trailing new line char
-                        hex_dump = sp[1][:-1]
-                    else:
-                        continue
-                else:
+                # Remove the leading delimiter "*"
+                filename, sep, hex_dump = line[1:].partition("<")
+                if not sep:
                     continue
-                extracted_coverage_info.update({file_name: hex_dump})
+                if not CoverageTool._write_gcda_file(filename, hex_dump.rstrip(), written):
+                    gcda_created = False
+
+        for filename, tmp_filename in written.items():
+            if capture_complete:
+                os.replace(tmp_filename, filename)
+            else:
+                os.remove(tmp_filename)
+
         if not capture_data:
             capture_complete = True
-        return {'complete': capture_complete, 'data': extracted_coverage_info}
+        return {'complete': capture_complete, 'created': gcda_created}
 
     @staticmethod
-    def create_gcda_files(extracted_coverage_info):
-        gcda_created = True
-        logger.debug("Generating gcda files")
-        for filename, hexdump_val in extracted_coverage_info.items():
-            # if kobject_hash is given for coverage gcovr fails
-            # hence skipping it problem only in gcovr v4.1
-            if "kobject_hash" in filename:
-                filename = (filename[:-4]) + "gcno"
-                try:
-                    os.remove(filename)
-                except Exception:
-                    pass
-                continue
-
+    def _write_gcda_file(filename, hex_dump, written):
+        # if kobject_hash is given for coverage gcovr fails
+        # hence skipping it problem only in gcovr v4.1
+        if "kobject_hash" in filename:
+            filename = (filename[:-4]) + "gcno"
             try:
-                with open(filename, 'wb') as fp:
-                    fp.write(bytes.fromhex(hexdump_val))
-            except ValueError:
-                logger.exception("Unable to convert hex data for file: {}".format(filename))
-                gcda_created = False
-            except FileNotFoundError:
-                logger.exception("Unable to create gcda file: {}".format(filename))
-                gcda_created = False
-        return gcda_created
-
-    def generate(self, outdir):
+                os.remove(filename)
+            except Exception:
+                pass
+            return True
+
+        tmp_filename = f"{filename}.tmp"
+        try:
+            with open(tmp_filename, 'wb') as fp:
+                for i in range(0, len(hex_dump), CoverageTool.HEX_CHUNK_SIZE):
+                    fp.write(bytes.fromhex(hex_dump[i:i + CoverageTool.HEX_CHUNK_SIZE]))
+        except ValueError:
+            logger.exception("Unable to convert hex data for file: {}".format(filename))
+            os.remove(tmp_filename)
+            written.pop(filename, None)
+            return False
+        except FileNotFoundError:
+            logger.exception("Unable to create gcda file: {}".format(filename))
+            return False
+
+        written[filename] = tmp_filename
+        return True
+
+    @staticmethod
+    def _extract_gcov_data_from(input_file):
+        return input_file, CoverageTool.extract_gcov_data(input_file)
+
+    def generate(self, outdir, jobs=None):
         coverage_completed = True
-        for filename in glob.glob("%s/**/handler.log" % outdir, recursive=True):
-            gcov_data = self.__class__.retrieve_gcov_data(filename)
-            capture_complete = gcov_data['complete']
-            extracted_coverage_info = gcov_data['data']
-            if capture_complete:
-                gcda_created = self.__class__.create_gcda_files(extracted_coverage_info)
-                if gcda_created:
+        handler_logs = glob.iglob("%s/**/handler.log" % outdir, recursive=True)
+        jobs = jobs or os.cpu_count() or 1
+
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs)
+            results = pool.imap_unordered(CoverageTool._extract_gcov_data_from,
+                                          handler_logs, chunksize=4)
+        else:
+            pool = None
+            results = map(CoverageTool._extract_gcov_data_from, handler_logs)
+
+        try:
+            for filename, gcov_data in results:
+                if not gcov_data['complete']:
+                    logger.error("Gcov data capture incomplete: {}".format(filename))
+                    coverage_completed = False
+                elif gcov_data['created']:
                     logger.debug("Gcov data captured: {}".format(filename))
                 else:
                     logger.error("Gcov data invalid for: {}".format(filename))
                     coverage_completed = False
-            else:
-                logger.error("Gcov data capture incomplete: {}".format(filename))
-                coverage_completed = False
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
 
         with open(os.path.join(outdir, "coverage.log"), "a") as coveragelog:
             ret = self._generate(outdir, coveragelog)
@@ -299,5 +333,5 @@ def run_coverage(testplan, options):
     coverage_tool.add_ignore_file('generated')
     coverage_tool.add_ignore_directory('tests')
     coverage_tool.add_ignore_directory('samples')
-    coverage_completed = coverage_tool.generate(options.outdir)
+    coverage_completed = coverage_tool.generate(options.outdir, options.jobs)
     return coverage_completed
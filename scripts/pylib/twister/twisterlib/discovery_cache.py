@@ -0,0 +1,115 @@
+# vim: set syntax=python ts=4 :
+#
+# Copyright (c) 2023 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import logging
+import os
+import pickle
+
+from twisterlib.config_parser import TwisterConfigParser
+from twisterlib.testsuite import scan_file
+
+logger = logging.getLogger('twister')
+logger.setLevel(logging.DEBUG)
+
+
+class DiscoveryCache:
+    """
+    Persistent cache of testsuite discovery results: the scenarios parsed
+    from testsuite configuration files and the results of scanning source
+    files for test cases. Entries are keyed by file path and reused as long
+    as the modification time and size of the file are unchanged.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, entries=None):
+        """
+        Load the cache from path, unless the entries are given, as in the
+        worker processes of a parallel discovery.
+        """
+        self.path = os.path.abspath(path)
+        self.entries = {}
+        # keys of the entries added or replaced since loading
+        self.updated = set()
+        if entries is None:
+            self.load()
+        else:
+            self.entries = entries
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as fp:
+                data = pickle.load(fp)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring invalid discovery cache {self.path}: {e!r}")
+            return
+
+        if data.get("version") == self.VERSION:
+            self.entries = data["entries"]
+
+    def save(self):
+        """Write the cache back if anything changed, dropping deleted files."""
+        if not self.updated:
+            return
+
+        entries = {key: entry for key, entry in self.entries.items()
+                   if os.path.exists(key[1])}
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "wb") as fp:
+                pickle.dump({"version": self.VERSION, "entries": entries}, fp,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Cannot write discovery cache {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self.updated = set()
+
+    def take_updates(self):
+        """Return the entries updated since the last call."""
+        updates = {key: self.entries[key] for key in self.updated}
+        self.updated = set()
+        return updates
+
+    def update(self, entries):
+        """Add entries returned by take_updates() of another instance."""
+        self.entries.update(entries)
+        self.updated.update(entries)
+
+    def _get(self, kind, path, compute):
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = (kind, path)
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        value = compute(path)
+        self.entries[key] = (stamp, value)
+        self.updated.add(key)
+        return value
+
+    def scan_file(self, path):
+        """Cached scan_file()."""
+        return self._get("scan", path, scan_file)
+
+    def load_scenarios(self, path, schema):
+        """
+        Parse a testsuite configuration file, return a dictionary of its
+        scenarios with the common configuration merged in.
+        """
+        def parse(path):
+            parsed_data = TwisterConfigParser(path, schema)
+            parsed_data.load()
+            return {name: parsed_data.get_scenario(name)
+                    for name in parsed_data.scenarios.keys()}
+
+        return self._get("scenarios", path, parse)
@@ -94,6 +94,23 @@ Artificially long but functional example:
         action="store",
         help="Load list of tests and platforms to be run from file.")
 
+    case_select.add_argument(
+        "--plan-only",
+        metavar="FILENAME",
+        action="store",
+        help="""Discover and filter the testsuites, save the resulting test
+        plan to FILENAME and exit. Use --load-plan to run the plan, e.g. in
+        several jobs, each one running its own --subset of it.""")
+
+    case_select.add_argument(
+        "--load-plan",
+        metavar="FILENAME",
+        action="store",
+        help="""Run the test plan saved with --plan-only instead of
+        discovering and filtering the testsuites. Test selection options given
+        when generating the plan apply, --subset is applied to the loaded
+        plan.""")
+
     case_select.add_argument(
         "-T", "--testsuite-root", action="append", default=[],
         help="Base directory to recursively search for test cases. All "
@@ -267,6 +284,14 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
              "This option is useful when running a large number of tests on "
              "different hosts to speed up execution time.")
 
+    parser.add_argument(
+        "--balanced-subsets", action="store_true",
+        help="""With --subset, split the tests into subsets of equal expected
+        build and run time instead of an equal number of tests. Times are
+        taken from --durations-file, or estimated for tests without recorded
+        times. All jobs must use the same durations file, the twister.json
+        report of the previous run in the output directory is not used.""")
+
     parser.add_argument(
         "--shuffle-tests", action="store_true", default=None,
         help="""Shuffle test execution order to get randomly distributed tests across subsets.
@@ -287,6 +312,22 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
         help="Cleaning the output directory will simply delete it instead "
              "of the default policy of renaming.")
 
+    parser.add_argument(
+        "--build-cache", metavar="DIR", action="store", default=None,
+        help="""Reuse build artifacts from a local cache directory. A build is
+        looked up by a hash of the application sources, the merged extra
+        arguments and configuration, filter, platform, toolchain and Zephyr
+        revision, and is only reused if the Kconfig and devicetree files and
+        all source and header files it was compiled from are unchanged. A
+        cache hit skips both cmake and the build. Only Ninja builds of
+        build-only instances and tests running a host binary directly
+        (native and unit) are cached.""")
+
+    parser.add_argument(
+        "--build-cache-size", type=int, default=10240, metavar="MB",
+        help="Maximum size of the --build-cache directory in MB, least "
+             "recently used builds are removed above it. Default is 10240.")
+
     parser.add_argument(
         "--cmake-only", action="store_true",
         help="Only run cmake, do not build or run.")
@@ -327,6 +368,13 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
                         dest="enable_asserts",
                         help="deprecated, left for compatibility")
 
+    parser.add_argument(
+        "--discovery-cache", metavar="FILE", action="store", default=None,
+        help="""Keep the parsed testsuite configuration files and the results
+        of scanning the testsuite sources for test cases in FILE, and reuse
+        them in later runs for files whose modification time and size did
+        not change.""")
+
     parser.add_argument(
         "--disable-unrecognized-section-test", action="store_true",
         default=False,
@@ -338,6 +386,15 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
              "of Ztest test. This option could be useful for tests or "
              "platforms, which from some reasons cannot print early logs.")
 
+    parser.add_argument(
+        "--durations-file", metavar="FILENAME", action="store",
+        help="""Use the build and execution times recorded in this twister.json
+        report to start the test instances expected to take longest first.
+        Defaults to the twister.json report of the previous run in the output
+        directory. Instances without recorded times are ranked by an estimate
+        based on sysbuild usage, architecture and application source size.
+        """)
+
     parser.add_argument("-e", "--exclude-tag", action="append",
                         help="Specify tags of tests that should not run. "
                              "Default is to run all tests with all tags.")
@@ -550,6 +607,12 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
                         default=True,
                         help="deprecated, left for compatibility")
 
+    parser.add_argument(
+        "--report-log-paths", action="store_true",
+        help="""Reference the log files of failed test suites by path in the
+        JSON and xunit reports instead of embedding their content.
+        """)
+
     parser.add_argument(
         "--report-name",
         help="""Create a report with a custom name.
@@ -573,6 +636,21 @@ structure in the main Zephyr tree: boards/<arch>/<board_name>/""")
         "--retry-build-errors", action="store_true",
         help="Retry build errors as well.")
 
+    parser.add_argument(
+        "--scheduler", choices=['manager', 'local'], default='manager',
+        help="""Select how tasks are distributed to the worker processes.
+        'manager' (the default) keeps the whole pipeline in a shared queue
+        served by a separate manager process, so every operation of every
+        test instance is passed through it. 'local' only sends lightweight
+        tokens (instance name and first operation) to the workers over a
+        pipe; each worker then runs the remaining operations of an instance
+        on its own local queue and returns the instance once it is reported.
+        The 'local' workers are started once and kept across --retry-failed
+        iterations, so their imports and in-process caches stay warm. This
+        only applies to 'local', the default is still 'manager', which starts
+        new worker processes for every iteration.
+        """)
+
     parser.add_argument(
         "-S", "--enable-slow", action="store_true",
         default="--enable-slow-only" in sys.argv,
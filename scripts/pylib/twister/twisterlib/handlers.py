@@ -5,13 +5,15 @@
 # Copyright 2022 NXP
 # SPDX-License-Identifier: Apache-2.0
 
+import collections
 import csv
 import logging
 import math
 import os
 import psutil
+import queue
 import re
-import select
+import selectors
 import shlex
 import signal
 import subprocess
@@ -64,6 +66,73 @@ def terminate_process(proc):
     proc.kill()
 
 
+class LineReader:
+    """
+    Read lines from a pipe with a timeout. Output is read in chunks of up to
+    CHUNK_SIZE bytes as soon as it is available and split into lines here,
+    so a chatty process costs one read per chunk instead of one per line.
+    On Windows, where pipes cannot be polled, a single helper thread does
+    the blocking reads.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, fileobj):
+        self.fd = fileobj.fileno()
+        self.buffer = b""
+        self.lines = collections.deque()
+        self.eof = False
+        if os.name == "nt":
+            self.selector = None
+            self.chunks = queue.Queue()
+            threading.Thread(target=self._read_chunks, daemon=True).start()
+        else:
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.fd, selectors.EVENT_READ)
+
+    def _read_chunks(self):
+        while True:
+            data = os.read(self.fd, self.CHUNK_SIZE)
+            self.chunks.put(data)
+            if not data:
+                break
+
+    def _read_chunk(self, timeout):
+        if self.selector is None:
+            try:
+                return self.chunks.get(timeout=timeout)
+            except queue.Empty:
+                return None
+        if not self.selector.select(timeout):
+            return None
+        return os.read(self.fd, self.CHUNK_SIZE)
+
+    def readline(self, timeout):
+        """
+        Return the next line, including its line ending. A last line without
+        line ending is returned at end of file, b"" after that. Returns None
+        if no complete line arrived within timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.lines:
+            if self.eof:
+                line, self.buffer = self.buffer, b""
+                return line
+            data = self._read_chunk(max(deadline - time.monotonic(), 0))
+            if data is None:
+                return None
+            if not data:
+                self.eof = True
+                continue
+            *lines, self.buffer = (self.buffer + data).split(b"\n")
+            self.lines.extend(line + b"\n" for line in lines)
+        return self.lines.popleft()
+
+    def close(self):
+        if self.selector is not None:
+            self.selector.close()
+
+
 class Handler:
     def __init__(self, instance, type_str="build"):
         """Constructor
@@ -173,7 +242,6 @@ class BinaryHandler(Handler):
         self.call_west_flash = False
         self.seed = None
         self.extra_test_args = None
-        self.line = b""
 
     def try_kill_process_by_pid(self):
         if self.pid_fn:
@@ -185,12 +253,10 @@ class BinaryHandler(Handler):
             except ProcessLookupError:
                 pass
 
-    def _output_reader(self, proc):
-        self.line = proc.stdout.readline()
-
     def _output_handler(self, proc, harness):
         suffix = '\\r\\n'
 
+        reader = LineReader(proc.stdout)
         with open(self.log, "wt") as log_out_fp:
             timeout_extended = False
             timeout_time = time.time() + self.get_test_timeout()
@@ -198,18 +264,18 @@ class BinaryHandler(Handler):
                 this_timeout = timeout_time - time.time()
                 if this_timeout < 0:
                     break
-                reader_t = threading.Thread(target=self._output_reader, args=(proc,), daemon=True)
-                reader_t.start()
-                reader_t.join(this_timeout)
-                if not reader_t.is_alive() and self.line != b"":
-                    line_decoded = self.line.decode('utf-8', "replace")
+                line = reader.readline(this_timeout)
+                if line:
+                    line_decoded = line.decode('utf-8', "replace")
                     if line_decoded.endswith(suffix):
                         stripped_line = line_decoded[:-len(suffix)].rstrip()
                     else:
                         stripped_line = line_decoded.rstrip()
                     logger.debug("OUTPUT: %s", stripped_line)
                     log_out_fp.write(line_decoded)
-                    log_out_fp.flush()
+                    # flush once all output read so far is handled
+                    if not reader.lines:
+                        log_out_fp.flush()
                     harness.handle(stripped_line)
                     if harness.state:
                         if not timeout_extended or harness.capture_coverage:
@@ -219,8 +285,8 @@ class BinaryHandler(Handler):
                             else:
                                 timeout_time = time.time() + 2
                 else:
-                    reader_t.join(0)
                     break
+            reader.close()
             try:
                 # POSIX arch based ztests end on their own,
                 # so let's give it up to 100ms to do so
@@ -351,12 +417,16 @@ class SimulationHandler(BinaryHandler):
 
 class DeviceHandler(Handler):
 
+    # Seconds a read of the serial port blocks for when there is no input
+    SERIAL_READ_TIMEOUT = 0.1
+
     def __init__(self, instance, type_str):
         """Constructor
 
         @param instance Test Instance
         """
         super().__init__(instance, type_str)
+        self.dut_pool = None
 
     def get_test_timeout(self):
         timeout = super().get_test_timeout()
@@ -376,90 +446,58 @@ class DeviceHandler(Handler):
 
         # Clear serial leftover.
         ser.reset_input_buffer()
+        # Block in read() while the device is silent, but wake up regularly
+        # to check halt_event.
+        ser.timeout = self.SERIAL_READ_TIMEOUT
 
-        while ser.isOpen():
+        pending = b""
+        done = False
+        while not done and ser.isOpen():
             if halt_event.is_set():
                 logger.debug('halted')
                 ser.close()
                 break
 
             try:
-                if not ser.in_waiting:
-                    # no incoming bytes are waiting to be read from
-                    # the serial input buffer, let other threads run
-                    time.sleep(0.001)
-                    continue
-            # maybe the serial port is still in reset
-            # check status may cause error
-            # wait for more time
-            except OSError:
-                time.sleep(0.001)
-                continue
+                # wait for the first byte, then take all bytes already received
+                data = ser.read(1)
+                if data and ser.in_waiting:
+                    data += ser.read(ser.in_waiting)
             except TypeError:
                 # This exception happens if the serial port was closed and
                 # its file descriptor cleared in between of ser.isOpen()
-                # and ser.in_waiting checks.
+                # and reading.
                 logger.debug("Serial port is already closed, stop reading.")
                 break
+            # maybe the serial port is still in reset, or SerialException
+            # during the serial device power off/on process, wait for more
+            # time
+            except (OSError, serial.SerialException):
+                time.sleep(self.SERIAL_READ_TIMEOUT)
+                continue
 
-            serial_line = None
-            try:
-                serial_line = ser.readline()
-            except TypeError:
-                pass
-            # ignore SerialException which may happen during the serial device
-            # power off/on process.
-            except serial.SerialException:
-                pass
+            if not data:
+                continue
 
-            # Just because ser_fileno has data doesn't mean an entire line
-            # is available yet.
-            if serial_line:
-                sl = serial_line.decode('utf-8', 'ignore').lstrip()
+            lines = (pending + data).split(b"\n")
+            # keep the incomplete last line for the next read
+            pending = lines.pop()
+            for line in lines:
+                sl = (line + b"\n").decode('utf-8', 'ignore').lstrip()
                 logger.debug("DEVICE: {0}".format(sl.rstrip()))
 
                 log_out_fp.write(sl.encode('utf-8'))
-                log_out_fp.flush()
                 harness.handle(sl.rstrip())
 
-            if harness.state:
-                if not harness.capture_coverage:
-                    ser.close()
-                    break
+                if harness.state:
+                    if not harness.capture_coverage:
+                        ser.close()
+                        done = True
+                        break
+            log_out_fp.flush()
 
         log_out_fp.close()
 
-    def device_is_available(self, instance):
-        device = instance.platform.name
-        fixture = instance.testsuite.harness_config.get("fixture")
-        dut_found = False
-
-        for d in self.duts:
-            if fixture and fixture not in d.fixtures:
-                continue
-            if d.platform != device or (d.serial is None and d.serial_pty is None):
-                continue
-            dut_found = True
-            d.lock.acquire()
-            avail = False
-            if d.available:
-                d.available = 0
-                d.counter += 1
-                avail = True
-            d.lock.release()
-            if avail:
-                return d
-
-        if not dut_found:
-            raise TwisterException(f"No device to serve as {device} platform.")
-
-        return None
-
-    def make_device_available(self, serial):
-        for d in self.duts:
-            if serial in [d.serial_pty, d.serial]:
-                d.available = 1
-
     @staticmethod
     def run_custom_script(script, timeout):
         with subprocess.Popen(script, stderr=subprocess.PIPE, stdout=subprocess.PIPE) as proc:
@@ -561,28 +599,25 @@ class DeviceHandler(Handler):
                 ser_pty_process.terminate()
                 outs, errs = ser_pty_process.communicate()
                 logger.debug("Process {} terminated outs: {} errs {}".format(serial_pty, outs, errs))
-
-            if serial_pty:
-                self.make_device_available(serial_pty)
-            else:
-                self.make_device_available(serial_device)
             raise
 
         return ser
 
     def get_hardware(self):
         hardware = None
+        fixture = self.instance.testsuite.harness_config.get("fixture")
         try:
-            hardware = self.device_is_available(self.instance)
-            while not hardware:
-                time.sleep(1)
-                hardware = self.device_is_available(self.instance)
+            hardware, wait_time = self.dut_pool.acquire(self.instance.platform.name, fixture)
+            self.instance.dut_wait_time = wait_time
         except TwisterException as error:
             self.instance.status = "failed"
             self.instance.reason = str(error)
             logger.error(self.instance.reason)
         return hardware
 
+    def release_hardware(self, hardware):
+        self.dut_pool.release(hardware)
+
     def _get_serial_device(self, serial_pty, hardware_serial):
         ser_pty_process = None
         if serial_pty:
@@ -646,6 +681,7 @@ class DeviceHandler(Handler):
                 ser_pty_process
             )
         except serial.SerialException:
+            self.release_hardware(hardware)
             return
 
         halt_monitor_evt = threading.Event()
@@ -724,10 +760,7 @@ class DeviceHandler(Handler):
         if post_script:
             self.run_custom_script(post_script, 30)
 
-        if serial_pty:
-            self.make_device_available(serial_pty)
-        else:
-            self.make_device_available(serial_device)
+        self.release_hardware(hardware)
 
 
 class QEMUHandler(Handler):
@@ -841,11 +874,9 @@ class QEMUHandler(Handler):
 
         start_time = time.time()
         timeout_time = start_time + timeout
-        p = select.poll()
-        p.register(in_fp, select.POLLIN)
+        reader = LineReader(in_fp)
         out_state = None
 
-        line = ""
         timeout_extended = False
 
         pid = 0
@@ -853,13 +884,14 @@ class QEMUHandler(Handler):
             pid = int(open(pid_fn).read())
 
         while True:
-            this_timeout = int((timeout_time - time.time()) * 1000)
-            if this_timeout < 0 or not p.poll(this_timeout):
+            this_timeout = timeout_time - time.time()
+            line = reader.readline(this_timeout) if this_timeout >= 0 else None
+            if line is None:
                 try:
                     if pid and this_timeout > 0:
-                        # there's possibility we polled nothing because
+                        # there's possibility we read nothing because
                         # of not enough CPU time scheduled by host for
-                        # QEMU process during p.poll(this_timeout)
+                        # QEMU process during this_timeout
                         cpu_time = QEMUHandler._get_cpu_time(pid)
                         if cpu_time < timeout and not out_state:
                             timeout_time = time.time() + (timeout - cpu_time)
@@ -876,24 +908,27 @@ class QEMUHandler(Handler):
                 pid = int(open(pid_fn).read())
 
             try:
-                c = in_fp.read(1).decode("utf-8")
+                # lines are split on b"\n", which never occurs inside a
+                # multi-byte UTF-8 sequence, so each line decodes on its own
+                line = line.decode("utf-8")
             except UnicodeDecodeError:
                 # Test is writing something weird, fail
                 out_state = "unexpected byte"
                 break
 
-            if c == "":
-                # EOF, this shouldn't happen unless QEMU crashes
+            if not line.endswith("\n"):
+                # EOF, this shouldn't happen unless QEMU crashes. A last
+                # line without line ending is dropped, it never reaches the
+                # log or the harness.
                 if not ignore_unexpected_eof:
                     out_state = "unexpected eof"
                 break
-            line = line + c
-            if c != "\n":
-                continue
 
             # line contains a full line of data output from QEMU
             log_out_fp.write(line)
-            log_out_fp.flush()
+            # flush once all output read so far is handled
+            if not reader.lines:
+                log_out_fp.flush()
             line = line.rstrip()
             logger.debug(f"QEMU ({pid}): {line}")
 
@@ -916,8 +951,8 @@ class QEMUHandler(Handler):
                         timeout_time = time.time() + 30
                     else:
                         timeout_time = time.time() + 2
-            line = ""
 
+        reader.close()
         handler_time = time.time() - start_time
         logger.debug(f"QEMU ({pid}) complete ({out_state}) after {handler_time} seconds")
 
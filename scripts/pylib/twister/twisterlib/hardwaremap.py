@@ -5,8 +5,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
-from multiprocessing import Lock, Value
+from multiprocessing import Array, Condition, Lock, Value
 import re
+import time
 
 import platform
 import yaml
@@ -16,6 +17,7 @@ from pathlib import Path
 from natsort import natsorted
 
 from twisterlib.environment import ZEPHYR_BASE
+from twisterlib.error import TwisterException
 
 try:
     # Use the C LibYAML parser if available, rather than the Python parser.
@@ -57,6 +59,7 @@ class DUT(object):
         self.serial_pty = serial_pty
         self._counter = Value("i", 0)
         self._available = Value("i", 1)
+        self._busy_time = Value("d", 0)
         self.connected = connected
         self.pre_script = pre_script
         self.id = id
@@ -94,9 +97,20 @@ class DUT(object):
         with self._counter.get_lock():
             self._counter.value = value
 
+    @property
+    def busy_time(self):
+        """Seconds this DUT was allocated to test instances."""
+        with self._busy_time.get_lock():
+            return self._busy_time.value
+
+    @busy_time.setter
+    def busy_time(self, value):
+        with self._busy_time.get_lock():
+            self._busy_time.value = value
+
     def to_dict(self):
         d = {}
-        exclude = ['_available', '_counter', 'match']
+        exclude = ['_available', '_counter', '_busy_time', 'match']
         v = vars(self)
         for k in v.keys():
             if k not in exclude and v[k]:
@@ -107,6 +121,113 @@ class DUT(object):
     def __repr__(self):
         return f"<{self.platform} ({self.product}) on {self.serial}>"
 
+class DUTPool:
+    """
+    Allocates the DUTs of a hardware map to test instances.
+
+    A test instance waiting for a DUT sleeps on a condition variable and is
+    woken up when a DUT is released, instead of polling. Each waiter takes a
+    ticket and a DUT is given to the waiter with the lowest ticket among
+    those which can use it, so waiters are served in FIFO order without
+    blocking waiters for other platforms or fixtures.
+
+    The state is kept in shared memory, so the pool must be created before
+    the twister worker processes are started.
+    """
+
+    def __init__(self, duts, max_waiters):
+        """
+        @param duts DUTs of the hardware map
+        @param max_waiters Maximum number of concurrent waiters, the number
+            of worker processes
+        """
+        self.duts = duts
+        self.cond = Condition()
+        self._next_ticket = Value("q", 1, lock=False)
+        # Ticket of the waiter in each slot, 0 if the slot is free
+        self._tickets = Array("q", max_waiters, lock=False)
+        # For each slot, which DUTs the waiter can use
+        self._wants = Array("b", max_waiters * len(duts), lock=False)
+        self._acquired_at = Array("d", len(duts), lock=False)
+        # Per process cache of the DUTs matching (platform, fixture)
+        self._candidates = {}
+
+    def candidates(self, platform, fixture=None):
+        key = (platform, fixture)
+        if key not in self._candidates:
+            self._candidates[key] = [
+                i for i, d in enumerate(self.duts)
+                if d.platform == platform
+                and (d.serial is not None or d.serial_pty is not None)
+                and (not fixture or fixture in d.fixtures)
+            ]
+        return self._candidates[key]
+
+    def _take_slot(self, candidates):
+        while True:
+            for slot, ticket in enumerate(self._tickets):
+                if ticket == 0:
+                    self._tickets[slot] = self._next_ticket.value
+                    self._next_ticket.value += 1
+                    base = slot * len(self.duts)
+                    for i in candidates:
+                        self._wants[base + i] = 1
+                    return slot
+            self.cond.wait()
+
+    def _free_slot(self, slot):
+        self._tickets[slot] = 0
+        base = slot * len(self.duts)
+        for i in range(len(self.duts)):
+            self._wants[base + i] = 0
+
+    def _find_available(self, slot, candidates):
+        ticket = self._tickets[slot]
+        for i in candidates:
+            if not self.duts[i].available:
+                continue
+            # leave the DUT to a waiter which was there first
+            if any(0 < other < ticket and self._wants[s * len(self.duts) + i]
+                   for s, other in enumerate(self._tickets)):
+                continue
+            return i
+        return None
+
+    def acquire(self, platform, fixture=None):
+        """
+        Wait for a DUT of the platform, with the fixture if given. Returns
+        the DUT and the time waited for it in seconds.
+        """
+        candidates = self.candidates(platform, fixture)
+        if not candidates:
+            raise TwisterException(f"No device to serve as {platform} platform.")
+
+        start_time = time.monotonic()
+        with self.cond:
+            slot = self._take_slot(candidates)
+            try:
+                while (index := self._find_available(slot, candidates)) is None:
+                    self.cond.wait()
+            finally:
+                self._free_slot(slot)
+                # waiters behind this one may be able to proceed now
+                self.cond.notify_all()
+
+            dut = self.duts[index]
+            dut.available = 0
+            dut.counter += 1
+            self._acquired_at[index] = time.monotonic()
+
+        return dut, self._acquired_at[index] - start_time
+
+    def release(self, dut):
+        index = next(i for i, d in enumerate(self.duts) if d is dut)
+        with self.cond:
+            dut.busy_time += time.monotonic() - self._acquired_at[index]
+            dut.available = 1
+            self.cond.notify_all()
+
+
 class HardwareMap:
     schema_path = os.path.join(ZEPHYR_BASE, "scripts", "schemas", "twister", "hwmap-schema.yaml")
 
@@ -199,13 +320,31 @@ class HardwareMap:
     def summary(self, selected_platforms):
         print("\nHardware distribution summary:\n")
         table = []
-        header = ['Board', 'ID', 'Counter']
+        header = ['Board', 'ID', 'Counter', 'Busy time [s]']
         for d in self.duts:
             if d.connected and d.platform in selected_platforms:
-                row = [d.platform, d.id, d.counter]
+                row = [d.platform, d.id, d.counter, round(d.busy_time, 1)]
                 table.append(row)
         print(tabulate(table, headers=header, tablefmt="github"))
 
+    def utilization(self, selected_platforms, duration):
+        """
+        Usage of the connected DUTs of the selected platforms, busy_time
+        relative to the duration of the run in seconds.
+        """
+        usage = []
+        for d in self.duts:
+            if d.connected and d.platform in selected_platforms:
+                usage.append({
+                    "id": d.id,
+                    "platform": d.platform,
+                    "serial": d.serial or d.serial_pty,
+                    "counter": d.counter,
+                    "busy_time": round(d.busy_time, 2),
+                    "utilization": round(d.busy_time / duration, 4) if duration > 0 else 0,
+                })
+        return usage
+
 
     def add_device(self, serial, platform, pre_script, is_pty, baud=None, flash_timeout=60, flash_with_test=False):
         device = DUT(platform=platform, connected=True, pre_script=pre_script, serial_baud=baud,
@@ -32,6 +32,7 @@ class Harness:
     RUN_PASSED = "PROJECT EXECUTION SUCCESSFUL"
     RUN_FAILED = "PROJECT EXECUTION FAILED"
     run_id_pattern = r"RunID: (?P<run_id>.*)"
+    run_id_re = re.compile(run_id_pattern)
 
 
     ztest_to_status = {
@@ -62,7 +63,8 @@ class Harness:
         self.matched_run_id = False
         self.run_id_exists = False
         self.instance: TestInstance | None = None
-        self.testcase_output = ""
+        # lines of output of the running testcase
+        self.testcase_output = []
         self._match = False
 
     def configure(self, instance):
@@ -80,9 +82,12 @@ class Harness:
             self.ordered = config.get('ordered', True)
             self.record = config.get('record', {})
 
+    def get_testcase_output(self):
+        return "".join(f"{line}\n" for line in self.testcase_output)
+
     def process_test(self, line):
 
-        runid_match = re.search(self.run_id_pattern, line)
+        runid_match = "RunID: " in line and self.run_id_re.search(line)
         if runid_match:
             run_id = runid_match.group("run_id")
             self.run_id_exists = True
@@ -170,6 +175,8 @@ class Console(Harness):
             for r in self.regex:
                 self.patterns.append(re.compile(r))
             self.patterns_expected = len(self.patterns)
+        if self.record:
+            self.record_pattern = re.compile(self.record.get("regex", ""))
 
     def handle(self, line):
         if self.type == "one_line":
@@ -205,8 +212,7 @@ class Console(Harness):
 
 
         if self.record:
-            pattern = re.compile(self.record.get("regex", ""))
-            match = pattern.search(line)
+            match = self.record_pattern.search(line)
             if match:
                 csv = []
                 if not self.fieldnames:
@@ -249,7 +255,7 @@ class Pytest(Harness):
         self.source_dir = instance.testsuite.source_dir
         self.report_file = os.path.join(self.running_dir, 'report.xml')
         self.pytest_log_file_path = os.path.join(self.running_dir, 'twister_harness.log')
-        self.reserved_serial = None
+        self.reserved_dut = None
 
     def pytest_run(self, timeout):
         try:
@@ -260,8 +266,9 @@ class Pytest(Harness):
             self.state = 'failed'
             self.instance.reason = str(pytest_exception)
         finally:
-            if self.reserved_serial:
-                self.instance.handler.make_device_available(self.reserved_serial)
+            if self.reserved_dut:
+                self.instance.handler.release_hardware(self.reserved_dut)
+                self.reserved_dut = None
         self._update_test_status()
 
     def generate_command(self):
@@ -311,7 +318,7 @@ class Pytest(Harness):
         if not hardware:
             raise PytestHarnessException('Hardware is not available')
 
-        self.reserved_serial = hardware.serial_pty or hardware.serial
+        self.reserved_dut = hardware
         if hardware.serial_pty:
             command.append(f'--device-serial-pty={hardware.serial_pty}')
         else:
@@ -491,7 +498,7 @@ class Gtest(Harness):
             tc = self.instance.get_case_or_create(name)
             self.tc = tc
             self.tc.status = "started"
-            self.testcase_output += line + "\n"
+            self.testcase_output.append(line)
             self._match = True
 
         # Check if the test run finished
@@ -525,8 +532,8 @@ class Gtest(Harness):
         tc.status = state
         if tc.status == "failed":
             self.has_failures = True
-            tc.output = self.testcase_output
-        self.testcase_output = ""
+            tc.output = self.get_testcase_output()
+        self.testcase_output = []
         self._match = False
 
     def _check_result(self, line):
@@ -544,14 +551,19 @@ class Test(Harness):
     RUN_FAILED = "PROJECT EXECUTION FAILED"
     test_suite_start_pattern = r"Running TESTSUITE (?P<suite_name>.*)"
     ZTEST_START_PATTERN = r"START - (test_)?(.*)"
+    test_suite_start_re = re.compile(test_suite_start_pattern)
+    ztest_start_re = re.compile(ZTEST_START_PATTERN)
 
     def handle(self, line):
-        test_suite_match = re.search(self.test_suite_start_pattern, line)
+        # Most lines are plain console output, check for the literal part
+        # of each pattern before running the regular expression.
+        test_suite_match = ("Running TESTSUITE " in line
+                            and self.test_suite_start_re.search(line))
         if test_suite_match:
             suite_name = test_suite_match.group("suite_name")
             self.detected_suite_names.append(suite_name)
 
-        testcase_match = re.search(self.ZTEST_START_PATTERN, line)
+        testcase_match = "START - " in line and self.ztest_start_re.search(line)
         if testcase_match:
             name = "{}.{}".format(self.id, testcase_match.group(2))
             tc = self.instance.get_case_or_create(name)
@@ -561,10 +573,10 @@ class Test(Harness):
             tc.status = "started"
 
         if testcase_match or self._match:
-            self.testcase_output += line + "\n"
+            self.testcase_output.append(line)
             self._match = True
 
-        result_match = result_re.match(line)
+        result_match = " - " in line and result_re.match(line)
 
         if result_match:
             matched_status = result_match.group(1)
@@ -575,8 +587,8 @@ class Test(Harness):
                 tc.reason = "ztest skip"
             tc.duration = float(result_match.group(4))
             if tc.status == "failed":
-                tc.output = self.testcase_output
-            self.testcase_output = ""
+                tc.output = self.get_testcase_output()
+            self.testcase_output = []
             self._match = False
             self.ztest = True
 
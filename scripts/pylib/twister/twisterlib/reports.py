@@ -10,11 +10,14 @@ import logging
 from colorama import Fore
 import xml.etree.ElementTree as ET
 import string
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger('twister')
 logger.setLevel(logging.DEBUG)
 
+# Bytes removed from the logs embedded in reports, all but string.printable
+NON_PRINTABLE_BYTES = bytes(c for c in range(256) if chr(c) not in string.printable)
+
 class Reporting:
 
     def __init__(self, plan, env) -> None:
@@ -26,17 +29,58 @@ class Reporting:
         self.env = env
         self.timestamp = datetime.now().isoformat()
         self.outdir = os.path.abspath(env.options.outdir)
+        # (path, mtime, data, suites by platform) of the last JSON report read
+        self._json_report = (None, None, None, None)
 
     @staticmethod
     def process_log(log_file):
+        """Read a log, keeping only the characters in string.printable."""
         filtered_string = ""
         if os.path.exists(log_file):
             with open(log_file, "rb") as f:
-                log = f.read().decode("utf-8")
-                filtered_string = ''.join(filter(lambda x: x in string.printable, log))
+                log = f.read()
+            # Multi-byte UTF-8 characters are not printable ASCII, all their
+            # bytes are removed.
+            filtered_string = log.translate(None, NON_PRINTABLE_BYTES).decode("ascii")
 
         return filtered_string
 
+    def _load_json_report(self, json_file):
+        """
+        Load a JSON report, with its test suites grouped by platform. The
+        last report loaded is kept, as the xunit reports are all generated
+        from the same file.
+        """
+        mtime = os.stat(json_file).st_mtime_ns
+        if self._json_report[:2] != (json_file, mtime):
+            with open(json_file, "r") as json_results:
+                json_data = json.load(json_results)
+            by_platform = {}
+            for suite in json_data.get("testsuites", []):
+                by_platform.setdefault(suite['platform'], []).append(suite)
+            self._json_report = (json_file, mtime, json_data, by_platform)
+
+        return self._json_report[2:]
+
+    @staticmethod
+    def _write_xunit(filename, testsuites):
+        """Write an xunit report, serializing one testsuite element at a time."""
+        with open(filename, 'wb') as report:
+            empty = True
+            for eleTestsuite in testsuites:
+                if empty:
+                    report.write(b"<testsuites>")
+                    empty = False
+                report.write(ET.tostring(eleTestsuite))
+            report.write(b"<testsuites />" if empty else b"</testsuites>")
+
+    @staticmethod
+    def _json_dumps(value, level):
+        """Serialize value as json.dump(indent=4) does at the nesting level."""
+        text = json.dumps(value, indent=4, separators=(',',':'))
+        # JSON strings cannot contain a raw new line
+        return text.replace("\n", "\n" + " " * 4 * level)
+
 
     @staticmethod
     def xunit_testcase(eleTestsuite, name, classname, status, ts_status, reason, duration, runnable, stats, log, build_only_as_skip):
@@ -87,15 +131,11 @@ class Reporting:
     # Generate a report with all testsuites instead of doing this per platform
     def xunit_report_suites(self, json_file, filename):
 
-        json_data = {}
-        with open(json_file, "r") as json_results:
-            json_data = json.load(json_results)
-
+        json_data, _ = self._load_json_report(json_file)
 
         env = json_data.get('environment', {})
         version = env.get('zephyr_version', None)
 
-        eleTestsuites = ET.Element('testsuites')
         all_suites = json_data.get("testsuites", [])
 
         suites_to_report = all_suites
@@ -103,50 +143,51 @@ class Reporting:
         if not self.env.options.detailed_skipped_report:
             suites_to_report = list(filter(lambda d: d.get('status') != "filtered", all_suites))
 
-        for suite in suites_to_report:
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=suite.get("name"), time="0",
-                                            timestamp = self.timestamp,
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-            ET.SubElement(eleTSPropetries, 'property', name="platform", value=suite.get("platform"))
-            ET.SubElement(eleTSPropetries, 'property', name="architecture", value=suite.get("arch"))
-
-            total = 0
-            fails = passes = errors = skips = 0
-            handler_time = suite.get('execution_time', 0)
-            runnable = suite.get('runnable', 0)
-            duration += float(handler_time)
-            ts_status = suite.get('status')
-            for tc in suite.get("testcases", []):
-                status = tc.get('status')
-                reason = tc.get('reason', suite.get('reason', 'Unknown'))
-                log = tc.get("log", suite.get("log"))
-
-                tc_duration = tc.get('execution_time', handler_time)
-                name = tc.get("identifier")
-                classname = ".".join(name.split(".")[:2])
-                fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                    name, classname, status, ts_status, reason, tc_duration, runnable,
-                    (fails, passes, errors, skips), log, True)
-
-            total = errors + passes + fails + skips
-
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
-
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
+        def testsuites():
+            for suite in suites_to_report:
+                duration = 0
+                eleTestsuite = ET.Element('testsuite',
+                                          name=suite.get("name"), time="0",
+                                          timestamp = self.timestamp,
+                                          tests="0",
+                                          failures="0",
+                                          errors="0", skipped="0")
+                eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+                # Multiple 'property' can be added to 'properties'
+                # differing by name and value
+                ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
+                ET.SubElement(eleTSPropetries, 'property', name="platform", value=suite.get("platform"))
+                ET.SubElement(eleTSPropetries, 'property', name="architecture", value=suite.get("arch"))
+
+                total = 0
+                fails = passes = errors = skips = 0
+                handler_time = suite.get('execution_time', 0)
+                runnable = suite.get('runnable', 0)
+                duration += float(handler_time)
+                ts_status = suite.get('status')
+                for tc in suite.get("testcases", []):
+                    status = tc.get('status')
+                    reason = tc.get('reason', suite.get('reason', 'Unknown'))
+                    log = tc.get("log", suite.get("log", suite.get("log_file")))
+
+                    tc_duration = tc.get('execution_time', handler_time)
+                    name = tc.get("identifier")
+                    classname = ".".join(name.split(".")[:2])
+                    fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
+                        name, classname, status, ts_status, reason, tc_duration, runnable,
+                        (fails, passes, errors, skips), log, True)
+
+                total = errors + passes + fails + skips
+
+                eleTestsuite.attrib['time'] = f"{duration}"
+                eleTestsuite.attrib['failures'] = f"{fails}"
+                eleTestsuite.attrib['errors'] = f"{errors}"
+                eleTestsuite.attrib['skipped'] = f"{skips}"
+                eleTestsuite.attrib['tests'] = f"{total}"
+
+                yield eleTestsuite
+
+        self._write_xunit(filename, testsuites())
 
     def xunit_report(self, json_file, filename, selected_platform=None, full_report=False):
         if selected_platform:
@@ -156,199 +197,218 @@ class Reporting:
             logger.info(f"Writing xunit report {filename}...")
             selected = self.selected_platforms
 
-        json_data = {}
-        with open(json_file, "r") as json_results:
-            json_data = json.load(json_results)
-
+        json_data, suites_by_platform = self._load_json_report(json_file)
 
         env = json_data.get('environment', {})
         version = env.get('zephyr_version', None)
 
-        eleTestsuites = ET.Element('testsuites')
-        all_suites = json_data.get("testsuites", [])
-
-        for platform in selected:
-            suites = list(filter(lambda d: d['platform'] == platform, all_suites))
-            # do not create entry if everything is filtered out
-            if not self.env.options.detailed_skipped_report:
-                non_filtered = list(filter(lambda d: d.get('status') != "filtered", suites))
-                if not non_filtered:
-                    continue
-
-            duration = 0
-            eleTestsuite = ET.SubElement(eleTestsuites, 'testsuite',
-                                            name=platform,
-                                            timestamp = self.timestamp,
-                                            time="0",
-                                            tests="0",
-                                            failures="0",
-                                            errors="0", skipped="0")
-            eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
-            # Multiple 'property' can be added to 'properties'
-            # differing by name and value
-            ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
-
-            total = 0
-            fails = passes = errors = skips = 0
-            for ts in suites:
-                handler_time = ts.get('execution_time', 0)
-                runnable = ts.get('runnable', 0)
-                duration += float(handler_time)
-
-                ts_status = ts.get('status')
-                # Do not report filtered testcases
-                if ts_status == 'filtered' and not self.env.options.detailed_skipped_report:
-                    continue
-                if full_report:
-                    for tc in ts.get("testcases", []):
-                        status = tc.get('status')
-                        reason = tc.get('reason', ts.get('reason', 'Unknown'))
-                        log = tc.get("log", ts.get("log"))
-
-                        tc_duration = tc.get('execution_time', handler_time)
-                        name = tc.get("identifier")
-                        classname = ".".join(name.split(".")[:2])
+        def testsuites():
+            for platform in selected:
+                suites = suites_by_platform.get(platform, [])
+                # do not create entry if everything is filtered out
+                if not self.env.options.detailed_skipped_report:
+                    non_filtered = list(filter(lambda d: d.get('status') != "filtered", suites))
+                    if not non_filtered:
+                        continue
+
+                duration = 0
+                eleTestsuite = ET.Element('testsuite',
+                                          name=platform,
+                                          timestamp = self.timestamp,
+                                          time="0",
+                                          tests="0",
+                                          failures="0",
+                                          errors="0", skipped="0")
+                eleTSPropetries = ET.SubElement(eleTestsuite, 'properties')
+                # Multiple 'property' can be added to 'properties'
+                # differing by name and value
+                ET.SubElement(eleTSPropetries, 'property', name="version", value=version)
+
+                total = 0
+                fails = passes = errors = skips = 0
+                for ts in suites:
+                    handler_time = ts.get('execution_time', 0)
+                    runnable = ts.get('runnable', 0)
+                    duration += float(handler_time)
+
+                    ts_status = ts.get('status')
+                    # Do not report filtered testcases
+                    if ts_status == 'filtered' and not self.env.options.detailed_skipped_report:
+                        continue
+                    if full_report:
+                        for tc in ts.get("testcases", []):
+                            status = tc.get('status')
+                            reason = tc.get('reason', ts.get('reason', 'Unknown'))
+                            log = tc.get("log", ts.get("log", ts.get("log_file")))
+
+                            tc_duration = tc.get('execution_time', handler_time)
+                            name = tc.get("identifier")
+                            classname = ".".join(name.split(".")[:2])
+                            fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
+                                name, classname, status, ts_status, reason, tc_duration, runnable,
+                                (fails, passes, errors, skips), log, True)
+                    else:
+                        reason = ts.get('reason', 'Unknown')
+                        name = ts.get("name")
+                        classname = f"{platform}:{name}"
+                        log = ts.get("log", ts.get("log_file"))
                         fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                            name, classname, status, ts_status, reason, tc_duration, runnable,
-                            (fails, passes, errors, skips), log, True)
-                else:
-                    reason = ts.get('reason', 'Unknown')
-                    name = ts.get("name")
-                    classname = f"{platform}:{name}"
-                    log = ts.get("log")
-                    fails, passes, errors, skips = self.xunit_testcase(eleTestsuite,
-                        name, classname, ts_status, ts_status, reason, duration, runnable,
-                        (fails, passes, errors, skips), log, False)
+                            name, classname, ts_status, ts_status, reason, duration, runnable,
+                            (fails, passes, errors, skips), log, False)
 
-            total = errors + passes + fails + skips
+                total = errors + passes + fails + skips
 
-            eleTestsuite.attrib['time'] = f"{duration}"
-            eleTestsuite.attrib['failures'] = f"{fails}"
-            eleTestsuite.attrib['errors'] = f"{errors}"
-            eleTestsuite.attrib['skipped'] = f"{skips}"
-            eleTestsuite.attrib['tests'] = f"{total}"
+                eleTestsuite.attrib['time'] = f"{duration}"
+                eleTestsuite.attrib['failures'] = f"{fails}"
+                eleTestsuite.attrib['errors'] = f"{errors}"
+                eleTestsuite.attrib['skipped'] = f"{skips}"
+                eleTestsuite.attrib['tests'] = f"{total}"
 
-        result = ET.tostring(eleTestsuites)
-        with open(filename, 'wb') as report:
-            report.write(result)
+                yield eleTestsuite
+
+        self._write_xunit(filename, testsuites())
 
     def json_report(self, filename, version="NA"):
+        """
+        Write the JSON report. The test suites are serialized and written one
+        at a time, the output is the same as json.dump(indent=4) of the whole
+        report.
+        """
         logger.info(f"Writing JSON report {filename}")
-        report = {}
-        report["environment"] = {"os": os.name,
-                                 "zephyr_version": version,
-                                 "toolchain": self.env.toolchain,
-                                 "commit_date": self.env.commit_date,
-                                 "run_date": self.env.run_date
-                                 }
-        suites = []
-
-        for instance in self.instances.values():
-            suite = {}
-            handler_log = os.path.join(instance.build_dir, "handler.log")
-            pytest_log = os.path.join(instance.build_dir, "twister_harness.log")
-            build_log = os.path.join(instance.build_dir, "build.log")
-            device_log = os.path.join(instance.build_dir, "device.log")
+        environment = {"os": os.name,
+                       "zephyr_version": version,
+                       "toolchain": self.env.toolchain,
+                       "commit_date": self.env.commit_date,
+                       "run_date": self.env.run_date
+                       }
 
-            handler_time = instance.metrics.get('handler_time', 0)
-            used_ram = instance.metrics.get ("used_ram", 0)
-            used_rom  = instance.metrics.get("used_rom",0)
-            available_ram = instance.metrics.get("available_ram", 0)
-            available_rom = instance.metrics.get("available_rom", 0)
-            suite = {
-                "name": instance.testsuite.name,
-                "arch": instance.platform.arch,
-                "platform": instance.platform.name,
-                "path": instance.testsuite.source_dir_rel
-            }
-            if instance.run_id:
-                suite['run_id'] = instance.run_id
-
-            suite["runnable"] = False
-            if instance.status != 'filtered':
-                suite["runnable"] = instance.run
-
-            if used_ram:
-                suite["used_ram"] = used_ram
-            if used_rom:
-                suite["used_rom"] = used_rom
-
-            suite['retries'] = instance.retries
-
-            if instance.dut:
-                suite["dut"] = instance.dut
-            if available_ram:
-                suite["available_ram"] = available_ram
-            if available_rom:
-                suite["available_rom"] = available_rom
-            if instance.status in ["error", "failed"]:
-                suite['status'] = instance.status
-                suite["reason"] = instance.reason
-                # FIXME
-                if os.path.exists(pytest_log):
-                    suite["log"] = self.process_log(pytest_log)
-                elif os.path.exists(handler_log):
-                    suite["log"] = self.process_log(handler_log)
-                elif os.path.exists(device_log):
-                    suite["log"] = self.process_log(device_log)
-                else:
-                    suite["log"] = self.process_log(build_log)
-            elif instance.status == 'filtered':
-                suite["status"] = "filtered"
-                suite["reason"] = instance.reason
-            elif instance.status == 'passed':
-                suite["status"] = "passed"
-            elif instance.status == 'skipped':
-                suite["status"] = "skipped"
-                suite["reason"] = instance.reason
-
-            if instance.status is not None:
-                suite["execution_time"] =  f"{float(handler_time):.2f}"
-
-            testcases = []
-
-            if len(instance.testcases) == 1:
-                single_case_duration = f"{float(handler_time):.2f}"
+        with open(filename, "wt") as json_file:
+            json_file.write('{\n    "environment":' + self._json_dumps(environment, 1))
+            json_file.write(',\n    "testsuites":[')
+            separator = "\n"
+            for instance in self.instances.values():
+                json_file.write(separator + " " * 8 +
+                                self._json_dumps(self._json_suite(instance), 2))
+                separator = ",\n"
+            json_file.write("]" if separator == "\n" else "\n    ]")
+
+            if self.env.options.device_testing and self.env.hwm and self.env.run_date:
+                duration = (datetime.now(timezone.utc) -
+                            datetime.fromisoformat(self.env.run_date)).total_seconds()
+                duts = self.env.hwm.utilization(self.selected_platforms, duration)
+                json_file.write(',\n    "duts":' + self._json_dumps(duts, 1))
+
+            json_file.write("\n}")
+
+    def _json_suite(self, instance):
+        suite = {}
+        handler_log = os.path.join(instance.build_dir, "handler.log")
+        pytest_log = os.path.join(instance.build_dir, "twister_harness.log")
+        build_log = os.path.join(instance.build_dir, "build.log")
+        device_log = os.path.join(instance.build_dir, "device.log")
+
+        handler_time = instance.metrics.get('handler_time', 0)
+        build_time = instance.metrics.get('build_time', 0)
+        used_ram = instance.metrics.get ("used_ram", 0)
+        used_rom  = instance.metrics.get("used_rom",0)
+        available_ram = instance.metrics.get("available_ram", 0)
+        available_rom = instance.metrics.get("available_rom", 0)
+        suite = {
+            "name": instance.testsuite.name,
+            "arch": instance.platform.arch,
+            "platform": instance.platform.name,
+            "path": instance.testsuite.source_dir_rel
+        }
+        if instance.run_id:
+            suite['run_id'] = instance.run_id
+
+        suite["runnable"] = False
+        if instance.status != 'filtered':
+            suite["runnable"] = instance.run
+
+        if used_ram:
+            suite["used_ram"] = used_ram
+        if used_rom:
+            suite["used_rom"] = used_rom
+
+        suite['retries'] = instance.retries
+
+        if instance.dut:
+            suite["dut"] = instance.dut
+            suite["dut_wait_time"] = round(instance.dut_wait_time, 2)
+        if available_ram:
+            suite["available_ram"] = available_ram
+        if available_rom:
+            suite["available_rom"] = available_rom
+        if instance.status in ["error", "failed"]:
+            suite['status'] = instance.status
+            suite["reason"] = instance.reason
+            # FIXME
+            if os.path.exists(pytest_log):
+                log_file = pytest_log
+            elif os.path.exists(handler_log):
+                log_file = handler_log
+            elif os.path.exists(device_log):
+                log_file = device_log
             else:
-                single_case_duration = 0
-
-            for case in instance.testcases:
-                # freeform was set when no sub testcases were parsed, however,
-                # if we discover those at runtime, the fallback testcase wont be
-                # needed anymore and can be removed from the output, it does
-                # not have a status and would otherwise be reported as skipped.
-                if case.freeform and case.status is None and len(instance.testcases) > 1:
-                    continue
-                testcase = {}
-                testcase['identifier'] = case.name
-                if instance.status:
-                    if single_case_duration:
-                        testcase['execution_time'] = single_case_duration
-                    else:
-                        testcase['execution_time'] = f"{float(case.duration):.2f}"
+                log_file = build_log
+            if self.env.options.report_log_paths:
+                suite["log_file"] = log_file
+            else:
+                suite["log"] = self.process_log(log_file)
+        elif instance.status == 'filtered':
+            suite["status"] = "filtered"
+            suite["reason"] = instance.reason
+        elif instance.status == 'passed':
+            suite["status"] = "passed"
+        elif instance.status == 'skipped':
+            suite["status"] = "skipped"
+            suite["reason"] = instance.reason
+
+        if instance.status is not None:
+            suite["execution_time"] =  f"{float(handler_time):.2f}"
+            suite["build_time"] =  f"{float(build_time):.2f}"
+
+        testcases = []
+
+        if len(instance.testcases) == 1:
+            single_case_duration = f"{float(handler_time):.2f}"
+        else:
+            single_case_duration = 0
+
+        for case in instance.testcases:
+            # freeform was set when no sub testcases were parsed, however,
+            # if we discover those at runtime, the fallback testcase wont be
+            # needed anymore and can be removed from the output, it does
+            # not have a status and would otherwise be reported as skipped.
+            if case.freeform and case.status is None and len(instance.testcases) > 1:
+                continue
+            testcase = {}
+            testcase['identifier'] = case.name
+            if instance.status:
+                if single_case_duration:
+                    testcase['execution_time'] = single_case_duration
+                else:
+                    testcase['execution_time'] = f"{float(case.duration):.2f}"
 
-                if case.output != "":
-                    testcase['log'] = case.output
+            if case.output != "":
+                testcase['log'] = case.output
 
-                if case.status == "skipped":
-                    if instance.status == "filtered":
-                        testcase["status"] = "filtered"
-                    else:
-                        testcase["status"] = "skipped"
-                        testcase["reason"] = case.reason or instance.reason
+            if case.status == "skipped":
+                if instance.status == "filtered":
+                    testcase["status"] = "filtered"
                 else:
-                    testcase["status"] = case.status
-                    if case.reason:
-                        testcase["reason"] = case.reason
-
-                testcases.append(testcase)
+                    testcase["status"] = "skipped"
+                    testcase["reason"] = case.reason or instance.reason
+            else:
+                testcase["status"] = case.status
+                if case.reason:
+                    testcase["reason"] = case.reason
 
-            suite['testcases'] = testcases
-            suites.append(suite)
+            testcases.append(testcase)
 
-        report["testsuites"] = suites
-        with open(filename, "wt") as json_file:
-            json.dump(report, json_file, indent=4, separators=(',',':'))
+        suite['testcases'] = testcases
+        return suite
 
 
     def compare_metrics(self, filename):
@@ -4,8 +4,13 @@
 # Copyright 2022 NXP
 # SPDX-License-Identifier: Apache-2.0
 
+import collections
+import functools
+import glob
+import json
 import logging
 import multiprocessing
+import multiprocessing.connection
 import os
 import pickle
 import queue
@@ -16,6 +21,7 @@ import sys
 import time
 import traceback
 import yaml
+from contextlib import nullcontext
 from multiprocessing import Lock, Process, Value
 from multiprocessing.managers import BaseManager
 from typing import List
@@ -23,9 +29,11 @@ from packaging import version
 
 from colorama import Fore
 from domains import Domains
+from twisterlib.build_cache import BuildCache, hash_file, hash_tree
 from twisterlib.cmakecache import CMakeCache
 from twisterlib.environment import canonical_zephyr_base
 from twisterlib.error import BuildError
+from twisterlib.hardwaremap import DUTPool
 
 import elftools
 from elftools.elf.elffile import ELFFile
@@ -45,6 +53,7 @@ from twisterlib.testsuite import TestSuite
 from twisterlib.platform import Platform
 from twisterlib.testplan import change_skip_to_error_if_integration
 from twisterlib.harness import HarnessImporter, Pytest
+from devicetree import edtsnapshot
 
 logger = logging.getLogger('twister')
 logger.setLevel(logging.DEBUG)
@@ -437,6 +446,7 @@ class FilterBuilder(CMake):
             cmake_cache_path = os.path.join(domain_build, "CMakeCache.txt")
             defconfig_path = os.path.join(domain_build, "zephyr", ".config")
             edt_pickle = os.path.join(domain_build, "zephyr", "edt.pickle")
+            edt_snapshot = os.path.join(domain_build, "zephyr", "edt.snapshot")
         else:
             cmake_cache_path = os.path.join(self.build_dir, "CMakeCache.txt")
             # .config is only available after kconfig stage in cmake. If only dt based filtration is required
@@ -445,6 +455,7 @@ class FilterBuilder(CMake):
                 defconfig_path = os.path.join(self.build_dir, "zephyr", ".config")
             # dt is compiled before kconfig, so edt_pickle is available regardless of choice of filter stages
             edt_pickle = os.path.join(self.build_dir, "zephyr", "edt.pickle")
+            edt_snapshot = os.path.join(self.build_dir, "zephyr", "edt.snapshot")
 
 
         if not filter_stages or "kconfig" in filter_stages:
@@ -497,7 +508,11 @@ class FilterBuilder(CMake):
 
         if self.testsuite and self.testsuite.filter:
             try:
-                if os.path.exists(edt_pickle):
+                # The snapshot loads much faster than the pickle, which is
+                # still used with build directories made before it existed.
+                if os.path.exists(edt_snapshot):
+                    edt = edtsnapshot.load_snapshot(edt_snapshot)
+                elif os.path.exists(edt_pickle):
                     with open(edt_pickle, 'rb') as f:
                         edt = pickle.load(f)
                 else:
@@ -528,7 +543,7 @@ class ProjectBuilder(FilterBuilder):
         self.filtered_tests = 0
         self.options = env.options
         self.env = env
-        self.duts = None
+        self.dut_pool = None
 
     def log_info(self, filename, inline_logs, log_testcases=False):
         filename = os.path.abspath(os.path.realpath(filename))
@@ -584,24 +599,41 @@ class ProjectBuilder(FilterBuilder):
         self.instance.setup_handler(self.env)
 
         if op == "filter":
+            start_time = time.time()
             res = self.cmake(filter_stages=self.instance.filter_stages)
-            if self.instance.status in ["failed", "error"]:
-                pipeline.put({"op": "report", "test": self.instance})
-            else:
-                # Here we check the dt/kconfig filter results coming from running cmake
-                if self.instance.name in res['filter'] and res['filter'][self.instance.name]:
-                    logger.debug("filtering %s" % self.instance.name)
-                    self.instance.status = "filtered"
-                    self.instance.reason = "runtime filter"
-                    results.skipped_runtime += 1
-                    self.instance.add_missing_case_status("skipped")
-                    pipeline.put({"op": "report", "test": self.instance})
+            self.instance.build_time += time.time() - start_time
+
+            # Instances with the same filter stage inputs are filtered with
+            # the configuration generated for this one. This must be done
+            # before queueing the next operation of this instance, which
+            # reconfigures its build directory.
+            followers = []
+            for follower in message.get("followers", []):
+                pb = ProjectBuilder(follower, self.env, self.jobserver)
+                pb.dut_pool = self.dut_pool
+                if self.instance.status in ["failed", "error"]:
+                    followers.append((pb, None))
+                else:
+                    followers.append((pb, pb.filter_from(self.build_dir)))
+
+            self.process_filter_results(pipeline, res, results)
+            for pb, follower_res in followers:
+                if follower_res is None:
+                    # let it run the filter stage itself and report its own error
+                    pipeline.put({"op": "filter", "test": pb.instance})
                 else:
-                    pipeline.put({"op": "cmake", "test": self.instance})
+                    pb.process_filter_results(pipeline, follower_res, results)
 
         # The build process, call cmake and build with configured generator
         if op == "cmake":
+            cache_key = self.get_build_cache_key()
+            if cache_key and self.restore_from_build_cache(cache_key):
+                pipeline.put({"op": "build", "test": self.instance, "cached": True})
+                return
+
+            start_time = time.time()
             res = self.cmake()
+            self.instance.build_time += time.time() - start_time
             if self.instance.status in ["failed", "error"]:
                 pipeline.put({"op": "report", "test": self.instance})
             elif self.options.cmake_only:
@@ -618,11 +650,22 @@ class ProjectBuilder(FilterBuilder):
                     self.instance.add_missing_case_status("skipped")
                     pipeline.put({"op": "report", "test": self.instance})
                 else:
-                    pipeline.put({"op": "build", "test": self.instance})
+                    build_message = {"op": "build", "test": self.instance}
+                    if cache_key:
+                        build_message["cache_key"] = cache_key
+                    pipeline.put(build_message)
 
         elif op == "build":
             logger.debug("build test: %s" % self.instance.name)
-            res = self.build()
+            if message.get("cached"):
+                res = self.build_from_cache()
+            else:
+                start_time = time.time()
+                res = self.build()
+                self.instance.build_time += time.time() - start_time
+                if (res and res.get('returncode', 1) == 0 and
+                        self.instance.status == "passed" and message.get("cache_key")):
+                    self.store_in_build_cache(message["cache_key"])
             if not res:
                 self.instance.status = "error"
                 self.instance.reason = "Build Failure"
@@ -663,7 +706,7 @@ class ProjectBuilder(FilterBuilder):
             try:
                 # to make it work with pickle
                 self.instance.handler.thread = None
-                self.instance.handler.duts = None
+                self.instance.handler.dut_pool = None
                 pipeline.put({
                     "op": "report",
                     "test": self.instance,
@@ -696,6 +739,38 @@ class ProjectBuilder(FilterBuilder):
             elif mode == "passed" or (mode == "all" and self.instance.reason != "Cmake build failure"):
                 self.cleanup_artifacts()
 
+    def process_filter_results(self, pipeline, res, results):
+        if self.instance.status in ["failed", "error"]:
+            pipeline.put({"op": "report", "test": self.instance})
+        else:
+            # Here we check the dt/kconfig filter results coming from running cmake
+            if self.instance.name in res['filter'] and res['filter'][self.instance.name]:
+                logger.debug("filtering %s" % self.instance.name)
+                self.instance.status = "filtered"
+                self.instance.reason = "runtime filter"
+                results.skipped_runtime += 1
+                self.instance.add_missing_case_status("skipped")
+                pipeline.put({"op": "report", "test": self.instance})
+            else:
+                pipeline.put({"op": "cmake", "test": self.instance})
+
+    def filter_from(self, build_dir):
+        """
+        Results of the filter stages of this instance, from the configuration
+        generated in the build directory of another instance with the same
+        filter stage inputs, see TwisterRunner.get_filter_key().
+        """
+        self.instance.setup_handler(self.env)
+        logger.debug(f"Filtering {self.instance.name} with the configuration in {build_dir}")
+        own_build_dir = self.build_dir
+        self.build_dir = build_dir
+        try:
+            filter_results = self.parse_generated(self.instance.filter_stages)
+        finally:
+            self.build_dir = own_build_dir
+        return {'msg': f"Filtered with the configuration in {build_dir}",
+                'filter': filter_results}
+
     def determine_testcases(self, results):
         yaml_testsuite_name = self.instance.testsuite.id
         logger.debug(f"Determine test cases for test suite: {yaml_testsuite_name}")
@@ -736,21 +811,116 @@ class ProjectBuilder(FilterBuilder):
                 self.instance.testsuite.add_testcase(name=testcase_id)
 
 
+    # Build artifacts kept by cleanup_artifacts(), next to the run logs.
+    # They are needed to make --test-only work as well.
+    BUILD_ARTIFACTS = [
+        os.path.join('zephyr', '.config'),
+        'build.log',
+        'Makefile',
+        'CMakeCache.txt',
+        'build.ninja',
+        os.path.join('CMakeFiles', 'rules.ninja')
+    ]
+
+    def get_build_cache(self):
+        if not self.options.build_cache:
+            return None
+        return BuildCache(self.options.build_cache, self.options.build_cache_size * 1024 * 1024)
+
+    def get_build_cache_key(self):
+        """
+        Cache key of this instance's build, None if the build cache is not
+        used for it. Only builds which do not need the build system at run
+        time are cached: build-only instances and binaries run directly
+        (native and unit tests).
+        """
+        instance = self.instance
+        if not self.options.build_cache:
+            return None
+        if (instance.testsuite.sysbuild or self.options.enable_coverage or
+                self.options.cmake_only or self.options.create_rom_ram_report):
+            return None
+        # the compiled sources of a build are known from the Ninja log
+        if self.env.generator != "Ninja":
+            return None
+        if instance.run and not (
+            instance.handler.ready and not instance.handler.call_make_run and
+            instance.handler.type_str in ["native", "unit"]
+        ):
+            return None
+
+        args = self.cmake_assemble_args(
+            self.testsuite.extra_args.copy(),
+            instance.handler,
+            self.testsuite.extra_conf_files,
+            self.testsuite.extra_overlay_confs,
+            self.testsuite.extra_dtc_overlay_files,
+            self.options.extra_args,
+            instance.build_dir,
+        )
+        # Scenarios only differing in e.g. harness config or tags produce the
+        # same build in different build directories.
+        args = [arg.replace(instance.build_dir, "<build_dir>") for arg in args]
+        extra_conf = os.path.join(instance.build_dir, "twister", "testsuite_extra.conf")
+
+        # A cache hit skips cmake and with it the runtime filter. The build
+        # was cached by an instance which passed the same filter with the
+        # same configuration, so it passes for this instance as well.
+        return BuildCache.compute_key(
+            zephyr_version=self.env.version,
+            toolchain=self.env.toolchain,
+            generator=self.env.generator,
+            platform=instance.platform.name,
+            source=hash_tree(instance.testsuite.source_dir),
+            filter=instance.testsuite.filter,
+            filter_stages=sorted(instance.filter_stages),
+            args=args,
+            snippets=instance.testsuite.required_snippets,
+            extra_conf=hash_file(extra_conf),
+            warnings_as_errors=not self.options.disable_warnings_as_errors,
+        )
+
+    def restore_from_build_cache(self, cache_key):
+        manifest = self.get_build_cache().restore(cache_key, self.instance.build_dir)
+        if manifest is None:
+            return False
+        logger.debug(f"Restored {self.instance.name} from build cache")
+        # The run ID is compiled into the binary
+        self.instance.run_id = manifest["run_id"]
+        return True
+
+    def store_in_build_cache(self, cache_key):
+        files = self.BUILD_ARTIFACTS + self._get_binaries()
+        files += self._get_binaries_from_runners(['exe_file'])
+        files += [os.path.relpath(f, self.instance.build_dir) for f in
+                  glob.glob(os.path.join(self.instance.build_dir, "zephyr", "*.elf"))]
+        # The executable run by the native and unit handlers, e.g.
+        # zephyr/zephyr.exe or testbinary
+        handler = self.instance.handler
+        if handler and handler.binary:
+            files.append(os.path.relpath(handler.binary, self.instance.build_dir))
+        files = sorted(set(f for f in files
+                           if not os.path.isabs(f) and not f.startswith(os.pardir)))
+        self.get_build_cache().store(cache_key, self.instance.build_dir, files,
+                                     self.instance.run_id)
+
+    def build_from_cache(self):
+        """Results of a build restored from the build cache, see run_build()."""
+        self.instance.status = "passed"
+        if not self.instance.run:
+            self.instance.add_missing_case_status("skipped", "Test was built only")
+        msg = "Restored build of %s for %s" % (self.source_dir, self.platform.name)
+        return {'msg': msg, "returncode": 0, "instance": self.instance}
+
     def cleanup_artifacts(self, additional_keep=[]):
         logger.debug("Cleaning up {}".format(self.instance.build_dir))
         allow = [
-            os.path.join('zephyr', '.config'),
             'handler.log',
-            'build.log',
             'device.log',
             'recording.csv',
-            # below ones are needed to make --test-only work as well
-            'Makefile',
-            'CMakeCache.txt',
-            'build.ninja',
-            os.path.join('CMakeFiles', 'rules.ninja')
             ]
 
+        allow += self.BUILD_ARTIFACTS
         allow += additional_keep
 
         if self.options.runtime_artifact_cleanup == 'all':
@@ -807,10 +977,11 @@ class ProjectBuilder(FilterBuilder):
             ]
         return binaries
 
-    def _get_binaries_from_runners(self) -> List[str]:
+    def _get_binaries_from_runners(self, binary_keys: List[str] = None) -> List[str]:
         """
         Get list of binaries paths (absolute or relative to the
-        self.instance.build_dir) from runners.yaml file.
+        self.instance.build_dir) from runners.yaml file. binary_keys are the
+        runners.yaml config keys read, by default the ones of flashed images.
         """
         runners_file_path: str = os.path.join(self.instance.build_dir, 'zephyr', 'runners.yaml')
         if not os.path.exists(runners_file_path):
@@ -823,7 +994,8 @@ class ProjectBuilder(FilterBuilder):
             return []
 
         runners_config: dict = runners_content['config']
-        binary_keys: List[str] = ['elf_file', 'hex_file', 'bin_file']
+        if binary_keys is None:
+            binary_keys = ['elf_file', 'hex_file', 'bin_file']
 
         binaries: List[str] = []
         for binary_key in binary_keys:
@@ -1003,7 +1175,7 @@ class ProjectBuilder(FilterBuilder):
 
         args_expanded = ["-D{}".format(a.replace('"', '\"')) for a in config_options]
 
-        if handler.ready:
+        if handler and handler.ready:
             args.extend(handler.args)
 
         if extra_conf_files:
@@ -1057,7 +1229,7 @@ class ProjectBuilder(FilterBuilder):
             instance.status = None
 
             if instance.handler.type_str == "device":
-                instance.handler.duts = self.duts
+                instance.handler.dut_pool = self.dut_pool
 
             if(self.options.seed is not None and instance.platform.name.startswith("native_posix")):
                 self.parse_generated()
@@ -1108,8 +1280,76 @@ class ProjectBuilder(FilterBuilder):
                 instance.metrics["unrecognized"] = []
             instance.metrics["handler_time"] = instance.execution_time
 
+class LocalWorker:
+    """
+    A worker process of the 'local' scheduler. Each worker has its own pipe,
+    over which it receives one token at a time and sends the reported
+    instances back. The parent therefore knows which instances a worker
+    holds when it dies, and a dying worker cannot block the other ones.
+    """
+
+    def __init__(self, runner, index, lock, results):
+        self.index = index
+        self.conn, worker_conn = multiprocessing.Pipe()
+        # The token being worked on and the names of its instances which
+        # were not reported yet
+        self.token = None
+        self.unreported = set()
+        logger.debug(f"Launch process {index}")
+        self.process = Process(target=runner.local_pipeline_mgr,
+                               args=(worker_conn, lock, results, ))
+        self.process.start()
+        worker_conn.close()
+
+    def send(self, token):
+        name, _, _, followers = token
+        self.token = token
+        self.unreported = {name}
+        self.unreported.update(follower.name for follower in followers or [])
+        self.conn.send(token)
+
+
+class ConnectionReporter:
+    """Reports instances over a pipe, in place of the done queue."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def put(self, instance):
+        self.conn.send(instance)
+
+
+class LocalPipeline(queue.LifoQueue):
+    """
+    The operations of a token in a worker of the 'local' scheduler.
+    Operations of other instances, i.e. of the followers of a filter stage,
+    are sent to the parent as new tokens, so any worker can pick them up.
+    """
+
+    def __init__(self, conn, instance):
+        super().__init__()
+        self.conn = conn
+        self.instance = instance
+
+    def put(self, task, *args, **kwargs):
+        instance = task['test']
+        if instance is self.instance:
+            super().put(task, *args, **kwargs)
+        else:
+            self.conn.send(("token", (instance.name, task['op'], instance,
+                                      task.get('followers'))))
+
+
 class TwisterRunner:
 
+    # Rough estimates (in seconds) used to rank test instances which have no
+    # recorded build/run durations against those which have.
+    BUILD_TIME_ESTIMATE = 30
+    BUILD_TIME_PER_SOURCE_KB = 0.05
+    SYSBUILD_FACTOR = 2
+    ARCH_BUILD_FACTOR = {"posix": 0.5, "unit": 0.5}
+    RUN_TIMEOUT_FRACTION = 0.1
+
     def __init__(self, instances, suites, env=None) -> None:
         self.pipeline = None
         self.options = env.options
@@ -1117,22 +1357,115 @@ class TwisterRunner:
         self.instances = instances
         self.suites = suites
         self.duts = None
+        self.dut_pool = None
         self.jobs = 1
         self.results = None
         self.jobserver = None
+        # instance name -> (build_time or None, run_time) from a previous run
+        self.durations = {}
+        # worker processes of the 'local' scheduler, kept across iterations
+        self.workers = []
+
+    def __getstate__(self):
+        # Workers of the 'local' scheduler get a copy of the runner, which
+        # must not include the other workers when it is pickled.
+        state = self.__dict__.copy()
+        state["workers"] = []
+        return state
+
+    @staticmethod
+    def load_durations(filename, required=False):
+        """
+        Read the build and execution times recorded per test instance in a
+        twister.json report. Reports written before build times were recorded
+        only provide the execution time, the build time is None then. A
+        missing report is only worth a warning if it was required, e.g. given
+        with --durations-file.
+        """
+        durations = {}
+        if not filename or not os.path.exists(filename):
+            if required:
+                logger.warning(f"Durations file {filename} not found, "
+                               "test durations will be estimated")
+            return durations
+
+        try:
+            with open(filename, "r") as fp:
+                jtp = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot load durations from {filename}: {e}")
+            return durations
+
+        for ts in jtp.get("testsuites", []):
+            if "build_time" not in ts and "execution_time" not in ts:
+                continue
+            build_time = ts.get("build_time")
+            if build_time is not None:
+                build_time = float(build_time)
+            name = os.path.join(ts["platform"], ts["name"])
+            durations[name] = (build_time, float(ts.get("execution_time", 0)))
+
+        return durations
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _source_size(source_dir):
+        size = 0
+        for dirpath, _, filenames in os.walk(source_dir):
+            for name in filenames:
+                try:
+                    size += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return size
+
+    def expected_duration(self, instance):
+        """
+        Expected build + run time of a test instance, from the recorded
+        durations if available, otherwise from a heuristic based on sysbuild
+        usage, platform architecture and the size of the application sources.
+        """
+        return self.estimate_duration(instance, self.durations)
+
+    @classmethod
+    def estimate_duration(cls, instance, durations):
+        """expected_duration() with the durations loaded by load_durations()."""
+        build_time, run_time = durations.get(instance.name, (None, None))
+
+        if build_time is None:
+            source_kb = cls._source_size(instance.testsuite.source_dir) / 1024
+            build_time = cls.BUILD_TIME_ESTIMATE + source_kb * cls.BUILD_TIME_PER_SOURCE_KB
+            if instance.testsuite.sysbuild:
+                build_time *= cls.SYSBUILD_FACTOR
+            build_time *= cls.ARCH_BUILD_FACTOR.get(instance.platform.arch, 1)
+
+        if run_time is None:
+            run_time = 0
+            if instance.run:
+                run_time = instance.testsuite.timeout * cls.RUN_TIMEOUT_FRACTION
+
+        return build_time + run_time
 
     def run(self):
 
         retries = self.options.retry_failed + 1
 
-        BaseManager.register('LifoQueue', queue.LifoQueue)
-        manager = BaseManager()
-        manager.start()
-
         self.results = ExecutionCounter(total=len(self.instances))
         self.iteration = 0
-        pipeline = manager.LifoQueue()
-        done_queue = manager.LifoQueue()
+
+        if self.options.scheduler == "local":
+            # Workers only receive (instance name, op) tokens over a pipe and
+            # send reported instances back, instance state stays in the parent.
+            # Each worker has its own pipe, see LocalWorker.
+            pipeline = None
+            done_queue = queue.LifoQueue()
+        else:
+            BaseManager.register('LifoQueue', queue.LifoQueue)
+            manager = BaseManager()
+            manager.start()
+
+            pipeline = manager.LifoQueue()
+            done_queue = manager.LifoQueue()
 
         # Set number of jobs
         if self.options.jobs:
@@ -1155,8 +1488,19 @@ class TwisterRunner:
 
             logger.info("JOBS: %d", self.jobs)
 
+        if self.duts:
+            self.dut_pool = DUTPool(self.duts, self.jobs)
+
         self.update_counting_before_pipeline()
 
+        try:
+            self._run_iterations(retries, pipeline, done_queue)
+        finally:
+            self.stop_workers()
+
+        self.show_brief()
+
+    def _run_iterations(self, retries, pipeline, done_queue):
         while True:
             self.results.iteration += 1
 
@@ -1180,6 +1524,7 @@ class TwisterRunner:
                 else:
                     inst.metrics.update(self.instances[inst.name].metrics)
                     inst.metrics["handler_time"] = inst.execution_time
+                    inst.metrics["build_time"] = inst.build_time
                     inst.metrics["unrecognized"] = []
                     self.instances[inst.name] = inst
 
@@ -1193,8 +1538,6 @@ class TwisterRunner:
             if retries == 0 or ( self.results.failed == 0 and not retry_errors):
                 break
 
-        self.show_brief()
-
     def update_counting_before_pipeline(self):
         '''
         Updating counting before pipeline is necessary because statically filterd
@@ -1218,31 +1561,77 @@ class TwisterRunner:
                     self.results.skipped_filter,
                     self.results.skipped_configs - self.results.skipped_filter))
 
+    def get_filter_key(self, instance):
+        """
+        Inputs of the cmake filter stages of an instance. Instances with the
+        same inputs get the same devicetree and Kconfig configuration, so the
+        filter stages only run for one of them. Arguments added by the handler
+        (the QEMU FIFO path, coverage of unit tests) do not change that
+        configuration and are left out.
+        """
+        args = ProjectBuilder.cmake_assemble_args(
+            instance.testsuite.extra_args.copy(),
+            None,
+            instance.testsuite.extra_conf_files,
+            instance.testsuite.extra_overlay_confs,
+            instance.testsuite.extra_dtc_overlay_files,
+            self.options.extra_args,
+            instance.build_dir,
+        )
+        extra_conf = os.path.join(instance.build_dir, "twister", "testsuite_extra.conf")
+
+        return (
+            instance.platform.name,
+            instance.testsuite.source_dir,
+            tuple(arg.replace(instance.build_dir, "<build_dir>") for arg in args),
+            tuple(instance.testsuite.required_snippets or []),
+            tuple(instance.filter_stages),
+            hash_file(extra_conf),
+        )
+
     def add_tasks_to_queue(self, pipeline, build_only=False, test_only=False, retry_build_errors=False):
+        no_retry_statuses = ['passed', 'skipped', 'filtered']
+        if not retry_build_errors:
+            no_retry_statuses.append("error")
+
+        queued = []
         for instance in self.instances.values():
             if build_only:
                 instance.run = False
-
-            no_retry_statuses = ['passed', 'skipped', 'filtered']
-            if not retry_build_errors:
-                no_retry_statuses.append("error")
-
             if instance.status not in no_retry_statuses:
-                logger.debug(f"adding {instance.name}")
-                if instance.status:
-                    instance.retries += 1
-                instance.status = None
-
-                # Check if cmake package_helper script can be run in advance.
-                instance.filter_stages = []
-                if instance.testsuite.filter:
-                    instance.filter_stages = self.get_cmake_filter_stages(instance.testsuite.filter, expr_parser.reserved.keys())
-                if test_only and instance.run:
-                    pipeline.put({"op": "run", "test": instance})
-                elif instance.filter_stages and "full" not in instance.filter_stages:
-                    pipeline.put({"op": "filter", "test": instance})
+                queued.append(instance)
+
+        tasks = []
+        # filter stage inputs -> task of the instance running the filter stages
+        filter_tasks = {}
+        # The pipeline is LIFO, queue the shortest instances first so the
+        # longest ones are picked up first and don't end up as a long tail.
+        for instance in sorted(queued, key=self.expected_duration):
+            logger.debug(f"adding {instance.name}")
+            if instance.status:
+                instance.retries += 1
+            instance.status = None
+            if not test_only:
+                instance.build_time = 0
+
+            # Check if cmake package_helper script can be run in advance.
+            instance.filter_stages = []
+            if instance.testsuite.filter:
+                instance.filter_stages = self.get_cmake_filter_stages(instance.testsuite.filter, expr_parser.reserved.keys())
+            if test_only and instance.run:
+                tasks.append({"op": "run", "test": instance})
+            elif instance.filter_stages and "full" not in instance.filter_stages:
+                key = self.get_filter_key(instance)
+                if key in filter_tasks:
+                    filter_tasks[key].setdefault("followers", []).append(instance)
                 else:
-                    pipeline.put({"op": "cmake", "test": instance})
+                    filter_tasks[key] = {"op": "filter", "test": instance}
+                    tasks.append(filter_tasks[key])
+            else:
+                tasks.append({"op": "cmake", "test": instance})
+
+        for task in tasks:
+            pipeline.put(task)
 
 
     def pipeline_mgr(self, pipeline, done_queue, lock, results):
@@ -1256,7 +1645,7 @@ class TwisterRunner:
                     else:
                         instance = task['test']
                         pb = ProjectBuilder(instance, self.env, self.jobserver)
-                        pb.duts = self.duts
+                        pb.dut_pool = self.dut_pool
                         pb.process(pipeline, done_queue, task, lock, results)
 
                 return True
@@ -1269,17 +1658,75 @@ class TwisterRunner:
                 else:
                     instance = task['test']
                     pb = ProjectBuilder(instance, self.env, self.jobserver)
-                    pb.duts = self.duts
+                    pb.dut_pool = self.dut_pool
                     pb.process(pipeline, done_queue, task, lock, results)
             return True
 
+    def local_pipeline_mgr(self, conn, lock, results):
+        """
+        Worker loop of the 'local' scheduler. Each token names an instance
+        and its first operation, all follow-up operations run on a queue
+        local to this process. Tokens of the first iteration refer to the
+        copy of self.instances the worker was started with, later ones carry
+        the updated instance. Tokens of a filter stage also carry the
+        instances sharing its results, see add_tasks_to_queue(), whose
+        follow-up operations go back to the parent, see LocalPipeline.
+        Reported instances and a None once a token is finished are sent back
+        over conn. The worker keeps running across retry iterations until it
+        receives a None token.
+        """
+        reported = ConnectionReporter(conn)
+        while True:
+            try:
+                token = conn.recv()
+            except EOFError:
+                break
+            if token is None:
+                break
+            name, op, instance, followers = token
+            if instance is not None:
+                self.instances[name] = instance
+
+            if sys.platform == 'linux':
+                job = self.jobserver.get_job()
+            else:
+                job = nullcontext()
+
+            with job:
+                local_pipeline = LocalPipeline(conn, self.instances[name])
+                task = {"op": op, "test": self.instances[name]}
+                if followers:
+                    task["followers"] = followers
+                local_pipeline.put(task)
+                while True:
+                    try:
+                        task = local_pipeline.get_nowait()
+                    except queue.Empty:
+                        break
+                    else:
+                        instance = task['test']
+                        pb = ProjectBuilder(instance, self.env, self.jobserver)
+                        pb.dut_pool = self.dut_pool
+                        pb.process(local_pipeline, reported, task, lock, results)
+
+            conn.send(None)
+        return True
+
     def execute(self, pipeline, done):
         lock = Lock()
         logger.info("Adding tasks to the queue...")
-        self.add_tasks_to_queue(pipeline, self.options.build_only, self.options.test_only,
+        if self.options.scheduler == "local":
+            tasks = queue.LifoQueue()
+        else:
+            tasks = pipeline
+        self.add_tasks_to_queue(tasks, self.options.build_only, self.options.test_only,
                                 retry_build_errors=self.options.retry_build_errors)
         logger.info("Added initial list of jobs to queue")
 
+        if self.options.scheduler == "local":
+            self._execute_local(tasks, done, lock)
+            return
+
         processes = []
 
         for job in range(self.jobs):
@@ -1296,6 +1743,118 @@ class TwisterRunner:
             for p in processes:
                 p.terminate()
 
+    def _execute_local(self, tasks, done, lock):
+        # Workers started in an earlier iteration hold outdated copies of
+        # the instances, so from then on the instance goes with the token.
+        send_instances = bool(self.workers)
+        backlog = collections.deque()
+        while True:
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                break
+            instance = task['test']
+            backlog.append((instance.name, task['op'],
+                            instance if send_instances else None,
+                            task.get('followers')))
+
+        if not self.workers:
+            self.workers = [LocalWorker(self, index, lock, self.results)
+                            for index in range(self.jobs)]
+
+        try:
+            while True:
+                for worker in self.workers:
+                    if worker.token is None and backlog:
+                        if not worker.process.is_alive():
+                            worker = self._restart_worker(worker, done, lock, backlog)
+                        worker.send(backlog.popleft())
+                busy = [worker for worker in self.workers if worker.token is not None]
+                if not busy:
+                    break
+
+                ready = multiprocessing.connection.wait(
+                    [worker.conn for worker in busy] +
+                    [worker.process.sentinel for worker in busy]
+                )
+                for worker in busy:
+                    if worker.conn in ready:
+                        self._receive_reported(worker, done, backlog)
+                for worker in busy:
+                    if worker.process.sentinel in ready:
+                        self._restart_worker(worker, done, lock, backlog)
+        except KeyboardInterrupt:
+            logger.info("Execution interrupted")
+            for worker in self.workers:
+                worker.process.terminate()
+            self.workers = []
+
+    @staticmethod
+    def _receive_reported(worker, done, backlog):
+        """
+        Handle the messages sent by a worker so far: reported instances, new
+        tokens for the followers of a filter stage and a None at the end of
+        its token. New tokens are continuations, so they go out first.
+        """
+        try:
+            while worker.conn.poll():
+                message = worker.conn.recv()
+                if message is None:
+                    worker.token = None
+                elif isinstance(message, tuple):
+                    _, token = message
+                    worker.unreported.discard(token[0])
+                    backlog.appendleft(token)
+                else:
+                    worker.unreported.discard(message.name)
+                    done.put(message)
+        except (EOFError, OSError):
+            # the worker died, possibly while sending
+            pass
+
+    def _restart_worker(self, worker, done, lock, backlog):
+        """
+        Report the instances of the token held by a worker which died as
+        errors, and replace the worker. Returns the new worker.
+        """
+        self._receive_reported(worker, done, backlog)
+        if worker.token is None:
+            logger.error(f"Worker process {worker.index} exited unexpectedly")
+        else:
+            name, _, instance, followers = worker.token
+            logger.error(f"Worker process {worker.index} exited unexpectedly "
+                         f"while working on {name}")
+            if instance is None:
+                instance = self.instances[name]
+            for instance in [instance] + (followers or []):
+                if instance.name not in worker.unreported:
+                    continue
+                instance.status = "error"
+                instance.reason = "Worker process died"
+                instance.add_missing_case_status("blocked", instance.reason)
+                pb = ProjectBuilder(instance, self.env, self.jobserver)
+                with lock:
+                    done.put(instance)
+                    pb.report_out(self.results)
+        worker.conn.close()
+        self.workers[worker.index] = LocalWorker(self, worker.index, lock, self.results)
+        return self.workers[worker.index]
+
+    def stop_workers(self):
+        """Stop the worker processes of the 'local' scheduler."""
+        if not self.workers:
+            return
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                # the worker died after its last token
+                pass
+        for worker in self.workers:
+            worker.process.join()
+            worker.conn.close()
+        self.workers = []
+
     @staticmethod
     def get_cmake_filter_stages(filt, logic_keys):
         """ Analyze filter expressions from test yaml and decide if dts and/or kconfig based filtering will be needed."""
@@ -4,7 +4,7 @@
 # Copyright (c) 2018 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import subprocess
+import struct
 import sys
 import os
 import re
@@ -12,9 +12,14 @@ import typing
 import logging
 from twisterlib.error import TwisterRuntimeError
 
+from elftools.elf.elffile import ELFFile
+
 logger = logging.getLogger('twister')
 logger.setLevel(logging.DEBUG)
 
+SHF_ALLOC = 0x2
+SHF_TLS = 0x400
+
 class SizeCalculator:
     alloc_sections = [
         "bss",
@@ -98,6 +103,10 @@ class SizeCalculator:
     # Variable below is stored for calculating size using build.log
     USEFUL_LINES_AMOUNT = 4
 
+    # Section header types binutils does not turn into sections
+    UNLISTED_SECTION_TYPES = ('SHT_NULL', 'SHT_SYMTAB', 'SHT_STRTAB',
+                              'SHT_REL', 'SHT_RELA')
+
     def __init__(self, elf_filename: str,\
         extra_sections: typing.List[str],\
         buildlog_filepath: str = '',\
@@ -105,7 +114,7 @@ class SizeCalculator:
         """Constructor
 
         @param elf_filename (str) Path to the output binary
-            parsed by objdump to determine section sizes.
+            parsed to determine section sizes.
         @param extra_sections (list[str]) List of extra,
             unexpected sections, which Twister should not
             report as error and not include in the
@@ -190,10 +199,10 @@ class SizeCalculator:
         if self.buildlog_filename.endswith("build.log"):
             self._get_footprint_from_buildlog()
 
-    def _check_elf_file(self) -> None:
+    def _check_elf_file(self, f: typing.BinaryIO) -> None:
         # Make sure this is an ELF binary
-        with open(self.elf_filename, "rb") as f:
-            magic = f.read(4)
+        magic = f.read(4)
+        f.seek(0)
 
         try:
             if magic != b'\x7fELF':
@@ -202,53 +211,122 @@ class SizeCalculator:
             print(str(e))
             sys.exit(2)
 
-    def _check_is_xip(self) -> None:
-        # Search for CONFIG_XIP in the ELF's list of symbols using NM and AWK.
-        # GREP can not be used as it returns an error if the symbol is not
-        # found.
-        is_xip_command = "nm " + self.elf_filename + \
-                         " | awk '/CONFIG_XIP/ { print $3 }'"
-        is_xip_output = subprocess.check_output(
-            is_xip_command, shell=True, stderr=subprocess.STDOUT).decode(
-            "utf-8").strip()
+    def _check_is_xip(self, elf: ELFFile) -> None:
+        # Search for a defined symbol with CONFIG_XIP in its name, as
+        # 'nm | awk /CONFIG_XIP/' would.
+        symtab = None
+        for section in elf.iter_sections():
+            if section['sh_type'] == 'SHT_SYMTAB':
+                symtab = section
+                break
+
         try:
-            if is_xip_output.endswith("no symbols"):
+            if symtab is None:
                 raise TwisterRuntimeError("%s has no symbol information" % self.elf_filename)
         except Exception as e:
             print(str(e))
             sys.exit(2)
 
-        self.is_xip = len(is_xip_output) != 0
+        self.is_xip = self._has_defined_symbol(elf, symtab, b"CONFIG_XIP")
 
-    def _get_info_elf_sections(self) -> None:
-        """Calculate RAM and ROM usage and information about issues by section"""
-        objdump_command = "objdump -h " + self.elf_filename
-        objdump_output = subprocess.check_output(
-            objdump_command, shell=True).decode("utf-8").splitlines()
+    @staticmethod
+    def _has_defined_symbol(elf: ELFFile, symtab, text: bytes) -> bool:
+        """Check if a defined symbol has text in its name.
+
+        The string table is searched first, the symbol table is only
+        decoded if text occurs in it, and then without building a Symbol
+        object for every entry.
+        """
+        strtab = symtab.stringtable.data()
+        # String table ranges [start, end] in which a symbol name has to
+        # start to contain text. Names can share a suffix, so st_name
+        # may point into the middle of a string.
+        ranges = []
+        pos = strtab.find(text)
+        while pos >= 0:
+            ranges.append((strtab.rfind(b"\0", 0, pos) + 1, pos))
+            pos = strtab.find(text, pos + 1)
+        if not ranges:
+            return False
+
+        endian = "<" if elf.little_endian else ">"
+        if elf.elfclass == 32:
+            # st_name, st_value, st_size, st_info, st_other, st_shndx
+            sym_format, name_idx, shndx_idx = endian + "IIIBBH", 0, 5
+        else:
+            # st_name, st_info, st_other, st_shndx, st_value, st_size
+            sym_format, name_idx, shndx_idx = endian + "IBBHQQ", 0, 3
+        entry_size = struct.calcsize(sym_format)
+        data = symtab.data()
+        data = data[:len(data) - len(data) % entry_size]
+
+        for sym in struct.iter_unpack(sym_format, data):
+            # SHN_UNDEF, nm shows undefined symbols without a value
+            if sym[shndx_idx] == 0:
+                continue
+            if any(start <= sym[name_idx] <= end for start, end in ranges):
+                return True
+        return False
 
-        for line in objdump_output:
-            words = line.split()
+    @staticmethod
+    def _get_load_address(segments, sh) -> typing.Optional[int]:
+        """Get the load address (LMA) of an allocated section.
 
-            if not words:  # Skip lines that are too short
+        Follows the way binutils derives the LMA from the program headers,
+        so the address matches the 'objdump -h' output.
+
+        @param segments Headers of the PT_LOAD and PT_TLS segments.
+        @param sh Section header.
+        @return Load address, None if no segment contains the section.
+        """
+        if not sh['sh_flags'] & SHF_ALLOC:
+            return None
+
+        segment_type = 'PT_TLS' if sh['sh_flags'] & SHF_TLS else 'PT_LOAD'
+        nobits = sh['sh_type'] == 'SHT_NOBITS'
+        for seg in segments:
+            if seg['p_type'] != segment_type:
+                continue
+            if not nobits and not (
+                    sh['sh_offset'] >= seg['p_offset'] and
+                    sh['sh_offset'] - seg['p_offset'] + sh['sh_size'] <= seg['p_filesz']):
+                continue
+            if not (sh['sh_addr'] >= seg['p_vaddr'] and
+                    sh['sh_addr'] - seg['p_vaddr'] + sh['sh_size'] <= seg['p_memsz']):
                 continue
 
-            index = words[0]
-            if not index[0].isdigit():  # Skip lines that do not start
-                continue  # with a digit
+            if nobits:
+                return seg['p_paddr'] + sh['sh_addr'] - seg['p_vaddr']
+            return seg['p_paddr'] + sh['sh_offset'] - seg['p_offset']
+        return None
 
-            name = words[1]  # Skip lines with section names
-            if name[0] == '.':  # starting with '.'
+    def _get_info_elf_sections(self, elf: ELFFile) -> None:
+        """Calculate RAM and ROM usage and information about issues by section"""
+        segments = [seg.header for seg in elf.iter_segments()]
+        # Some linkers leave p_paddr empty, the LMA is the VMA then
+        if not any(seg['p_paddr'] for seg in segments):
+            segments = []
+
+        for section in elf.iter_sections():
+            # Sections which are not listed by 'objdump -h'
+            if section['sh_type'] in self.UNLISTED_SECTION_TYPES:
+                continue
+
+            name = section.name  # Skip lines with section names
+            if not name or name[0] == '.':  # starting with '.'
                 continue
 
             # TODO this doesn't actually reflect the size in flash or RAM as
             # it doesn't include linker-imposed padding between sections.
             # It is close though.
-            size = int(words[2], 16)
+            size = section['sh_size']
             if size == 0:
                 continue
 
-            load_addr = int(words[4], 16)
-            virt_addr = int(words[3], 16)
+            virt_addr = section['sh_addr']
+            load_addr = self._get_load_address(segments, section.header)
+            if load_addr is None:
+                load_addr = virt_addr
 
             # Add section to memory use totals (for both non-XIP and XIP scenarios)
             # Unrecognized section names are not included in the calculations.
@@ -288,9 +366,11 @@ class SizeCalculator:
                                   "type": stype, "recognized": recognized})
 
     def _analyze_elf_file(self) -> None:
-        self._check_elf_file()
-        self._check_is_xip()
-        self._get_info_elf_sections()
+        with open(self.elf_filename, "rb") as f:
+            self._check_elf_file(f)
+            elf = ELFFile(f)
+            self._check_is_xip(elf)
+            self._get_info_elf_sections(elf)
 
     def _get_buildlog_file_content(self) -> typing.List[str]:
         """Get content of the build.log file.
@@ -50,11 +50,13 @@ class TestInstance:
         self.handler = None
         self.outdir = outdir
         self.execution_time = 0
+        self.build_time = 0
         self.retries = 0
 
         self.name = os.path.join(platform.name, testsuite.name)
         self.run_id = self._get_run_id()
         self.dut = None
+        self.dut_wait_time = 0
         if testsuite.detailed_test_id:
             self.build_dir = os.path.join(outdir, platform.name, testsuite.name)
         else:
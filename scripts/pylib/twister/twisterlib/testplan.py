@@ -13,7 +13,9 @@ import collections
 from collections import OrderedDict
 from itertools import islice
 import logging
+import multiprocessing
 import copy
+import heapq
 import shutil
 import random
 import snippets
@@ -31,6 +33,7 @@ from twisterlib.testsuite import TestSuite, scan_testsuite_path
 from twisterlib.error import TwisterRuntimeError
 from twisterlib.platform import Platform
 from twisterlib.config_parser import TwisterConfigParser
+from twisterlib.discovery_cache import DiscoveryCache
 from twisterlib.testinstance import TestInstance
 from twisterlib.quarantine import Quarantine
 
@@ -88,6 +91,10 @@ class TestPlan:
 
     SAMPLE_FILENAME = 'sample.yaml'
     TESTSUITE_FILENAME = 'testcase.yaml'
+    # Minimum number of testsuites per process when loading them in parallel
+    DISCOVERY_SUITES_PER_JOB = 32
+    # Format version of the test plan files written by save_plan()
+    PLAN_VERSION = 3
 
     def __init__(self, env=None):
 
@@ -116,6 +123,9 @@ class TestPlan:
         self.run_individual_testsuite = []
         self.levels = []
         self.test_config =  {}
+        # instance name -> (build_time or None, run_time) used to balance
+        # subsets, see TwisterRunner.load_durations()
+        self.durations = {}
 
 
     def get_level(self, name):
@@ -171,6 +181,10 @@ class TestPlan:
                 raise TwisterRuntimeError("Tests not found")
 
     def discover(self):
+        if self.options.load_plan:
+            self.load_plan(self.options.load_plan)
+            return
+
         self.handle_modules()
         if self.options.test:
             self.run_individual_testsuite = self.options.test
@@ -220,6 +234,9 @@ class TestPlan:
         elif self.options.load_tests:
             self.load_from_file(self.options.load_tests)
             self.selected_platforms = set(p.platform.name for p in self.instances.values())
+        elif self.options.load_plan:
+            # the plan was loaded by discover()
+            self.selected_platforms = set(p.platform.name for p in self.instances.values())
         elif self.options.test_only:
             # Get list of connected hardware and filter tests to only be run on connected hardware.
             # If the platform does not exist in the hardware map or was not specified by --platform,
@@ -249,7 +266,36 @@ class TestPlan:
             else:
                 raise TwisterRuntimeError(f"You have provided a wrong subset value: {self.options.subset}.")
 
-            self.generate_subset(subset, int(sets))
+            if self.options.balanced_subsets:
+                self.generate_balanced_subset(subset, int(sets))
+            else:
+                self.generate_subset(subset, int(sets))
+
+        if self.options.load_plan:
+            self.prepare_loaded_plan()
+
+    def prepare_loaded_plan(self):
+        """
+        Finish the instances of a loaded test plan, once it is known which of
+        them are going to be used.
+        """
+        if self.options.device_testing or self.options.filter == 'runnable':
+            tfilter = 'runnable'
+        else:
+            tfilter = 'buildable'
+
+        for instance in self.instances.values():
+            instance.run_id = instance._get_run_id()
+            # the runnable state depends on the hardware and simulators
+            # available here, not where the plan was generated
+            instance.run = instance.check_runnable(
+                self.options.enable_slow,
+                tfilter,
+                self.options.fixture,
+                self.hwm
+            )
+            if instance.status != "filtered":
+                instance.create_overlay(instance.platform, self.options.enable_asan, self.options.enable_ubsan, self.options.enable_coverage, self.options.coverage_platform)
 
     def generate_subset(self, subset, sets):
         # Test instances are sorted depending on the context. For CI runs
@@ -306,6 +352,44 @@ class TestPlan:
             self.instances.update(errors)
 
 
+    def generate_balanced_subset(self, subset, sets):
+        """
+        Split the test instances into sets of equal expected build and run
+        time and keep the given subset. Expected times come from the recorded
+        durations or are estimated. The assignment only depends on the
+        instances and the durations, so the subsets of jobs using the same
+        durations file don't overlap.
+        """
+        # runner imports this module
+        from twisterlib.runner import TwisterRunner
+
+        to_run = {k : v for k,v in self.instances.items() if v.status is None}
+        expected = {name: TwisterRunner.estimate_duration(instance, self.durations)
+                    for name, instance in to_run.items()}
+
+        # Longest first, each instance goes to the set with the lowest
+        # expected time so far, ties going to the lowest set number.
+        loads = [(0, i) for i in range(1, sets + 1)]
+        selected = set()
+        for name in sorted(expected, key=lambda name: (-expected[name], name)):
+            load, index = heapq.heappop(loads)
+            if index == subset:
+                selected.add(name)
+            heapq.heappush(loads, (load + expected[name], index))
+
+        subset_load = next(load for load, index in loads if index == subset)
+        logger.info(f"Expected duration of subset {subset}/{sets}: {subset_load:.0f}s "
+                    f"({len(selected)} instances)")
+
+        skipped = {k : v for k,v in self.instances.items() if v.status == 'skipped'}
+        errors = {k : v for k,v in self.instances.items() if v.status == 'error'}
+        self.instances = OrderedDict((k, v) for k, v in self.instances.items() if k in selected)
+        if subset == 1:
+            # add all pre-filtered tests that are skipped or got error status
+            # to the first set, as generate_subset() does.
+            self.instances.update(skipped)
+            self.instances.update(errors)
+
     def handle_modules(self):
         # get all enabled west projects
         modules_meta = parse_modules(ZEPHYR_BASE)
@@ -396,6 +480,7 @@ class TestPlan:
 
 
     def add_configurations(self):
+        platform_names = set(p.name for p in self.platforms)
         for board_root in self.env.board_roots:
             board_root = os.path.abspath(board_root)
             logger.debug("Reading platform configuration files under %s..." %
@@ -406,7 +491,7 @@ class TestPlan:
                 try:
                     platform = Platform()
                     platform.load(file)
-                    if platform.name in [p.name for p in self.platforms]:
+                    if platform.name in platform_names:
                         logger.error(f"Duplicate platform {platform.name} in {file}")
                         raise Exception(f"Duplicate platform identifier {platform.name} found")
 
@@ -414,6 +499,7 @@ class TestPlan:
                         continue
 
                     self.platforms.append(platform)
+                    platform_names.add(platform.name)
                     if not platform_config.get('override_default_platforms', False):
                         if platform.default:
                             logger.debug(f"adding {platform.name} to default platforms")
@@ -448,6 +534,7 @@ class TestPlan:
                                         platform_revision.name = f"{platform.name}@{revision}"
                                         platform_revision.default = False
                                         self.platforms.append(platform_revision)
+                                        platform_names.add(platform_revision.name)
 
                                     break
 
@@ -467,6 +554,11 @@ class TestPlan:
         return testcases
 
     def add_testsuites(self, testsuite_filter=[]):
+        cache = None
+        if self.options.discovery_cache:
+            cache = DiscoveryCache(self.options.discovery_cache)
+
+        suite_dirs = []
         for root in self.env.test_roots:
             root = os.path.abspath(root)
 
@@ -495,26 +587,71 @@ class TestPlan:
                         suite_yaml_path = alt_config
                         break
 
-                try:
-                    parsed_data = TwisterConfigParser(suite_yaml_path, self.suite_schema)
-                    parsed_data.load()
-                    subcases, ztest_suite_names = scan_testsuite_path(suite_path)
-
-                    for name in parsed_data.scenarios.keys():
-                        suite_dict = parsed_data.get_scenario(name)
-                        suite = TestSuite(root, suite_path, name, data=suite_dict, detailed_test_id=self.options.detailed_test_id)
-                        suite.add_subcases(suite_dict, subcases, ztest_suite_names)
-                        if testsuite_filter:
-                            if suite.name and suite.name in testsuite_filter:
-                                self.testsuites[suite.name] = suite
-                        else:
+                suite_dirs.append((root, suite_yaml_path, suite_path))
+
+        suites_data = self.load_testsuites_data(
+            [(suite_yaml_path, suite_path) for _, suite_yaml_path, suite_path in suite_dirs],
+            cache)
+        for (root, _, suite_path), (data, error) in zip(suite_dirs, suites_data):
+            if error:
+                logger.error(f"{suite_path}: can't load (skipping): {error}")
+                self.load_errors += 1
+                continue
+
+            scenarios, subcases, ztest_suite_names = data
+            try:
+                for name, suite_dict in scenarios.items():
+                    suite = TestSuite(root, suite_path, name, data=suite_dict, detailed_test_id=self.options.detailed_test_id)
+                    suite.add_subcases(suite_dict, subcases, ztest_suite_names)
+                    if testsuite_filter:
+                        if suite.name and suite.name in testsuite_filter:
                             self.testsuites[suite.name] = suite
+                    else:
+                        self.testsuites[suite.name] = suite
 
-                except Exception as e:
-                    logger.error(f"{suite_path}: can't load (skipping): {e!r}")
-                    self.load_errors += 1
+            except Exception as e:
+                logger.error(f"{suite_path}: can't load (skipping): {e!r}")
+                self.load_errors += 1
+
+        if cache:
+            cache.save()
         return len(self.testsuites)
 
+    def load_testsuites_data(self, suite_paths, cache=None):
+        """
+        Generate (data, error) for each (suite_yaml_path, suite_path), in
+        order, with data as returned by load_testsuite_data() or error set
+        to the repr() of the exception raised by it.
+
+        Large trees are processed by a pool of worker processes, at least
+        DISCOVERY_SUITES_PER_JOB testsuites per process. The messages the
+        workers log are emitted here, in the order of the testsuites.
+        """
+        jobs = min(self.options.jobs or multiprocessing.cpu_count(),
+                   len(suite_paths) // self.DISCOVERY_SUITES_PER_JOB)
+
+        if jobs < 2:
+            for suite_yaml_path, suite_path in suite_paths:
+                try:
+                    yield load_testsuite_data(suite_yaml_path, suite_path,
+                                              self.suite_schema, cache), None
+                except Exception as e:
+                    yield None, repr(e)
+            return
+
+        logger.debug(f"Loading {len(suite_paths)} testsuites using {jobs} processes")
+        init_args = (self.suite_schema,
+                     cache.path if cache else None,
+                     cache.entries if cache else None)
+        with multiprocessing.Pool(jobs, _init_discovery_worker, init_args) as pool:
+            for data, error, records, cache_updates in pool.imap(
+                    _discover_testsuite, suite_paths, chunksize=8):
+                for record in records:
+                    logger.handle(record)
+                if cache:
+                    cache.update(cache_updates)
+                yield data, error
+
     def __str__(self):
         return self.name
 
@@ -553,6 +690,9 @@ class TestPlan:
                 )
 
                 instance.metrics['handler_time'] = ts.get('execution_time', 0)
+                instance.metrics['build_time'] = ts.get('build_time', 0)
+                # kept by --test-only runs, which don't build again
+                instance.build_time = float(ts.get('build_time', 0))
                 instance.metrics['used_ram'] = ts.get("used_ram", 0)
                 instance.metrics['used_rom']  = ts.get("used_rom",0)
                 instance.metrics['available_ram'] = ts.get('available_ram', 0)
@@ -592,6 +732,109 @@ class TestPlan:
                 instance_list.append(instance)
             self.add_instances(instance_list)
 
+    def save_plan(self, filename):
+        """
+        Save the test plan as JSON lines, so a later run can load it with
+        --load-plan instead of discovering and filtering the testsuites
+        again. The first line is a header with the plan version, followed by
+        one line per platform, per testsuite and per instance.
+        """
+        header = {
+            "version": self.PLAN_VERSION,
+            "zephyr_base": ZEPHYR_BASE,
+            "default_platforms": self.default_platforms,
+        }
+        tmp_filename = f"{filename}.tmp.{os.getpid()}"
+        with open(tmp_filename, "wt", encoding="utf-8") as fp:
+            fp.write(json.dumps(header) + "\n")
+            for platform in self.platforms:
+                fp.write(_plan_dumps({"platform": vars(platform)}) + "\n")
+            for testsuite in self.testsuites.values():
+                suite = vars(testsuite).copy()
+                suite["testcases"] = [[tc.name, tc.freeform] for tc in testsuite.testcases]
+                fp.write(_plan_dumps({"testsuite": suite}) + "\n")
+            for instance in self.instances.values():
+                entry = {
+                    "testsuite": instance.testsuite.name,
+                    "platform": instance.platform.name,
+                    "status": instance.status,
+                    "reason": instance.reason,
+                    "filters": instance.filters,
+                    "filter_type": instance.filter_type,
+                    "testcases": [[tc.name, tc.status, tc.reason]
+                                  for tc in instance.testcases if tc.status],
+                }
+                fp.write(json.dumps({"instance": entry}) + "\n")
+        os.replace(tmp_filename, filename)
+
+    def load_plan(self, filename):
+        """
+        Load a test plan written by save_plan(), restoring its platforms,
+        testsuites and instances.
+        """
+        try:
+            with open(filename, "rt", encoding="utf-8") as fp:
+                header = json.loads(fp.readline())
+                entries = [_plan_loads(line) for line in fp if line.strip()]
+        except (OSError, ValueError) as e:
+            raise TwisterRuntimeError(f"Can't load test plan {filename}: {e}")
+
+        if not isinstance(header, dict) or header.get("version") != self.PLAN_VERSION:
+            raise TwisterRuntimeError(f"Test plan {filename} was generated by "
+                                      "another version of twister")
+        if header.get("zephyr_base") != ZEPHYR_BASE:
+            raise TwisterRuntimeError(f"Test plan {filename} was generated for "
+                                      f"ZEPHYR_BASE {header.get('zephyr_base')}")
+
+        self.default_platforms = header["default_platforms"]
+        instance_entries = []
+        for entry in entries:
+            if "platform" in entry:
+                platform = Platform()
+                platform.__dict__.update(entry["platform"])
+                # the environment of this host counts, not the one of the
+                # host which generated the plan
+                platform.env_satisfied = all(os.environ.get(env) for env in platform.env)
+                self.platforms.append(platform)
+            elif "testsuite" in entry:
+                suite = entry["testsuite"]
+                testcases = suite.pop("testcases")
+                testsuite = TestSuite.__new__(TestSuite)
+                testsuite.__dict__.update(suite, testcases=[])
+                for name, freeform in testcases:
+                    testsuite.add_testcase(name, freeform)
+                self.testsuites[testsuite.name] = testsuite
+            else:
+                instance_entries.append(entry["instance"])
+        self.platform_names = [p.name for p in self.platforms]
+
+        platforms = {p.name: p for p in self.platforms}
+        instance_list = []
+        for entry in instance_entries:
+            testsuite = self.testsuites.get(entry["testsuite"])
+            if not testsuite:
+                raise TwisterRuntimeError(f"Test plan {filename}: testsuite "
+                                          f"{entry['testsuite']} not found")
+            platform = platforms.get(entry["platform"])
+            if not platform:
+                raise TwisterRuntimeError(f"Test plan {filename}: platform "
+                                          f"{entry['platform']} not found")
+
+            instance = TestInstance(testsuite, platform, self.env.outdir)
+            instance.status = entry["status"]
+            instance.reason = entry["reason"]
+            instance.filters = entry["filters"]
+            instance.filter_type = entry["filter_type"]
+            for name, status, reason in entry["testcases"]:
+                instance.set_case_status_by_name(name, status, reason)
+            instance_list.append(instance)
+        self.add_instances(instance_list)
+
+        self.filtered_platforms = set(p.platform.name for p in self.instances.values()
+                                      if p.status != "skipped" )
+        logger.info(f"Loaded test plan {filename}: {len(self.testsuites)} testsuites, "
+                    f"{len(self.instances)} instances")
+
     def apply_filters(self, **kwargs):
 
         toolchain = self.env.toolchain
@@ -633,6 +876,8 @@ class TestPlan:
         elif vendor_filter:
             vendor_platforms = True
 
+        default_platform_names = set(self.default_platforms)
+
         if platform_filter:
             self.verify_platforms_existence(platform_filter, f"platform_filter")
             platforms = list(filter(lambda p: p.name in platform_filter, self.platforms))
@@ -644,7 +889,7 @@ class TestPlan:
         elif arch_filter:
             platforms = list(filter(lambda p: p.arch in arch_filter, self.platforms))
         elif default_platforms:
-            _platforms = list(filter(lambda p: p.name in self.default_platforms, self.platforms))
+            _platforms = list(filter(lambda p: p.name in default_platform_names, self.platforms))
             platforms = []
             # default platforms that can't be run are dropped from the list of
             # the default platforms list. Default platforms should always be
@@ -658,19 +903,32 @@ class TestPlan:
         else:
             platforms = self.platforms
 
+        platform_filter = set(platform_filter)
+        exclude_platform = set(exclude_platform)
         platform_config = self.test_config.get('platforms', {})
+        increased_platform_scope = platform_config.get('increased_platform_scope', True)
+        test_level = self.get_level(self.options.level) if self.options.level else None
+        tfilter = 'runnable' if runnable else 'buildable'
+
+        # per platform attributes used as sets by the filters below, computed
+        # once instead of for every testsuite
+        platform_sets = {
+            p.name: (set(p.supported), set(p.ignore_tags), set(p.only_tags))
+            for p in self.platforms
+        }
+
         logger.info("Building initial testsuite list...")
 
         keyed_tests = {}
 
         for ts_name, ts in self.testsuites.items():
-            if ts.build_on_all and not platform_filter and platform_config.get('increased_platform_scope', True):
+            if ts.build_on_all and not platform_filter and increased_platform_scope:
                 platform_scope = self.platforms
             elif ts.integration_platforms and self.options.integration:
                 self.verify_platforms_existence(
                     ts.integration_platforms, f"{ts_name} - integration_platforms")
-                platform_scope = list(filter(lambda item: item.name in ts.integration_platforms, \
-                                         self.platforms))
+                integration_platforms = set(ts.integration_platforms)
+                platform_scope = [p for p in self.platforms if p.name in integration_platforms]
             else:
                 platform_scope = platforms
 
@@ -678,67 +936,90 @@ class TestPlan:
 
             # If there isn't any overlap between the platform_allow list and the platform_scope
             # we set the scope to the platform_allow list
-            if ts.platform_allow and not platform_filter and not integration and platform_config.get('increased_platform_scope', True):
+            if ts.platform_allow and not platform_filter and not integration and increased_platform_scope:
                 self.verify_platforms_existence(
                     ts.platform_allow, f"{ts_name} - platform_allow")
-                a = set(platform_scope)
-                b = set(filter(lambda item: item.name in ts.platform_allow, self.platforms))
-                c = a.intersection(b)
-                if not c:
-                    platform_scope = list(filter(lambda item: item.name in ts.platform_allow, \
-                                             self.platforms))
+                platform_allow = set(ts.platform_allow)
+                if not any(p.name in platform_allow for p in platform_scope):
+                    platform_scope = [p for p in self.platforms if p.name in platform_allow]
+
+            # Platforms not matching the testsuite type (unit or not) are
+            # discarded silently.
+            platform_scope = [p for p in platform_scope
+                              if (p.arch == "unit") == (ts.type == "unit")]
+
+            # no configurations, so jump to next testsuite
+            if not platform_scope:
+                continue
+
+            selected = self._select_platform_names(ts, platform_scope, default_platforms,
+                                                   default_platform_names, integration)
+
+            # Filters which only depend on the testsuite and the command line
+            # options. They are still applied per instance, in the order below,
+            # as the last filter added gives the reason of an instance.
+            missing_modules = bool(ts.modules and self.modules
+                                   and not set(ts.modules).issubset(set(self.modules)))
+            not_in_level = bool(self.options.level and ts.id not in test_level.scenarios
+                                and not set(ts.levels).intersection(set(test_level.levels)))
+            tag_filtered = bool(tag_filter and not ts.tags.intersection(tag_filter))
+            tag_excluded = bool(exclude_tag and ts.tags.intersection(exclude_tag))
+            name_filtered = bool(testsuite_filter and ts_name not in testsuite_filter)
+            toolchain_excluded = bool(ts.toolchain_exclude and toolchain in ts.toolchain_exclude)
+            toolchain_not_allowed = bool(ts.toolchain_allow and toolchain not in ts.toolchain_allow)
+            platform_key = not ignore_platform_key and getattr(ts, 'platform_key', None)
+            found_snippets = None
+            if ts.required_snippets:
+                snippet_args = {"snippets": ts.required_snippets}
+                found_snippets = snippets.find_snippets_in_roots(snippet_args, [Path(ZEPHYR_BASE), Path(ts.source_dir)])
+
             # list of instances per testsuite, aka configurations.
             instance_list = []
             for plat in platform_scope:
-                instance = TestInstance(ts, plat, self.env.outdir)
-                if runnable:
-                    tfilter = 'runnable'
-                else:
-                    tfilter = 'buildable'
+                if selected is not None and plat.name not in selected:
+                    # Not part of the plan, no instance is created. The platform
+                    # still covers the platform key of the testsuite.
+                    if platform_key:
+                        self._match_platform_key(ts, plat, keyed_tests)
+                    continue
 
+                instance = TestInstance(ts, plat, self.env.outdir)
                 instance.run = instance.check_runnable(
                     self.options.enable_slow,
                     tfilter,
                     self.options.fixture,
                     self.hwm
                 )
+                plat_supported, plat_ignore_tags, plat_only_tags = platform_sets[plat.name]
 
                 if not force_platform and plat.name in exclude_platform:
                     instance.add_filter("Platform is excluded on command line.", Filters.CMD_LINE)
 
-                if (plat.arch == "unit") != (ts.type == "unit"):
-                    # Discard silently
-                    continue
+                if missing_modules:
+                    instance.add_filter(f"one or more required modules not available: {','.join(ts.modules)}", Filters.MODULE)
 
-                if ts.modules and self.modules:
-                    if not set(ts.modules).issubset(set(self.modules)):
-                        instance.add_filter(f"one or more required modules not available: {','.join(ts.modules)}", Filters.MODULE)
-
-                if self.options.level:
-                    tl = self.get_level(self.options.level)
-                    planned_scenarios = tl.scenarios
-                    if ts.id not in planned_scenarios and not set(ts.levels).intersection(set(tl.levels)):
-                        instance.add_filter("Not part of requested test plan", Filters.TESTSUITE)
+                if not_in_level:
+                    instance.add_filter("Not part of requested test plan", Filters.TESTSUITE)
 
                 if runnable and not instance.run:
                     instance.add_filter("Not runnable on device", Filters.CMD_LINE)
 
-                if self.options.integration and ts.integration_platforms and plat.name not in ts.integration_platforms:
+                if integration and plat.name not in ts.integration_platforms:
                     instance.add_filter("Not part of integration platforms", Filters.TESTSUITE)
 
                 if ts.skip:
                     instance.add_filter("Skip filter", Filters.SKIP)
 
-                if tag_filter and not ts.tags.intersection(tag_filter):
+                if tag_filtered:
                     instance.add_filter("Command line testsuite tag filter", Filters.CMD_LINE)
 
                 if slow_only and not ts.slow:
                     instance.add_filter("Not a slow test", Filters.CMD_LINE)
 
-                if exclude_tag and ts.tags.intersection(exclude_tag):
+                if tag_excluded:
                     instance.add_filter("Command line testsuite exclude filter", Filters.CMD_LINE)
 
-                if testsuite_filter and ts_name not in testsuite_filter:
+                if name_filtered:
                     instance.add_filter("TestSuite name filter", Filters.CMD_LINE)
 
                 if arch_filter and plat.arch not in arch_filter:
@@ -755,7 +1036,7 @@ class TestPlan:
                     if ts.platform_exclude and plat.name in ts.platform_exclude:
                         instance.add_filter("In test case platform exclude", Filters.TESTSUITE)
 
-                if ts.toolchain_exclude and toolchain in ts.toolchain_exclude:
+                if toolchain_excluded:
                     instance.add_filter("In test case toolchain exclude", Filters.TOOLCHAIN)
 
                 if platform_filter and plat.name not in platform_filter:
@@ -769,7 +1050,7 @@ class TestPlan:
                 if ts.platform_type and plat.type not in ts.platform_type:
                     instance.add_filter("Not in testsuite platform type list", Filters.TESTSUITE)
 
-                if ts.toolchain_allow and toolchain not in ts.toolchain_allow:
+                if toolchain_not_allowed:
                     instance.add_filter("Not in testsuite toolchain allow list", Filters.TOOLCHAIN)
 
                 if not plat.env_satisfied:
@@ -788,27 +1069,23 @@ class TestPlan:
                     if ts.harness == 'robot' and plat.simulation != 'renode':
                         instance.add_filter("No robot support for the selected platform", Filters.SKIP)
 
-                if ts.depends_on:
-                    dep_intersection = ts.depends_on.intersection(set(plat.supported))
-                    if dep_intersection != set(ts.depends_on):
-                        instance.add_filter("No hardware support", Filters.PLATFORM)
+                if ts.depends_on and not ts.depends_on.issubset(plat_supported):
+                    instance.add_filter("No hardware support", Filters.PLATFORM)
 
                 if plat.flash < ts.min_flash:
                     instance.add_filter("Not enough FLASH", Filters.PLATFORM)
 
-                if set(plat.ignore_tags) & ts.tags:
+                if plat_ignore_tags & ts.tags:
                     instance.add_filter("Excluded tags per platform (exclude_tags)", Filters.PLATFORM)
 
-                if plat.only_tags and not set(plat.only_tags) & ts.tags:
+                if plat_only_tags and not plat_only_tags & ts.tags:
                     instance.add_filter("Excluded tags per platform (only_tags)", Filters.PLATFORM)
 
                 if ts.required_snippets:
                     missing_snippet = False
-                    snippet_args = {"snippets": ts.required_snippets}
-                    found_snippets = snippets.find_snippets_in_roots(snippet_args, [Path(ZEPHYR_BASE), Path(ts.source_dir)])
 
                     # Search and check that all required snippet files are found
-                    for this_snippet in snippet_args['snippets']:
+                    for this_snippet in ts.required_snippets:
                         if this_snippet not in found_snippets:
                             logger.error(f"Can't find snippet '%s' for test '%s'", this_snippet, ts.name)
                             instance.status = "error"
@@ -842,32 +1119,10 @@ class TestPlan:
                                 instance.add_filter("Snippet not supported", Filters.PLATFORM)
                                 break
 
-                # platform_key is a list of unique platform attributes that form a unique key a test
-                # will match against to determine if it should be scheduled to run. A key containing a
-                # field name that the platform does not have will filter the platform.
-                #
-                # A simple example is keying on arch and simulation to run a test once per unique (arch, simulation) platform.
-                if not ignore_platform_key and hasattr(ts, 'platform_key') and len(ts.platform_key) > 0:
-                    # form a key by sorting the key fields first, then fetching the key fields from plat if they exist
-                    # if a field does not exist the test is still scheduled on that platform as its undeterminable.
-                    key_fields = sorted(set(ts.platform_key))
-                    key = [getattr(plat, key_field) for key_field in key_fields]
-                    has_all_fields = True
-                    for key_field in key_fields:
-                        if key_field is None or key_field == 'na':
-                            has_all_fields = False
-                    if has_all_fields:
-                        test_key = copy.deepcopy(key)
-                        test_key.append(ts.name)
-                        test_key = tuple(test_key)
-                        keyed_test = keyed_tests.get(test_key)
-                        if keyed_test is not None:
-                            plat_key = {key_field: getattr(keyed_test['plat'], key_field) for key_field in key_fields}
-                            instance.add_filter(f"Excluded test already covered for key {tuple(key)} by platform {keyed_test['plat'].name} having key {plat_key}", Filters.PLATFORM_KEY)
-                        else:
-                            keyed_tests[test_key] = {'plat': plat, 'ts': ts}
-                    else:
-                        instance.add_filter(f"Excluded platform missing key fields demanded by test {key_fields}", Filters.PLATFORM)
+                if platform_key:
+                    key_filter = self._match_platform_key(ts, plat, keyed_tests)
+                    if key_filter:
+                        instance.add_filter(*key_filter)
 
                 # handle quarantined tests
                 if self.quarantine:
@@ -883,42 +1138,16 @@ class TestPlan:
                 # needs to be added.
                 instance_list.append(instance)
 
-            # no configurations, so jump to next testsuite
-            if not instance_list:
-                continue
-
-            # if twister was launched with no platform options at all, we
-            # take all default platforms
-            if default_platforms and not ts.build_on_all and not integration:
-                if ts.platform_allow:
-                    a = set(self.default_platforms)
-                    b = set(ts.platform_allow)
-                    c = a.intersection(b)
-                    if c:
-                        aa = list(filter(lambda ts: ts.platform.name in c, instance_list))
-                        self.add_instances(aa)
-                    else:
-                        self.add_instances(instance_list)
-                else:
-                    instances = list(filter(lambda ts: ts.platform.name in self.default_platforms, instance_list))
-                    self.add_instances(instances)
-            elif integration:
-                instances = list(filter(lambda item:  item.platform.name in ts.integration_platforms, instance_list))
-                self.add_instances(instances)
-
-            elif emulation_platforms:
-                self.add_instances(instance_list)
-                for instance in list(filter(lambda inst: not inst.platform.simulation != 'na', instance_list)):
-                    instance.add_filter("Not an emulated platform", Filters.CMD_LINE)
-            elif vendor_platforms:
-                self.add_instances(instance_list)
-                for instance in list(filter(lambda inst: not inst.platform.vendor in vendor_filter, instance_list)):
-                    instance.add_filter("Not a selected vendor platform", Filters.CMD_LINE)
-            else:
-                self.add_instances(instance_list)
+            self.add_instances(instance_list)
 
-        for _, case in self.instances.items():
-            case.create_overlay(case.platform, self.options.enable_asan, self.options.enable_ubsan, self.options.enable_coverage, self.options.coverage_platform)
+            if emulation_platforms and not integration:
+                for instance in instance_list:
+                    if instance.platform.simulation == 'na':
+                        instance.add_filter("Not an emulated platform", Filters.CMD_LINE)
+            elif vendor_platforms and not integration:
+                for instance in instance_list:
+                    if instance.platform.vendor not in vendor_filter:
+                        instance.add_filter("Not a selected vendor platform", Filters.CMD_LINE)
 
         self.selected_platforms = set(p.platform.name for p in self.instances.values())
 
@@ -928,9 +1157,68 @@ class TestPlan:
 
             filtered_instance.add_missing_case_status(filtered_instance.status)
 
+        for _, case in self.instances.items():
+            # Instances which stay filtered are never built, they don't need
+            # an overlay. Filtered instances turned into errors on integration
+            # platforms get one, they are built again by --retry-build-errors.
+            if case.status == "filtered":
+                continue
+            case.create_overlay(case.platform, self.options.enable_asan, self.options.enable_ubsan, self.options.enable_coverage, self.options.coverage_platform)
+
         self.filtered_platforms = set(p.platform.name for p in self.instances.values()
                                       if p.status != "skipped" )
 
+    def _select_platform_names(self, ts, platform_scope, default_platforms,
+                               default_platform_names, integration):
+        """
+        Names of the platforms of platform_scope which are part of the test
+        plan for testsuite ts, None if all of them are.
+        """
+        # if twister was launched with no platform options at all, we
+        # take all default platforms
+        if default_platforms and not ts.build_on_all and not integration:
+            if ts.platform_allow:
+                c = default_platform_names.intersection(ts.platform_allow)
+                if c:
+                    return c
+                return None
+            return default_platform_names
+        elif integration:
+            return set(ts.integration_platforms)
+        return None
+
+    @staticmethod
+    def _match_platform_key(ts, plat, keyed_tests):
+        """
+        Check plat against the platform_key of testsuite ts and record it in
+        keyed_tests. Returns the (reason, filter type) of the filter to add to
+        the instance, None if the platform is the first one covering its key.
+        """
+        # platform_key is a list of unique platform attributes that form a unique key a test
+        # will match against to determine if it should be scheduled to run. A key containing a
+        # field name that the platform does not have will filter the platform.
+        #
+        # A simple example is keying on arch and simulation to run a test once per unique (arch, simulation) platform.
+        # form a key by sorting the key fields first, then fetching the key fields from plat if they exist
+        # if a field does not exist the test is still scheduled on that platform as its undeterminable.
+        key_fields = sorted(set(ts.platform_key))
+        key = [getattr(plat, key_field) for key_field in key_fields]
+        has_all_fields = True
+        for key_field in key_fields:
+            if key_field is None or key_field == 'na':
+                has_all_fields = False
+        if not has_all_fields:
+            return (f"Excluded platform missing key fields demanded by test {key_fields}", Filters.PLATFORM)
+
+        test_key = tuple(key + [ts.name])
+        keyed_test = keyed_tests.get(test_key)
+        if keyed_test is not None:
+            plat_key = {key_field: getattr(keyed_test['plat'], key_field) for key_field in key_fields}
+            return (f"Excluded test already covered for key {tuple(key)} by platform {keyed_test['plat'].name} having key {plat_key}", Filters.PLATFORM_KEY)
+
+        keyed_tests[test_key] = {'plat': plat, 'ts': ts}
+        return None
+
     def add_instances(self, instance_list):
         for instance in instance_list:
             self.instances[instance.name] = instance
@@ -1000,6 +1288,95 @@ class TestPlan:
         self.link_dir_counter += 1
 
 
+def load_testsuite_data(suite_yaml_path, suite_path, suite_schema, cache=None):
+    """
+    Parse a testsuite configuration file and scan the testsuite sources for
+    test cases. Returns the scenarios (name to configuration dictionary), the
+    test case names and the ztest suite names found.
+    """
+    if cache:
+        scenarios = cache.load_scenarios(suite_yaml_path, suite_schema)
+        subcases, ztest_suite_names = scan_testsuite_path(
+            suite_path, scanner=cache.scan_file)
+    else:
+        parsed_data = TwisterConfigParser(suite_yaml_path, suite_schema)
+        parsed_data.load()
+        scenarios = {name: parsed_data.get_scenario(name)
+                     for name in parsed_data.scenarios.keys()}
+        subcases, ztest_suite_names = scan_testsuite_path(suite_path)
+
+    return scenarios, subcases, ztest_suite_names
+
+
+class _LogCollector(logging.Handler):
+    """Keeps the messages logged by a discovery worker process."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Format the message here, the arguments may not be picklable
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+# State of a discovery worker process
+_discovery_worker = {}
+
+
+def _init_discovery_worker(suite_schema, cache_path, cache_entries):
+    collector = _LogCollector()
+    logger.handlers = [collector]
+    logger.propagate = False
+    _discovery_worker["collector"] = collector
+    _discovery_worker["schema"] = suite_schema
+    _discovery_worker["cache"] = None
+    if cache_path:
+        _discovery_worker["cache"] = DiscoveryCache(cache_path, entries=cache_entries)
+
+
+def _discover_testsuite(paths):
+    suite_yaml_path, suite_path = paths
+    collector = _discovery_worker["collector"]
+    cache = _discovery_worker["cache"]
+
+    collector.records = []
+    data = error = None
+    try:
+        data = load_testsuite_data(suite_yaml_path, suite_path,
+                                   _discovery_worker["schema"], cache)
+    except Exception as e:
+        error = repr(e)
+
+    cache_updates = cache.take_updates() if cache else {}
+    return data, error, collector.records, cache_updates
+
+
+def _plan_default(obj):
+    # sets (tags, supported features, ...) are not JSON serializable
+    if isinstance(obj, set):
+        return {"__set__": sorted(obj, key=str)}
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _plan_object_hook(obj):
+    if len(obj) == 1 and "__set__" in obj:
+        return set(obj["__set__"])
+    return obj
+
+
+def _plan_dumps(entry):
+    """One line of a test plan file, see TestPlan.save_plan()."""
+    return json.dumps(entry, default=_plan_default)
+
+
+def _plan_loads(line):
+    return json.loads(line, object_hook=_plan_object_hook)
+
+
 def change_skip_to_error_if_integration(options, instance):
     ''' All skips on integration_platforms are treated as errors.'''
     if instance.platform.name in instance.testsuite.integration_platforms \
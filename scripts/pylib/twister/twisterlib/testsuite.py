@@ -3,13 +3,13 @@
 # Copyright (c) 2018-2022 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import functools
 import os
 from pathlib import Path
 import re
 import logging
 import contextlib
 import mmap
-import glob
 from typing import List
 from twisterlib.mixins import DisablePyTestCollectionMixin
 from twisterlib.environment import canonical_zephyr_base
@@ -62,38 +62,79 @@ class ScanPathResult:
                 (sorted(self.ztest_suite_names) ==
                  sorted(other.ztest_suite_names)))
 
-def scan_file(inf_name):
-    regular_suite_regex = re.compile(
-        # do not match until end-of-line, otherwise we won't allow
-        # stc_regex below to catch the ones that are declared in the same
-        # line--as we only search starting the end of this match
-        br"^\s*ztest_test_suite\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
-        re.MULTILINE)
-    registered_suite_regex = re.compile(
-        br"^\s*ztest_register_test_suite"
-        br"\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
-        re.MULTILINE)
-    new_suite_regex = re.compile(
-        br"^\s*ZTEST_SUITE\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
-        re.MULTILINE)
-    testcase_regex = re.compile(
-        br"^\s*(?:ZTEST|ZTEST_F|ZTEST_USER|ZTEST_USER_F)\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,"
-        br"\s*(?P<testcase_name>[a-zA-Z0-9_]+)\s*",
-        re.MULTILINE)
-    # Checks if the file contains a definition of "void test_main(void)"
-    # Since ztest provides a plain test_main implementation it is OK to:
-    # 1. register test suites and not call the run function iff the test
-    #    doesn't have a custom test_main.
-    # 2. register test suites and a custom test_main definition iff the test
-    #    also calls ztest_run_registered_test_suites.
-    test_main_regex = re.compile(
-        br"^\s*void\s+test_main\(void\)",
-        re.MULTILINE)
-    registered_suite_run_regex = re.compile(
-        br"^\s*ztest_run_registered_test_suites\("
-        br"(\*+|&)?(?P<state_identifier>[a-zA-Z0-9_]+)\)",
-        re.MULTILINE)
+# Regular expressions used to scan test sources, together with a literal
+# which any match contains. Files without the literal are not searched.
+_regular_suite_regex = re.compile(
+    # do not match until end-of-line, otherwise we won't allow
+    # stc_regex below to catch the ones that are declared in the same
+    # line--as we only search starting the end of this match
+    br"^\s*ztest_test_suite\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
+    re.MULTILINE)
+_registered_suite_regex = re.compile(
+    br"^\s*ztest_register_test_suite"
+    br"\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
+    re.MULTILINE)
+_new_suite_regex = re.compile(
+    br"^\s*ZTEST_SUITE\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,",
+    re.MULTILINE)
+_new_testcase_regex = re.compile(
+    br"^\s*(?:ZTEST|ZTEST_F|ZTEST_USER|ZTEST_USER_F)\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,"
+    br"\s*(?P<testcase_name>[a-zA-Z0-9_]+)\s*",
+    re.MULTILINE)
+# Checks if the file contains a definition of "void test_main(void)"
+# Since ztest provides a plain test_main implementation it is OK to:
+# 1. register test suites and not call the run function iff the test
+#    doesn't have a custom test_main.
+# 2. register test suites and a custom test_main definition iff the test
+#    also calls ztest_run_registered_test_suites.
+_test_main_regex = re.compile(
+    br"^\s*void\s+test_main\(void\)",
+    re.MULTILINE)
+_registered_suite_run_regex = re.compile(
+    br"^\s*ztest_run_registered_test_suites\("
+    br"(\*+|&)?(?P<state_identifier>[a-zA-Z0-9_]+)\)",
+    re.MULTILINE)
+_regular_testcase_regex = re.compile(
+    br"""^\s*  # empty space at the beginning is ok
+    # catch the case where it is declared in the same sentence, e.g:
+    #
+    # ztest_test_suite(mutex_complex, ztest_user_unit_test(TESTNAME));
+    # ztest_register_test_suite(n, p, ztest_user_unit_test(TESTNAME),
+    (?:ztest_
+        (?:test_suite\(|register_test_suite\([a-zA-Z0-9_]+\s*,\s*)
+        [a-zA-Z0-9_]+\s*,\s*
+    )?
+    # Catch ztest[_user]_unit_test-[_setup_teardown](TESTNAME)
+    ztest_(?:1cpu_)?(?:user_)?unit_test(?:_setup_teardown)?
+    # Consume the argument that becomes the extra testcase
+    \(\s*(?P<testcase_name>[a-zA-Z0-9_]+)
+    # _setup_teardown() variant has two extra arguments that we ignore
+    (?:\s*,\s*[a-zA-Z0-9_]+\s*,\s*[a-zA-Z0-9_]+)?
+    \s*\)""",
+    # We don't check how it finishes; we don't care
+    re.MULTILINE | re.VERBOSE)
+_achtung_regex = re.compile(
+    br"(#ifdef|#endif)",
+    re.MULTILINE)
+_suite_run_regex = re.compile(
+    br"^\s*ztest_run_test_suite\((?P<suite_name>[a-zA-Z0-9_]+)\)",
+    re.MULTILINE)
+_suite_end_regex = re.compile(br"\);", re.MULTILINE)
+
+
+def _finditer(regex, literal, data):
+    if data.find(literal) == -1:
+        return []
+    return list(regex.finditer(data))
+
+
+def _search(regex, literal, data):
+    if data.find(literal) == -1:
+        return None
+    return regex.search(data)
+
 
+def scan_file(inf_name):
     warnings = None
     has_registered_test_suites = False
     has_run_registered_test_suites = False
@@ -107,20 +148,21 @@ def scan_file(inf_name):
                             'offset': 0}
 
         with contextlib.closing(mmap.mmap(**mmap_args)) as main_c:
-            regular_suite_regex_matches = \
-                [m for m in regular_suite_regex.finditer(main_c)]
-            registered_suite_regex_matches = \
-                [m for m in registered_suite_regex.finditer(main_c)]
-            new_suite_testcase_regex_matches = \
-                [m for m in testcase_regex.finditer(main_c)]
-            new_suite_regex_matches = \
-                [m for m in new_suite_regex.finditer(main_c)]
+            regular_suite_regex_matches = _finditer(
+                _regular_suite_regex, b"ztest_test_suite(", main_c)
+            registered_suite_regex_matches = _finditer(
+                _registered_suite_regex, b"ztest_register_test_suite", main_c)
+            new_suite_testcase_regex_matches = _finditer(
+                _new_testcase_regex, b"ZTEST", main_c)
+            new_suite_regex_matches = _finditer(
+                _new_suite_regex, b"ZTEST_SUITE(", main_c)
 
             if registered_suite_regex_matches:
                 has_registered_test_suites = True
-            if registered_suite_run_regex.search(main_c):
+            if _search(_registered_suite_run_regex,
+                       b"ztest_run_registered_test_suites(", main_c):
                 has_run_registered_test_suites = True
-            if test_main_regex.search(main_c):
+            if _search(_test_main_regex, b"test_main(void)", main_c):
                 has_test_main = True
 
             if regular_suite_regex_matches:
@@ -164,36 +206,13 @@ def _find_regular_ztest_testcases(search_area, suite_regex_matches, is_registere
     Find regular ztest testcases like "ztest_unit_test" or similar. Return
     testcases' names and eventually found warnings.
     """
-    testcase_regex = re.compile(
-        br"""^\s*  # empty space at the beginning is ok
-        # catch the case where it is declared in the same sentence, e.g:
-        #
-        # ztest_test_suite(mutex_complex, ztest_user_unit_test(TESTNAME));
-        # ztest_register_test_suite(n, p, ztest_user_unit_test(TESTNAME),
-        (?:ztest_
-            (?:test_suite\(|register_test_suite\([a-zA-Z0-9_]+\s*,\s*)
-            [a-zA-Z0-9_]+\s*,\s*
-        )?
-        # Catch ztest[_user]_unit_test-[_setup_teardown](TESTNAME)
-        ztest_(?:1cpu_)?(?:user_)?unit_test(?:_setup_teardown)?
-        # Consume the argument that becomes the extra testcase
-        \(\s*(?P<testcase_name>[a-zA-Z0-9_]+)
-        # _setup_teardown() variant has two extra arguments that we ignore
-        (?:\s*,\s*[a-zA-Z0-9_]+\s*,\s*[a-zA-Z0-9_]+)?
-        \s*\)""",
-        # We don't check how it finishes; we don't care
-        re.MULTILINE | re.VERBOSE)
-    achtung_regex = re.compile(
-        br"(#ifdef|#endif)",
-        re.MULTILINE)
-
     search_start, search_end = \
         _get_search_area_boundary(search_area, suite_regex_matches, is_registered_test_suite)
     limited_search_area = search_area[search_start:search_end]
     testcase_names, warnings = \
-        _find_ztest_testcases(limited_search_area, testcase_regex)
+        _find_ztest_testcases(limited_search_area, _regular_testcase_regex)
 
-    achtung_matches = re.findall(achtung_regex, limited_search_area)
+    achtung_matches = _achtung_regex.findall(limited_search_area)
     if achtung_matches and warnings is None:
         achtung = ", ".join(sorted({match.decode() for match in achtung_matches},reverse = True))
         warnings = f"found invalid {achtung} in ztest_test_suite()"
@@ -207,21 +226,15 @@ def _get_search_area_boundary(search_area, suite_regex_matches, is_registered_te
     "ztest_register_test_suite(...)" or "ztest_run_test_suite(...)"
     functions occurrence.
     """
-    suite_run_regex = re.compile(
-        br"^\s*ztest_run_test_suite\((?P<suite_name>[a-zA-Z0-9_]+)\)",
-        re.MULTILINE)
-
     search_start = suite_regex_matches[0].end()
 
-    suite_run_match = suite_run_regex.search(search_area)
+    suite_run_match = _suite_run_regex.search(search_area)
     if suite_run_match:
         search_end = suite_run_match.start()
     elif not suite_run_match and not is_registered_test_suite:
         raise ValueError("can't find ztest_run_test_suite")
     else:
-        search_end = re.compile(br"\);", re.MULTILINE) \
-            .search(search_area, search_start) \
-            .end()
+        search_end = _suite_end_regex.search(search_area, search_start).end()
 
     return search_start, search_end
 
@@ -230,12 +243,7 @@ def _find_new_ztest_testcases(search_area):
     Find regular ztest testcases like "ZTEST", "ZTEST_F" etc. Return
     testcases' names and eventually found warnings.
     """
-    testcase_regex = re.compile(
-        br"^\s*(?:ZTEST|ZTEST_F|ZTEST_USER|ZTEST_USER_F)\(\s*(?P<suite_name>[a-zA-Z0-9_]+)\s*,"
-        br"\s*(?P<testcase_name>[a-zA-Z0-9_]+)\s*",
-        re.MULTILINE)
-
-    return _find_ztest_testcases(search_area, testcase_regex)
+    return _find_ztest_testcases(search_area, _new_testcase_regex)
 
 def _find_ztest_testcases(search_area, testcase_regex):
     """
@@ -258,28 +266,46 @@ def _find_ztest_testcases(search_area, testcase_regex):
 
 def find_c_files_in(path: str, extensions: list = ['c', 'cpp', 'cxx', 'cc']) -> list:
     """
-    Find C or C++ sources in the directory specified by "path"
+    Find C or C++ sources in the directory specified by "path" and in its
+    direct subdirectories
     """
     if not os.path.isdir(path):
         return []
 
-    # back up previous CWD
-    oldpwd = os.getcwd()
-    os.chdir(path)
+    # Equivalent to globbing '*.<ext>' and '**/*.<ext>' (non recursive, so
+    # one directory level) for each extension, but lists each directory
+    # only once.
+    base_names = []
+    sub_names = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            base_names.append(entry.name)
+            if not entry.is_dir():
+                continue
+            try:
+                with os.scandir(entry.path) as sub_it:
+                    sub_names += [os.path.join(entry.name, sub.name)
+                                  for sub in sub_it if not sub.name.startswith('.')]
+            except OSError:
+                pass
 
     filenames = []
     for ext in extensions:
-        # glob.glob('**/*.c') does not pick up the base directory
-        filenames += [os.path.join(path, x) for x in glob.glob(f'*.{ext}')]
-        # glob matches in subdirectories too
-        filenames += [os.path.join(path, x) for x in glob.glob(f'**/*.{ext}')]
-
-    # restore previous CWD
-    os.chdir(oldpwd)
+        suffix = os.path.normcase(f'.{ext}')
+        for names in (base_names, sub_names):
+            filenames += [os.path.join(path, x) for x in names
+                          if os.path.normcase(x).endswith(suffix)]
 
     return filenames
 
-def scan_testsuite_path(testsuite_path):
+def scan_testsuite_path(testsuite_path, scanner=None):
+    """
+    Scan the sources of a testsuite for test cases. scanner is used instead
+    of scan_file() to scan each file if given.
+    """
+    scanner = scanner or scan_file
     subcases = []
     has_registered_test_suites = False
     has_run_registered_test_suites = False
@@ -291,7 +317,7 @@ def scan_testsuite_path(testsuite_path):
         if os.stat(filename).st_size == 0:
             continue
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = scanner(filename)
             if result.warnings:
                 logger.error("%s: %s" % (filename, result.warnings))
                 raise TwisterRuntimeError(
@@ -312,7 +338,7 @@ def scan_testsuite_path(testsuite_path):
 
     for filename in find_c_files_in(testsuite_path):
         try:
-            result: ScanPathResult = scan_file(filename)
+            result: ScanPathResult = scanner(filename)
             if result.warnings:
                 logger.error("%s: %s" % (filename, result.warnings))
             if result.matches:
@@ -438,16 +464,20 @@ class TestSuite(DisablePyTestCollectionMixin):
         self.testcases.append(tc)
 
     @staticmethod
-    def get_unique(testsuite_root, workdir, name):
-
+    @functools.lru_cache(maxsize=None)
+    def _relative_testsuite_root(testsuite_root):
         canonical_testsuite_root = os.path.realpath(testsuite_root)
         if Path(canonical_zephyr_base) in Path(canonical_testsuite_root).parents:
             # This is in ZEPHYR_BASE, so include path in name for uniqueness
             # FIXME: We should not depend on path of test for unique names.
-            relative_ts_root = os.path.relpath(canonical_testsuite_root,
-                                               start=canonical_zephyr_base)
-        else:
-            relative_ts_root = ""
+            return os.path.relpath(canonical_testsuite_root,
+                                   start=canonical_zephyr_base)
+        return ""
+
+    @staticmethod
+    def get_unique(testsuite_root, workdir, name):
+
+        relative_ts_root = TestSuite._relative_testsuite_root(testsuite_root)
 
         # workdir can be "."
         unique = os.path.normpath(os.path.join(relative_ts_root, workdir, name)).replace(os.sep, '/')
@@ -71,6 +71,13 @@ def main(options):
     colorama.init(strip=color_strip)
     init_color(colorama_strip=color_strip)
 
+    # Durations recorded by the previous run are used to order the pipeline,
+    # read them before the output directory gets renamed.
+    durations = TwisterRunner.load_durations(
+        options.durations_file or os.path.join(options.outdir, "twister.json"),
+        required=bool(options.durations_file)
+    )
+
     previous_results = None
     # Cleanup
     if options.no_clean or options.only_failed or options.test_only:
@@ -116,6 +123,10 @@ def main(options):
     env.hwm = hwm
 
     tplan = TestPlan(env)
+    # subsets must be computed from the same durations in every job, so the
+    # previous report in the output directory is not used for them
+    if options.durations_file:
+        tplan.durations = durations
     try:
         tplan.discover()
     except RuntimeError as e:
@@ -160,6 +171,11 @@ def main(options):
         report.json_report(options.save_tests)
         return 0
 
+    if options.plan_only:
+        tplan.save_plan(options.plan_only)
+        logger.info(f"Test plan saved to {options.plan_only}")
+        return 0
+
     if options.device_testing and not options.build_only:
         print("\nDevice testing on:")
         hwm.dump(filtered=tplan.selected_platforms)
@@ -175,6 +191,7 @@ def main(options):
 
     runner = TwisterRunner(tplan.instances, tplan.testsuites, env)
     runner.duts = hwm.duts
+    runner.durations = durations
     runner.run()
 
     # figure out which report to use for size comparison
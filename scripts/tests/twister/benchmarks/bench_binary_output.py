@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure how fast BinaryHandler consumes the output of a chatty binary.
+
+A Python subprocess stands in for the native binary and prints the requested
+number of lines as fast as it can. The handler output loop runs against it
+with a harness which only counts lines, so the measured time is the cost of
+reading, decoding and logging the output.
+
+    python3 bench_binary_output.py --lines 200000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
+
+from twisterlib.handlers import BinaryHandler
+
+CHATTY_BINARY = """
+import sys
+out = sys.stdout
+for i in range(int(sys.argv[1])):
+    out.write(f"START - test_{i % 100}: some console output of line {i}\\n")
+out.flush()
+"""
+
+
+class CountingHarness:
+    state = None
+    capture_coverage = False
+
+    def __init__(self):
+        self.lines = 0
+
+    def handle(self, line):
+        self.lines += 1
+
+
+def bench(lines, log_dir):
+    handler = BinaryHandler.__new__(BinaryHandler)
+    handler.log = os.path.join(log_dir, "handler.log")
+    handler.get_test_timeout = lambda: 600
+    handler.terminate = lambda proc: proc.kill()
+    harness = CountingHarness()
+
+    proc = subprocess.Popen([sys.executable, "-c", CHATTY_BINARY, str(lines)],
+                            stdout=subprocess.PIPE)
+    start = time.perf_counter()
+    handler._output_handler(proc, harness)
+    elapsed = time.perf_counter() - start
+    proc.stdout.close()
+    proc.wait()
+
+    assert harness.lines == lines, f"only {harness.lines}/{lines} lines handled"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--lines", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        elapsed = bench(args.lines, log_dir)
+    print(f"{args.lines} lines: {elapsed:.2f}s ({args.lines / elapsed:.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
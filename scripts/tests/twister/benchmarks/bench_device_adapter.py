@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure shell command round-trip latency of the pytest-twister-harness
+device adapters.
+
+A simulated Zephyr shell is run with the binary adapter (stdin/stdout) and
+with the QEMU adapter (FIFO pair), and the same command is sent with
+Shell.exec_command() repeatedly. The command prints --lines lines before the
+next prompt. Latency statistics of the round trips are printed per adapter.
+
+    python3 bench_device_adapter.py --commands 200 --lines 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/pytest-twister-harness/src"))
+
+from twister_harness.device.binary_adapter import NativeSimulatorAdapter
+from twister_harness.device.qemu_adapter import QemuAdapter
+from twister_harness.helpers.shell import Shell
+from twister_harness.twister_harness_config import DeviceConfig
+
+PROMPT = "uart:~$ "
+
+
+def run_shell(lines, read_file, write_file):
+    """Minimal shell simulator: echo each command, answer with lines of text."""
+    write_file.write(PROMPT.encode())
+    write_file.flush()
+    for command in read_file:
+        command = command.decode().strip()
+        output = [command]
+        if command == "quit":
+            break
+        if command:
+            output.extend(f"{command}: line {i}" for i in range(lines))
+        write_file.write(("\n".join(output) + "\n" + PROMPT).encode())
+        write_file.flush()
+
+
+def run_fifo_shell(lines, fifo_path):
+    """Shell simulator talking over the FIFO pair created by QemuAdapter."""
+    out_path, in_path = fifo_path + ".out", fifo_path + ".in"
+    end_time = time.time() + 5
+    while not (os.path.exists(out_path) and os.path.exists(in_path)):
+        if time.time() > end_time:
+            sys.exit(f"FIFO files {fifo_path}.* not created")
+        time.sleep(0.01)
+    with open(out_path, "wb", buffering=0) as write_file, \
+            open(in_path, "rb", buffering=0) as read_file:
+        run_shell(lines, read_file, write_file)
+
+
+def measure(device, commands):
+    shell = Shell(device, timeout=5.0)
+    if not shell.wait_for_prompt():
+        sys.exit(f"{device}: no shell prompt")
+    latencies = []
+    for i in range(commands):
+        start = time.perf_counter()
+        shell.exec_command(f"bench{i}", print_output=False)
+        latencies.append(time.perf_counter() - start)
+    device.write(b"quit\n")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--commands", type=int, default=100,
+                        help="Number of shell commands sent per adapter")
+    parser.add_argument("--lines", type=int, default=10,
+                        help="Number of lines printed by each command")
+    parser.add_argument("--adapter", choices=["binary", "qemu"], action="append",
+                        help="Adapter to measure, may be repeated (default: all)")
+    parser.add_argument("--shell", metavar="FIFO",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.shell is not None:
+        # internal: the simulated device started by the adapters
+        if args.shell == "-":
+            run_shell(args.lines, sys.stdin.buffer, sys.stdout.buffer)
+        else:
+            run_fifo_shell(args.lines, args.shell)
+        return
+
+    simulator = [sys.executable, os.path.abspath(__file__), "--lines", str(args.lines)]
+    for adapter in args.adapter or ["binary", "qemu"]:
+        with tempfile.TemporaryDirectory(prefix="bench-adapter-") as build_dir:
+            build_dir = Path(build_dir)
+            if adapter == "binary":
+                device = NativeSimulatorAdapter(
+                    DeviceConfig(build_dir=build_dir, type="native", base_timeout=5.0))
+                device.command = simulator + ["--shell", "-"]
+            else:
+                device = QemuAdapter(
+                    DeviceConfig(build_dir=build_dir, type="qemu", base_timeout=5.0))
+                device.command = simulator + ["--shell", str(build_dir / "qemu-fifo")]
+            try:
+                device.launch()
+                latencies = measure(device, args.commands)
+            finally:
+                device.close()
+
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        p99 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))]
+        print(f"{adapter:>6}: {args.commands} commands, "
+              f"mean {statistics.mean(latencies_ms):.2f} ms, "
+              f"median {statistics.median(latencies_ms):.2f} ms, "
+              f"p99 {p99:.2f} ms, max {latencies_ms[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure how fast the Ztest and Console harnesses handle console output.
+
+A ztest log is generated with the requested number of lines, or read from a
+recorded handler.log given with --log, and fed line by line to each harness.
+
+    python3 bench_harness.py --lines 100000
+    python3 bench_harness.py --log twister-out/.../handler.log
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
+
+from twisterlib.harness import Console, Ztest
+from twisterlib.testinstance import TestInstance
+
+HARNESS_CONFIGS = {
+    "Ztest": None,
+    "Console one_line": {
+        "type": "one_line",
+        "regex": ["PROJECT EXECUTION SUCCESSFUL"],
+    },
+    "Console multi_line": {
+        "type": "multi_line",
+        "ordered": True,
+        "regex": ["Running TESTSUITE (.*)", "SUITE PASS - (.*)"],
+        "record": {"regex": "value: (?P<value>\\d+)"},
+    },
+}
+
+
+def generate_log(lines):
+    log = ["*** Booting Zephyr OS build v3.5.0 ***", "RunID: 1234",
+           "Running TESTSUITE bench"]
+    # a suite of 200 testcases, repeated until the log is long enough
+    case = 0
+    while len(log) < lines - 2:
+        case_name = f"test_case_{case % 200}"
+        log.append(f"START - {case_name}")
+        for i in range(20):
+            log.append(f"[00:00:00.{i:03d},000] <inf> bench: {case_name} value: {i}")
+        status = "FAIL" if case % 50 == 49 else "PASS"
+        log.append(f" {status} - {case_name} in 0.001 seconds")
+        case += 1
+    log.append("SUITE PASS - 100.00% [bench]: pass = 1, fail = 0")
+    log.append("PROJECT EXECUTION SUCCESSFUL")
+    return log
+
+
+def make_harness(harness_class, harness_config):
+    testsuite = SimpleNamespace(
+        id="bench.suite", name="bench.suite", testcases=[], harness_config=harness_config,
+        ignore_faults=False, detailed_test_id=True, source_dir_rel="bench",
+    )
+    platform = SimpleNamespace(name="bench_platform", normalized_name="bench_platform")
+    instance = TestInstance(testsuite, platform, "/tmp")
+    harness = harness_class()
+    harness.configure(instance)
+    return harness
+
+
+def bench(name, log):
+    harness_class = Ztest if name == "Ztest" else Console
+    harness = make_harness(harness_class, HARNESS_CONFIGS[name])
+    start = time.perf_counter()
+    for line in log:
+        harness.handle(line)
+    elapsed = time.perf_counter() - start
+    assert harness.state, f"{name}: no harness state after {len(log)} lines"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--log", help="Recorded handler.log to replay")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, "r", errors="replace") as fp:
+            log = [line.rstrip() for line in fp]
+    else:
+        log = generate_log(args.lines)
+
+    for name in HARNESS_CONFIGS:
+        elapsed = bench(name, log)
+        print(f"{name:>18}: {len(log)} lines: {elapsed:.2f}s "
+              f"({len(log) / elapsed:.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
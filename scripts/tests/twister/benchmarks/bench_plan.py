@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure test plan generation with --all on the Zephyr tree.
+
+The test suites and platforms are discovered, then TestPlan.apply_filters()
+builds the plan for all possible platforms per test suite. Any further
+arguments are passed to twister, e.g. '-T tests/kernel' to limit the
+testsuite roots. With --dump, the name, status, reason and filters of every
+planned instance are written to a JSON file, so plans generated by
+different twister versions can be compared.
+
+    python3 bench_plan.py --dump plan.json -T tests/kernel
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts"))
+
+from twisterlib.environment import TwisterEnv, add_parse_arguments, parse_arguments
+from twisterlib.testplan import TestPlan
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--dump", metavar="FILE",
+                        help="Write the planned instances to a JSON file")
+    args, twister_args = parser.parse_known_args()
+
+    outdir = tempfile.mkdtemp(prefix="bench-plan-")
+    try:
+        options = parse_arguments(add_parse_arguments(),
+                                  ["--all", "-O", outdir] + twister_args)
+        env = TwisterEnv(options)
+        # no toolchain discovery, the plan is generated as if the Zephyr
+        # SDK was installed
+        env.toolchain = "zephyr"
+        env.hwm = None
+        tplan = TestPlan(env)
+
+        start = time.perf_counter()
+        tplan.discover()
+        elapsed = time.perf_counter() - start
+        print(f"     discover: {elapsed:.3f}s ({len(tplan.testsuites)} suites, "
+              f"{len(tplan.platforms)} platforms)")
+
+        start = time.perf_counter()
+        tplan.apply_filters()
+        elapsed = time.perf_counter() - start
+        filtered = sum(1 for i in tplan.instances.values() if i.status == "filtered")
+        print(f"apply_filters: {elapsed:.3f}s ({len(tplan.instances)} instances, "
+              f"{filtered} filtered)")
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+
+    if args.dump:
+        plan = {
+            name: {
+                "status": instance.status,
+                "reason": instance.reason,
+                "filters": instance.filters,
+                "run": instance.run,
+            }
+            for name, instance in sorted(tplan.instances.items())
+        }
+        with open(args.dump, "w") as f:
+            json.dump(plan, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
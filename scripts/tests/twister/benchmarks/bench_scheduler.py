@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Compare the 'manager' and 'local' schedulers of TwisterRunner.
+
+The real ProjectBuilder is replaced with a stub which walks every instance
+through the cmake -> build -> gather_metrics -> run -> report chain without
+doing any work, so the measured time is the pipeline overhead only. Every
+tenth instance fails once, so one --retry-failed iteration is included.
+
+    python3 bench_scheduler.py --instances 5000 --jobs 64
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
+
+from twisterlib import runner
+
+NEXT_OP = {
+    "cmake": "build",
+    "build": "gather_metrics",
+    "gather_metrics": "run",
+    "run": "report",
+}
+
+
+class StubInstance:
+    def __init__(self, name, payload):
+        self.name = name
+        self.status = None
+        self.run = True
+        self.retries = 0
+        self.filter_stages = []
+        self.testsuite = SimpleNamespace(filter=None, source_dir="", sysbuild=False, timeout=60)
+        self.platform = SimpleNamespace(arch="arm")
+        self.build_time = 0
+        self.metrics = {}
+        self.execution_time = 0
+        # TestInstance objects carry testsuite, platform and handler data,
+        # pad the stub so pickling it costs something comparable.
+        self.payload = payload
+
+
+class StubProjectBuilder:
+    def __init__(self, instance, env, jobserver, **kwargs):
+        self.instance = instance
+        self.dut_pool = None
+
+    def process(self, pipeline, done, message, lock, results):
+        op = message["op"]
+        if op == "report":
+            # every tenth instance fails once to exercise --retry-failed
+            if self.instance.retries == 0 and self.instance.name.endswith("0"):
+                self.instance.status = "failed"
+            else:
+                self.instance.status = "passed"
+            with lock:
+                done.put(self.instance)
+                results.done += 1
+                if self.instance.status == "failed":
+                    results.failed += 1
+        else:
+            pipeline.put({"op": NEXT_OP[op], "test": self.instance})
+
+
+def bench(scheduler, count, jobs, payload_size, retry_failed):
+    payload = "x" * payload_size
+    instances = {
+        f"platform/suite.{i}": StubInstance(f"platform/suite.{i}", payload)
+        for i in range(count)
+    }
+    options = SimpleNamespace(
+        scheduler=scheduler,
+        retry_failed=retry_failed,
+        retry_interval=0,
+        retry_build_errors=False,
+        build_only=False,
+        test_only=False,
+        jobs=jobs,
+    )
+    tr = runner.TwisterRunner(instances, [], env=SimpleNamespace(options=options))
+    tr.show_brief = lambda: None
+    tr.update_counting_before_pipeline = lambda: None
+
+    start = time.perf_counter()
+    tr.run()
+    elapsed = time.perf_counter() - start
+
+    reported = sum(1 for i in tr.instances.values() if i.status == "passed")
+    assert reported == count, f"{scheduler}: only {reported}/{count} instances reported"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("--instances", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--payload", type=int, default=16384,
+                        help="Size in bytes added to each pickled instance")
+    parser.add_argument("--retry-failed", type=int, default=1,
+                        help="Retry iterations, every tenth instance fails once")
+    args = parser.parse_args()
+
+    runner.ProjectBuilder = StubProjectBuilder
+
+    for scheduler in ("manager", "local"):
+        elapsed = bench(scheduler, args.instances, args.jobs, args.payload,
+                        args.retry_failed)
+        print(f"{scheduler:>8}: {args.instances} instances, {args.jobs} jobs: "
+              f"{elapsed:.2f}s ({args.instances / elapsed:.0f} instances/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Measure SizeCalculator on a directory of ELF files.
+
+Every ELF file found below the directory (for example a twister-out
+directory) is sized with SizeCalculator, which reads the section and
+program headers in-process. With --compare, the same files are also sized
+the way twister used to, by running 'nm' and 'objdump -h', and the results
+are checked to be identical.
+
+    python3 bench_size_calc.py twister-out --compare
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/build_helpers"))
+
+from twisterlib.size_calc import SizeCalculator
+
+
+def find_elf_files(path):
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            if name.endswith(".elf"):
+                yield os.path.join(dirpath, name)
+
+
+def objdump_sizes(elf_filename):
+    """Section sizes as computed from the 'nm' and 'objdump -h' output."""
+    is_xip_output = subprocess.check_output(
+        "nm " + elf_filename + " | awk '/CONFIG_XIP/ { print $3 }'",
+        shell=True, stderr=subprocess.STDOUT).decode("utf-8").strip()
+    is_xip = len(is_xip_output) != 0
+
+    used_rom = used_ram = 0
+    sections = []
+    objdump_output = subprocess.check_output(
+        "objdump -h " + elf_filename, shell=True).decode("utf-8").splitlines()
+    for line in objdump_output:
+        words = line.split()
+        if not words or not words[0][0].isdigit() or words[1][0] == '.':
+            continue
+        name = words[1]
+        size = int(words[2], 16)
+        if size == 0:
+            continue
+        if name in SizeCalculator.alloc_sections:
+            used_ram += size
+        elif name in SizeCalculator.rw_sections:
+            used_ram += size
+            used_rom += size
+        elif name in SizeCalculator.ro_sections:
+            used_rom += size
+            if not is_xip:
+                used_ram += size
+        sections.append((name, size, int(words[3], 16), int(words[4], 16)))
+
+    return is_xip, used_ram, used_rom, sections
+
+
+def main():
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("path", help="Directory searched for *.elf files")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run nm and objdump and compare the results")
+    args = parser.parse_args()
+
+    elf_files = sorted(find_elf_files(args.path))
+    if not elf_files:
+        sys.exit(f"No ELF files found in {args.path}")
+
+    start = time.perf_counter()
+    results = {}
+    for elf_filename in elf_files:
+        calc = SizeCalculator(elf_filename, [])
+        results[elf_filename] = (
+            calc.is_xip, calc.used_ram, calc.used_rom,
+            [(s["name"], s["size"], s["virt_addr"], s["load_addr"])
+             for s in calc.sections]
+        )
+    elapsed = time.perf_counter() - start
+    print(f"in-process: {len(elf_files)} files: {elapsed:.3f}s "
+          f"({elapsed / len(elf_files) * 1000:.2f} ms/file)")
+
+    if not args.compare:
+        return
+
+    start = time.perf_counter()
+    mismatches = 0
+    for elf_filename in elf_files:
+        expected = objdump_sizes(elf_filename)
+        if results[elf_filename] != expected:
+            mismatches += 1
+            print(f"MISMATCH {elf_filename}:\n  {results[elf_filename]}\n  {expected}")
+    elapsed = time.perf_counter() - start
+    print(f"   objdump: {len(elf_files)} files: {elapsed:.3f}s "
+          f"({elapsed / len(elf_files) * 1000:.2f} ms/file)")
+    print(f"{mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
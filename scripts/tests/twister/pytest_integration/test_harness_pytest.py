@@ -8,7 +8,7 @@ import textwrap
 from unittest import mock
 from pathlib import Path
 
-from twisterlib.harness import Pytest
+from twisterlib.harness import Pytest, PytestHarnessException
 from twisterlib.testsuite import TestSuite
 from twisterlib.testinstance import TestInstance
 from twisterlib.platform import Platform
@@ -128,6 +128,31 @@ def test_pytest_handle_source_list(testinstance: TestInstance, monkeypatch, pyte
         assert pytest_src in command
 
 
+@pytest.mark.parametrize('run_error', [False, True], ids=['passed', 'harness error'])
+def test_pytest_run_device_releases_hardware(testinstance: TestInstance, run_error):
+    hardware = mock.Mock(serial_pty=None, serial='/dev/ttyACM0', baud=115200,
+                         runner=None, probe_id=None, id='0001', product=None)
+    testinstance.handler.type_str = 'device'
+    testinstance.handler.options = mock.Mock(verbose=0, west_runner=None, west_flash=None)
+    testinstance.handler.get_hardware.return_value = hardware
+    pytest_harness = Pytest()
+    pytest_harness.configure(testinstance)
+
+    def run_command(cmd, timeout):
+        assert '--device-serial=/dev/ttyACM0' in cmd
+        testinstance.handler.release_hardware.assert_not_called()
+        if run_error:
+            raise PytestHarnessException('pytest failed')
+
+    with mock.patch.object(pytest_harness, 'run_command', side_effect=run_command), \
+         mock.patch.object(pytest_harness, '_update_test_status'):
+        pytest_harness.pytest_run(timeout=10)
+
+    testinstance.handler.get_hardware.assert_called_once_with()
+    testinstance.handler.release_hardware.assert_called_once_with(hardware)
+    assert pytest_harness.reserved_dut is None
+
+
 def test_if_report_is_parsed(pytester, testinstance: TestInstance):
     test_file_content = textwrap.dedent("""
         def test_1():
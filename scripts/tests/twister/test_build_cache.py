@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for build_cache.py classes' methods
+"""
+
+import mock
+import os
+import pytest
+import subprocess
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.build_cache import (
+    BuildCache,
+    hash_tree,
+    read_build_inputs,
+    read_compiler_deps
+)
+
+
+def _make_build(build_dir, kconfig, elf_content=b'elf'):
+    os.makedirs(os.path.join(build_dir, 'zephyr', 'kconfig'))
+    with open(os.path.join(build_dir, 'zephyr', 'zephyr.elf'), 'wb') as f:
+        f.write(elf_content)
+    with open(os.path.join(build_dir, 'zephyr', 'kconfig', 'sources.txt'), 'w') as f:
+        f.write(f'{kconfig}\n')
+    with open(os.path.join(build_dir, 'zephyr', 'zephyr.dts.d'), 'w') as f:
+        f.write(f'zephyr.dts.pre: {kconfig} \\\n {kconfig}\n')
+
+
+def test_read_build_inputs(tmp_path):
+    kconfig = tmp_path / 'Kconfig'
+    kconfig.write_text('config FOO\n')
+    build_dir = tmp_path / 'build'
+    _make_build(str(build_dir), str(kconfig))
+
+    assert read_build_inputs(str(build_dir)) == [str(kconfig)]
+    assert read_build_inputs(str(tmp_path / 'missing')) == []
+
+
+@pytest.fixture
+def compiler_deps():
+    """The compiler dependencies of the builds stored in the tests."""
+    deps = []
+    with mock.patch('twisterlib.build_cache.read_compiler_deps', return_value=deps):
+        yield deps
+
+
+def test_read_compiler_deps(tmp_path):
+    build_dir = str(tmp_path / 'build')
+    ninja_output = (
+        'zephyr/CMakeFiles/zephyr.dir/lib/foo.c.obj: #deps 3, deps mtime 1 (VALID)\n'
+        '    /zephyr/lib/foo.c\n'
+        '    /zephyr/include/foo.h\n'
+        '    zephyr/include/generated/autoconf.h\n'
+        '\n'
+        'app/CMakeFiles/app.dir/src/main.c.obj: #deps 2, deps mtime 1 (VALID)\n'
+        '    /app/src/main.c\n'
+        '    /zephyr/include/foo.h\n'
+    )
+
+    with mock.patch('subprocess.run',
+                    return_value=mock.Mock(stdout=ninja_output)) as run_mock:
+        deps = read_compiler_deps(build_dir)
+
+    run_mock.assert_called_once_with(['ninja', '-C', build_dir, '-t', 'deps'],
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     check=True, text=True)
+    assert deps == ['/app/src/main.c', '/zephyr/include/foo.h', '/zephyr/lib/foo.c']
+
+    with mock.patch('subprocess.run',
+                    side_effect=subprocess.CalledProcessError(1, 'ninja')):
+        assert read_compiler_deps(build_dir) is None
+
+
+def test_hash_tree(tmp_path):
+    app_a = tmp_path / 'a'
+    app_b = tmp_path / 'b'
+    for app in (app_a, app_b):
+        (app / 'src').mkdir(parents=True)
+        (app / 'src' / 'main.c').write_text('int main(void) {}')
+    (app_b / 'prj.conf').write_text('CONFIG_FOO=y')
+
+    assert hash_tree(str(app_a)) != hash_tree(str(app_b))
+    (app_a / 'prj.conf').write_text('CONFIG_FOO=y')
+    hash_tree.cache_clear()
+    assert hash_tree(str(app_a)) == hash_tree(str(app_b))
+
+
+def test_buildcache_compute_key():
+    key = BuildCache.compute_key(platform='p1', args=['-DA=1'])
+
+    assert key == BuildCache.compute_key(args=['-DA=1'], platform='p1')
+    assert key != BuildCache.compute_key(platform='p2', args=['-DA=1'])
+
+
+def test_buildcache_store_restore(tmp_path, compiler_deps):
+    kconfig = tmp_path / 'Kconfig'
+    kconfig.write_text('config FOO\n')
+    source = tmp_path / 'kernel.c'
+    source.write_text('int k;\n')
+    compiler_deps.append(str(source))
+    build_dir = tmp_path / 'build'
+    _make_build(str(build_dir), str(kconfig))
+
+    cache = BuildCache(str(tmp_path / 'cache'), 1024 * 1024)
+    files = [os.path.join('zephyr', 'zephyr.elf'), 'missing.bin']
+    cache.store('key1', str(build_dir), files, 'run-id-1')
+
+    other_build_dir = tmp_path / 'other'
+    manifest = cache.restore('key1', str(other_build_dir))
+
+    assert manifest['run_id'] == 'run-id-1'
+    assert manifest['files'] == [os.path.join('zephyr', 'zephyr.elf')]
+    assert (other_build_dir / 'zephyr' / 'zephyr.elf').read_bytes() == b'elf'
+    assert cache.restore('key2', str(other_build_dir)) is None
+
+    # A modified compiled source outside of the application invalidates the
+    # entry, and so does a modified Kconfig input
+    source.write_text('int k = 1;\n')
+    assert cache.restore('key1', str(other_build_dir)) is None
+    source.write_text('int k;\n')
+    assert cache.restore('key1', str(other_build_dir)) is not None
+    kconfig.write_text('config BAR\n')
+    assert cache.restore('key1', str(other_build_dir)) is None
+
+
+def test_buildcache_store_without_compiler_deps(tmp_path):
+    build_dir = tmp_path / 'build'
+    os.makedirs(build_dir / 'zephyr')
+    (build_dir / 'zephyr' / 'zephyr.elf').write_bytes(b'elf')
+    cache = BuildCache(str(tmp_path / 'cache'), 1024 * 1024)
+
+    with mock.patch('twisterlib.build_cache.read_compiler_deps', return_value=None):
+        cache.store('key1', str(build_dir), [os.path.join('zephyr', 'zephyr.elf')], 'id')
+
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_buildcache_evict(tmp_path, compiler_deps):
+    cache = BuildCache(str(tmp_path / 'cache'), 12)
+    for i, key in enumerate(['old', 'used', 'new']):
+        build_dir = tmp_path / key
+        os.makedirs(build_dir / 'zephyr')
+        (build_dir / 'zephyr' / 'zephyr.elf').write_bytes(b'x' * 4)
+        cache.store(key, str(build_dir), [os.path.join('zephyr', 'zephyr.elf')], key)
+        manifest = os.path.join(cache.cache_dir, key, BuildCache.MANIFEST)
+        os.utime(manifest, (i, i))
+    # using an entry makes it the most recent one
+    cache.restore('old', str(tmp_path / 'restored'))
+    cache.max_size = 10
+
+    cache.evict()
+
+    assert sorted(os.listdir(cache.cache_dir)) == ['new', 'old']
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for coverage.py classes' methods
+"""
+
+import mock
+import pytest
+
+from twisterlib.coverage import CoverageTool
+
+
+TESTDATA_1 = [
+    (['GCOV_COVERAGE_DUMP_START', '*{gcda}<0102abff', 'GCOV_COVERAGE_DUMP_END'],
+     True, True, b'\x01\x02\xab\xff'),
+    (['GCOV_COVERAGE_DUMP_START', '*{gcda}<0102abff'],
+     False, True, None),
+    (['GCOV_COVERAGE_DUMP_START', '*{gcda}<01x2', 'GCOV_COVERAGE_DUMP_END'],
+     True, False, None),
+    (['no coverage dump'],
+     True, True, None),
+]
+
+
+@pytest.mark.parametrize(
+    'log_lines, expected_complete, expected_created, expected_gcda',
+    TESTDATA_1,
+    ids=['complete', 'incomplete', 'invalid hex', 'no dump']
+)
+def test_coveragetool_extract_gcov_data(
+    tmp_path,
+    log_lines,
+    expected_complete,
+    expected_created,
+    expected_gcda
+):
+    gcda = tmp_path / 'main.c.gcda'
+    handler_log = tmp_path / 'handler.log'
+    handler_log.write_text(
+        '\n'.join(line.format(gcda=gcda) for line in log_lines) + '\n'
+    )
+
+    with mock.patch.object(CoverageTool, 'HEX_CHUNK_SIZE', 2):
+        result = CoverageTool.extract_gcov_data(str(handler_log))
+
+    assert result == {'complete': expected_complete, 'created': expected_created}
+    assert sorted(p.name for p in tmp_path.iterdir()) == \
+        sorted(['handler.log'] + (['main.c.gcda'] if expected_gcda else []))
+    if expected_gcda:
+        assert gcda.read_bytes() == expected_gcda
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for discovery_cache.py classes' methods
+"""
+
+import mock
+import os
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+import scl
+from twisterlib.discovery_cache import DiscoveryCache
+from twisterlib.testsuite import ScanPathResult
+
+TESTCASE_YAML = """\
+common:
+  tags: kernel
+tests:
+  kernel.dummy.one:
+    platform_allow: qemu_x86
+  kernel.dummy.two:
+    tags: other
+"""
+
+
+def test_discoverycache_load_scenarios(tmp_path):
+    schema = scl.yaml_load(os.path.join(ZEPHYR_BASE, "scripts", "schemas",
+                                        "twister", "testsuite-schema.yaml"))
+    yaml_path = tmp_path / "testcase.yaml"
+    yaml_path.write_text(TESTCASE_YAML)
+    cache_path = str(tmp_path / "cache" / "discovery.pickle")
+
+    cache = DiscoveryCache(cache_path)
+    scenarios = cache.load_scenarios(str(yaml_path), schema)
+    assert list(scenarios.keys()) == ["kernel.dummy.one", "kernel.dummy.two"]
+    assert scenarios["kernel.dummy.two"]["tags"] == {"kernel", "other"}
+    cache.save()
+
+    cache = DiscoveryCache(cache_path)
+    with mock.patch('twisterlib.discovery_cache.TwisterConfigParser') as parser:
+        assert cache.load_scenarios(str(yaml_path), schema) == scenarios
+    parser.assert_not_called()
+    assert not cache.updated
+
+    yaml_path.write_text(TESTCASE_YAML.replace("tags: other", "tags: changed"))
+    scenarios = cache.load_scenarios(str(yaml_path), schema)
+    assert scenarios["kernel.dummy.two"]["tags"] == {"kernel", "changed"}
+    assert cache.updated
+
+
+def test_discoverycache_scan_file(tmp_path):
+    source = tmp_path / "main.c"
+    source.write_text("ZTEST(suite, test_a) {}")
+    cache_path = str(tmp_path / "discovery.pickle")
+    result = ScanPathResult(matches=["a"], ztest_suite_names=["suite"])
+
+    cache = DiscoveryCache(cache_path)
+    with mock.patch('twisterlib.discovery_cache.scan_file',
+                    return_value=result) as scan_mock:
+        assert cache.scan_file(str(source)) == result
+        assert cache.scan_file(str(source)) == result
+    scan_mock.assert_called_once_with(str(source))
+    cache.save()
+
+    # Entries of deleted files are dropped when the cache is saved
+    other = tmp_path / "other.c"
+    other.write_text("")
+    cache = DiscoveryCache(cache_path)
+    with mock.patch('twisterlib.discovery_cache.scan_file',
+                    return_value=result) as scan_mock:
+        assert cache.scan_file(str(source)) == result
+        cache.scan_file(str(other))
+    scan_mock.assert_called_once_with(str(other))
+    other.unlink()
+    cache.save()
+
+    assert list(DiscoveryCache(cache_path).entries.keys()) == [("scan", str(source))]
+
+
+def test_discoverycache_invalid_file(tmp_path):
+    cache_path = tmp_path / "discovery.pickle"
+    cache_path.write_bytes(b"not a pickle")
+
+    cache = DiscoveryCache(str(cache_path))
+
+    assert cache.entries == {}
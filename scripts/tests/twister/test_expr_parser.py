@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for expr_parser.py functions
+"""
+
+import mock
+import os
+import pytest
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+import expr_parser
+
+
+TESTDATA_1 = [
+    ('CONFIG_FOO', True),
+    ('CONFIG_BAR', False),
+    ('not CONFIG_BAR and CONFIG_FOO == "y"', True),
+    ('CONFIG_NUM > 10 or CONFIG_NUM < 0x10', True),
+    ('CONFIG_NUM >= 0x21', False),
+    ('ARCH in ["arm", "x86"]', True),
+    ('ARCH : "ar.*"', True),
+    ('dt_compat_enabled("vnd,enabled")', True),
+    ('dt_compat_enabled("vnd,disabled")', False),
+    ('dt_nodelabel_enabled("led0") and not dt_chosen_enabled("zephyr,console")', True),
+]
+
+
+@pytest.mark.parametrize(
+    'expr, expected',
+    TESTDATA_1,
+    ids=['exists', 'not exists', 'not and equals', 'compare or', 'compare hex',
+         'in', 'regex', 'compat enabled', 'compat disabled', 'nodelabel chosen']
+)
+def test_parse(expr, expected):
+    env = {'CONFIG_FOO': 'y', 'CONFIG_NUM': '0x20', 'ARCH': 'arm'}
+    edt = mock.Mock(
+        compat2okay={'vnd,enabled': [mock.Mock()]},
+        label2node={'led0': mock.Mock(status='okay')},
+        chosen_node=mock.Mock(return_value=None),
+    )
+
+    assert expr_parser.parse(expr, env, edt) == expected
+
+
+def test_parse_ast_cached():
+    expr = 'CONFIG_CACHED_A and not CONFIG_CACHED_B'
+    expr_parser.parse_ast.cache_clear()
+
+    with mock.patch.object(expr_parser, 'parser', wraps=expr_parser.parser) as parser:
+        for env in [{'CONFIG_CACHED_A': 'y'}, {'CONFIG_CACHED_B': 'y'}] * 3:
+            expr_parser.parse(expr, env, None)
+
+    parser.parse.assert_called_once_with(expr)
+    assert expr_parser.parse(expr, {'CONFIG_CACHED_A': 'y'}, None)
+
+
+def test_parse_error():
+    with pytest.raises(SyntaxError, match="Unexpected end of expression"):
+        expr_parser.parse('CONFIG_FOO and', {}, None)
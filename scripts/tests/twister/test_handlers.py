@@ -27,6 +27,7 @@ from twisterlib.handlers import (
     Handler,
     BinaryHandler,
     DeviceHandler,
+    LineReader,
     QEMUHandler,
     SimulationHandler
 )
@@ -327,15 +328,38 @@ def test_binaryhandler_try_kill_process_by_pid(mocked_instance):
         mock_kill.assert_called_once_with(-1, signal.SIGKILL)
 
 
+def test_linereader_readline():
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, 'rb') as r, os.fdopen(write_fd, 'wb') as w:
+        reader = LineReader(r)
+        reader.CHUNK_SIZE = 4
+
+        assert reader.readline(0.01) is None
+
+        w.write(b'first line\nsecond')
+        w.flush()
+        assert reader.readline(1) == b'first line\n'
+        # incomplete line is kept until its end arrives
+        assert reader.readline(0.01) is None
+
+        w.write(b' line\nthird\nlast')
+        w.close()
+        assert reader.readline(1) == b'second line\n'
+        assert reader.readline(1) == b'third\n'
+        assert reader.readline(1) == b'last'
+        assert reader.readline(1) == b''
+        reader.close()
+
+
 TESTDATA_3 = [
     (
-        [b'This\\r\\n', b'is\r', b'a short', b'file.'],
+        [b'This\n', b'is\r\n', b'a short\n', b'file.\\r\\n'],
         mock.Mock(state=False, capture_coverage=False),
         [
-            mock.call('This\\r\\n'),
-            mock.call('is\r'),
-            mock.call('a short'),
-            mock.call('file.')
+            mock.call('This\n'),
+            mock.call('is\r\n'),
+            mock.call('a short\n'),
+            mock.call('file.\\r\\n')
         ],
         [
             mock.call('This'),
@@ -347,7 +371,7 @@ TESTDATA_3 = [
         False
     ),
     (
-        [b'Too much.'] * 120,  # Should be more than the timeout
+        [b'Too much.\n'] * 120,  # Should be more than the timeout
         mock.Mock(state=False, capture_coverage=False),
         None,
         None,
@@ -355,7 +379,7 @@ TESTDATA_3 = [
         False
     ),
     (
-        [b'Too much.'] * 120,  # Should be more than the timeout
+        [b'Too much.\n'] * 120,  # Should be more than the timeout
         mock.Mock(state=True, capture_coverage=False),
         None,
         None,
@@ -363,7 +387,7 @@ TESTDATA_3 = [
         False
     ),
     (
-        [b'Too much.'] * 120,  # Should be more than the timeout
+        [b'Too much.\n'] * 120,  # Should be more than the timeout
         mock.Mock(state=True, capture_coverage=True),
         None,
         None,
@@ -393,26 +417,14 @@ def test_binaryhandler_output_handler(
     should_be_less,
     timeout_wait
 ):
-    class MockStdout(mock.Mock):
-        def __init__(self, text):
-            super().__init__(text)
-            self.text = text
-            self.line_index = 0
-
-        def readline(self):
-            if self.line_index == len(self.text):
-                self.line_index = 0
-                return b''
-            else:
-                line = self.text[self.line_index]
-                self.line_index += 1
-                return line
-
     class MockProc(mock.Mock):
         def __init__(self, pid, stdout):
             super().__init__(pid, stdout)
             self.pid = mock.PropertyMock(return_value=pid)
-            self.stdout = MockStdout(stdout)
+            read_fd, write_fd = os.pipe()
+            with os.fdopen(write_fd, 'wb') as w:
+                w.write(b''.join(stdout))
+            self.stdout = os.fdopen(read_fd, 'rb')
 
         def wait(self, *args, **kwargs):
             if timeout_wait:
@@ -444,6 +456,7 @@ def test_binaryhandler_output_handler(
             assert mock_file.return_value.write.call_count == len(proc_stdout)
     if timeout_wait:
         handler.terminate.assert_called_once_with(proc)
+    proc.stdout.close()
 
 
 TESTDATA_4 = [
@@ -689,14 +702,23 @@ def test_simulationhandler_init(
 
 
 TESTDATA_9 = [
-    (3, 2, 0, 0, 3, -1, True, False, False, 1),
-    (4, 1, 0, 0, -1, -1, False, True, False, 0),
-    (5, 0, 1, 2, -1, 4, False, False, True, 3)
+    (
+        [b'line no 0\nline no', b' 1\n', b'', b'line no 2\n'],
+        3, None, True, False, False, 2
+    ),
+    (
+        [b'line no 0\n', b'\rline no 1\nline no 2\n', TypeError('dummy')],
+        -1, None, False, True, False, 3
+    ),
+    (
+        [OSError('dummy OSError'), SerialException('dummy SerialException'),
+         b'line no 0\nline no 1\nline no 2\nline no 3\n'],
+        -1, 1, False, False, True, 2
+    ),
 ]
 
 @pytest.mark.parametrize(
-    'success_count, in_waiting_count, oserror_count, readline_error_count,'
-    ' haltless_count, stateless_count, end_by_halt, end_by_close,'
+    'chunks, haltless_count, stateless_count, end_by_halt, end_by_close,'
     ' end_by_state, expected_line_count',
     TESTDATA_9,
     ids=[
@@ -707,10 +729,7 @@ TESTDATA_9 = [
 )
 def test_devicehandler_monitor_serial(
     mocked_instance,
-    success_count,
-    in_waiting_count,
-    oserror_count,
-    readline_error_count,
+    chunks,
     haltless_count,
     stateless_count,
     end_by_halt,
@@ -718,20 +737,23 @@ def test_devicehandler_monitor_serial(
     end_by_state,
     expected_line_count
 ):
-    is_open_iter = iter(lambda: True, False)
-    line_iter = [
-        TypeError('dummy TypeError') if x % 2 else \
-        SerialException('dummy SerialException') for x in range(
-            readline_error_count
-        )
-    ] + [
-        f'line no {idx}'.encode('utf-8') for idx in range(success_count)
-    ]
-    in_waiting_iter = [False] * in_waiting_count + [
-        TypeError('dummy TypeError')
-    ] if end_by_close else (
-        [OSError('dummy OSError')] * oserror_count + [False] * in_waiting_count
-    ) + [True] * (success_count + readline_error_count)
+    chunks = list(chunks)
+    pending = []
+
+    def mock_read(size=1):
+        if pending:
+            return pending.pop()
+        if not chunks:
+            return b''
+        chunk = chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        if len(chunk) > size:
+            pending.append(chunk[size:])
+        return chunk[:size]
+
+    def mock_in_waiting():
+        return len(pending[0]) if pending else 0
 
     is_set_iter = [False] * haltless_count + [True] \
         if end_by_halt else iter(lambda: False, True)
@@ -741,158 +763,38 @@ def test_devicehandler_monitor_serial(
 
     halt_event = mock.Mock(is_set=mock.Mock(side_effect=is_set_iter))
     ser = mock.Mock(
-        isOpen=mock.Mock(side_effect=is_open_iter),
-        readline=mock.Mock(side_effect=line_iter)
-    )
-    type(ser).in_waiting = mock.PropertyMock(
-        side_effect=in_waiting_iter,
-        return_value=False
+        isOpen=mock.Mock(return_value=True),
+        read=mock.Mock(side_effect=mock_read)
     )
+    type(ser).in_waiting = mock.PropertyMock(side_effect=mock_in_waiting)
     harness = mock.Mock(capture_coverage=False)
     type(harness).state=mock.PropertyMock(side_effect=state_iter)
 
     handler = DeviceHandler(mocked_instance, 'build')
     handler.options = mock.Mock(coverage=not end_by_state)
+    handler.SERIAL_READ_TIMEOUT = 0
 
     with mock.patch('builtins.open', mock.mock_open(read_data='')):
         handler.monitor_serial(ser, halt_event, harness)
 
+    assert ser.timeout == 0
+
     if not end_by_close:
         ser.close.assert_called_once()
 
-    harness.handle.assert_has_calls(
+    assert harness.handle.call_args_list == \
         [mock.call(f'line no {idx}') for idx in range(expected_line_count)]
-    )
 
 
-TESTDATA_10 = [
-    (
-        'dummy_platform',
-        'dummy fixture',
-        [
-            mock.Mock(
-                fixtures=[],
-                platform='dummy_platform',
-                available=1,
-                counter=0
-            ),
-            mock.Mock(
-                fixtures=['dummy fixture'],
-                platform='another_platform',
-                available=1,
-                counter=0
-            ),
-            mock.Mock(
-                fixtures=['dummy fixture'],
-                platform='dummy_platform',
-                serial_pty=None,
-                serial=None,
-                available=1,
-                counter=0
-            ),
-            mock.Mock(
-                fixtures=['dummy fixture'],
-                platform='dummy_platform',
-                serial_pty=mock.Mock(),
-                available=1,
-                counter=0
-            )
-        ],
-        3
-    ),
-    (
-        'dummy_platform',
-        'dummy fixture',
-        [],
-        TwisterException
-    ),
-    (
-        'dummy_platform',
-        'dummy fixture',
-        [
-            mock.Mock(
-                fixtures=['dummy fixture'],
-                platform='dummy_platform',
-                serial_pty=mock.Mock(),
-                available=0
-            ),
-            mock.Mock(
-                fixtures=['another fixture'],
-                platform='dummy_platform',
-                serial_pty=mock.Mock(),
-                available=0
-            ),
-            mock.Mock(
-                fixtures=['dummy fixture'],
-                platform='dummy_platform',
-                serial=mock.Mock(),
-                available=0
-            ),
-            mock.Mock(
-                fixtures=['another fixture'],
-                platform='dummy_platform',
-                serial=mock.Mock(),
-                available=0
-            )
-        ],
-        None
-    )
-]
-
-@pytest.mark.parametrize(
-    'platform_name, fixture, duts, expected',
-    TESTDATA_10,
-    ids=['one good dut', 'exception - no duts', 'no available duts']
-)
-def test_devicehandler_device_is_available(
-    mocked_instance,
-    platform_name,
-    fixture,
-    duts,
-    expected
-):
-    mocked_instance.platform.name = platform_name
-    mocked_instance.testsuite.harness_config = {'fixture': fixture}
+def test_devicehandler_release_hardware(mocked_instance):
+    hardware = mock.Mock()
 
     handler = DeviceHandler(mocked_instance, 'build')
-    handler.duts = duts
-
-    if isinstance(expected, int):
-        device = handler.device_is_available(mocked_instance)
+    handler.dut_pool = mock.Mock()
 
-        assert device == duts[expected]
-        assert device.available == 0
-        assert device.counter == 1
-    elif expected is None:
-        device = handler.device_is_available(mocked_instance)
+    handler.release_hardware(hardware)
 
-        assert device is None
-    elif isinstance(expected, type):
-        with pytest.raises(expected):
-            device = handler.device_is_available(mocked_instance)
-    else:
-        assert False
-
-
-def test_devicehandler_make_device_available(mocked_instance):
-    serial = mock.Mock(name='dummy_serial')
-    duts = [
-        mock.Mock(available=0, serial=serial, serial_pty=None),
-        mock.Mock(available=0, serial=None, serial_pty=serial),
-        mock.Mock(
-            available=0,
-            serial=mock.Mock('another_serial'),
-            serial_pty=None
-        )
-    ]
-
-    handler = DeviceHandler(mocked_instance, 'build')
-    handler.duts = duts
-
-    handler.make_device_available(serial)
-
-    assert len([None for d in handler.duts if d.available == 1]) == 2
-    assert handler.duts[2].available == 0
+    handler.dut_pool.release.assert_called_once_with(hardware)
 
 
 TESTDATA_11 = [
@@ -946,48 +848,47 @@ def test_devicehandler_run_custom_script(caplog, mock_process, raise_timeout):
 
 
 TESTDATA_12 = [
-    (0, False),
-    (4, False),
+    (0.5, False),
     (0, True)
 ]
 
 @pytest.mark.parametrize(
-    'num_of_failures, raise_exception',
+    'wait_time, raise_exception',
     TESTDATA_12,
-    ids=['no failures', 'with failures', 'exception']
+    ids=['waited', 'exception']
 )
 def test_devicehandler_get_hardware(
     mocked_instance,
     caplog,
-    num_of_failures,
+    wait_time,
     raise_exception
 ):
     expected_hardware = mock.Mock()
-
-    def mock_availability(handler, instance, no=num_of_failures):
-        if raise_exception:
-            raise TwisterException(f'dummy message')
-        if handler.no:
-            handler.no -= 1
-            return None
-        return expected_hardware
+    mocked_instance.platform.name = 'dummy_platform'
+    mocked_instance.testsuite.harness_config = {'fixture': 'dummy fixture'}
+    mocked_instance.dut_wait_time = 0
 
     handler = DeviceHandler(mocked_instance, 'build')
-    handler.no = num_of_failures
+    handler.dut_pool = mock.Mock()
+    if raise_exception:
+        handler.dut_pool.acquire.side_effect = TwisterException('dummy message')
+    else:
+        handler.dut_pool.acquire.return_value = (expected_hardware, wait_time)
 
-    with mock.patch.object(
-        DeviceHandler,
-        'device_is_available',
-        mock_availability
-    ):
-        hardware = handler.get_hardware()
+    hardware = handler.get_hardware()
 
+    handler.dut_pool.acquire.assert_called_once_with(
+        'dummy_platform',
+        'dummy fixture'
+    )
     if raise_exception:
+        assert hardware is None
         assert 'dummy message' in caplog.text.lower()
         assert mocked_instance.status == 'failed'
         assert mocked_instance.reason == 'dummy message'
     else:
         assert hardware == expected_hardware
+        assert mocked_instance.dut_wait_time == wait_time
 
 
 TESTDATA_13 = [
@@ -1161,15 +1062,14 @@ def test_devicehandler_update_instance_info(
 
 
 TESTDATA_15 = [
-    ('dummy device', 'dummy pty', None, None, True, False, False),
+    ('dummy device', 'dummy pty', None, None, True, False),
     (
         'dummy device',
         'dummy pty',
         mock.Mock(communicate=mock.Mock(return_value=('', ''))),
         SerialException,
         False,
-        True,
-        'dummy pty'
+        True
     ),
     (
         'dummy device',
@@ -1177,14 +1077,13 @@ TESTDATA_15 = [
         None,
         SerialException,
         False,
-        False,
-        'dummy device'
+        False
     )
 ]
 
 @pytest.mark.parametrize(
     'serial_device, serial_pty, ser_pty_process, expected_exception,' \
-    ' expected_result, terminate_ser_pty_process, make_available',
+    ' expected_result, terminate_ser_pty_process',
     TESTDATA_15,
     ids=['valid', 'serial pty process', 'no serial pty']
 )
@@ -1195,8 +1094,7 @@ def test_devicehandler_create_serial_connection(
     ser_pty_process,
     expected_exception,
     expected_result,
-    terminate_ser_pty_process,
-    make_available
+    terminate_ser_pty_process
 ):
     def mock_serial(*args, **kwargs):
         if expected_exception:
@@ -1204,11 +1102,8 @@ def test_devicehandler_create_serial_connection(
         return expected_result
 
     handler = DeviceHandler(mocked_instance, 'build')
-    handler.make_device_available = mock.Mock()
     missing_mock = mock.Mock()
     handler.instance.add_missing_case_status = missing_mock
-    available_mock = mock.Mock()
-    handler.make_device_available = available_mock
     handler.options = mock.Mock(timeout_multiplier=1)
 
     hardware_baud = 14400
@@ -1235,9 +1130,6 @@ def test_devicehandler_create_serial_connection(
         ser_pty_process.terminate.assert_called_once()
         ser_pty_process.communicate.assert_called_once()
 
-    if make_available:
-        available_mock.assert_called_once_with(make_available)
-
 
 TESTDATA_16 = [
     ('dummy1 dummy2', None, 'slave name'),
@@ -1391,7 +1283,7 @@ def test_devicehandler_handle(
     handler.terminate = mock.Mock(side_effect=mock_terminate)
     handler._update_instance_info = mock.Mock()
     handler._final_handle_actions = mock.Mock()
-    handler.make_device_available = mock.Mock()
+    handler.release_hardware = mock.Mock()
     handler.instance.platform.name = 'IPName'
 
     harness = mock.Mock()
@@ -1428,9 +1320,7 @@ def test_devicehandler_handle(
     if expected_status:
         assert handler.instance.status == expected_status
 
-    handler.make_device_available.assert_called_once_with(
-        'Serial PTY' if use_pty else 'dummy serial device'
-    )
+    handler.release_hardware.assert_called_once_with(hardware)
 
 
 TESTDATA_18 = [
@@ -1839,6 +1729,16 @@ TESTDATA_25 = [
         'unexpected byte',
         []
     ),
+    (
+        '1\n2\npartial'.encode('utf-8'),
+        60,
+        1,
+        [None] * 5,
+        100,
+        False,
+        'unexpected eof',
+        [mock.call('1\n'), mock.call('2\n')]
+    ),
     (
         '1\n2\n3\n4\n5\n'.encode('utf-8'),
         600,
@@ -1853,11 +1753,11 @@ TESTDATA_25 = [
         '1\n2\n3\n4\n5\n'.encode('utf-8'),
         600,
         0,
-        [None] * 3 + ['success'] * 7,
+        [None] * 4 + ['success'] * 6,
         100,
         False,
         'timeout',
-        [mock.call('1\n'), mock.call('2\n')]
+        [mock.call('1\n'), mock.call('2\n'), mock.call('3\n'), mock.call('4\n')]
     ),
     (
         '1\n2\n3\n4\n5\n'.encode('utf-8'),
@@ -1880,6 +1780,7 @@ TESTDATA_25 = [
         'harness failed',
         'unexpected eof',
         'unexpected byte',
+        'partial line at eof',
         'harness success',
         'timeout by pid=0',
         'capture_coverage'
@@ -1926,10 +1827,19 @@ def test_qemuhandler_thread(
     harness = mock.Mock(capture_coverage=capture_coverage, handle=print)
     type(harness).state = mock.PropertyMock(side_effect=harness_states)
 
-    p = mock.Mock()
-    p.poll = mock.Mock(
-        side_effect=itertools.cycle([True, True, True, True, False])
-    )
+    class FakeLineReader:
+        """Returns the content line by line, every fifth read times out."""
+        def __init__(self, fileobj):
+            self.lines = content.splitlines(True)
+            self.ready = itertools.cycle([True, True, True, True, False])
+
+        def readline(self, timeout):
+            if not next(self.ready):
+                return None
+            return self.lines.pop(0) if self.lines else b''
+
+        def close(self):
+            pass
 
     mock_thread_get_fifo_names = mock.Mock(
         return_value=('fifo_fn.in', 'fifo_fn.out')
@@ -1945,7 +1855,7 @@ def test_qemuhandler_thread(
 
     with mock.patch('time.time', side_effect=faux_timer.time), \
          mock.patch('builtins.open', new=mocked_open), \
-         mock.patch('select.poll', return_value=p), \
+         mock.patch('twisterlib.handlers.LineReader', FakeLineReader), \
          mock.patch('os.path.exists', return_value=True), \
          mock.patch('twisterlib.handlers.QEMUHandler._get_cpu_time',
                     mock_cputime), \
@@ -1977,6 +1887,9 @@ def test_qemuhandler_thread(
     )
 
     log_fp_mock.write.assert_has_calls(expected_log_calls)
+    # a last line without line ending is never logged
+    assert all(c.args[0].endswith('\n')
+               for c in log_fp_mock.write.call_args_list)
 
 
 TESTDATA_26 = [
@@ -2044,7 +1957,6 @@ def test_qemuhandler_handle(
         west_runner=None
     )
     handler.run_custom_script = mock.Mock(return_value=None)
-    handler.make_device_available = mock.Mock(return_value=None)
     handler._final_handle_actions = mock.Mock(return_value=None)
     handler._create_command = mock.Mock(return_value=command)
     handler._set_qemu_filenames = mock.Mock(side_effect=mock_filenames)
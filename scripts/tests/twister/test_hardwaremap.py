@@ -9,11 +9,15 @@ Tests for hardwaremap.py classes' methods
 import mock
 import pytest
 import sys
+import threading
+import time
 
 from pathlib import Path
 
+from twisterlib.error import TwisterException
 from twisterlib.hardwaremap import(
     DUT,
+    DUTPool,
     HardwareMap
 )
 
@@ -213,10 +217,10 @@ def test_hardwaremap_summary(capfd, mocked_hm):
     expected = """
 Hardware distribution summary:
 
-| Board   |   ID |   Counter |
-|---------|------|-----------|
-| p1      |    1 |         0 |
-| p7      |    7 |         0 |
+| Board   |   ID |   Counter |   Busy time [s] |
+|---------|------|-----------|-----------------|
+| p1      |    1 |         0 |               0 |
+| p7      |    7 |         0 |               0 |
 """
 
     out, err = capfd.readouterr()
@@ -720,3 +724,96 @@ def test_hardwaremap_dump(
     sys.stderr.write(err)
 
     assert out.strip() == expected_out.strip()
+
+
+def test_hardwaremap_utilization(mocked_hm):
+    mocked_hm.duts[0].counter = 2
+    mocked_hm.duts[0].busy_time = 30
+
+    usage = mocked_hm.utilization(['p1', 'p2', 'p3'], 60)
+
+    assert usage == [
+        {'id': 1, 'platform': 'p1', 'serial': 's1', 'counter': 2,
+         'busy_time': 30, 'utilization': 0.5},
+        {'id': 3, 'platform': 'p3', 'serial': 's3', 'counter': 0,
+         'busy_time': 0, 'utilization': 0},
+    ]
+
+
+@pytest.fixture
+def dut_pool():
+    duts = [
+        DUT(platform='p1', id=1, serial='s1'),
+        DUT(platform='p1', id=2, serial_pty='pty2'),
+        DUT(platform='p1', id=3),
+        DUT(platform='p2', id=4, serial='s4'),
+    ]
+    duts[0].fixtures = ['f1']
+
+    return DUTPool(duts, 4)
+
+
+TESTDATA_7 = [
+    ('p1', None, [0, 1]),
+    ('p1', 'f1', [0]),
+    ('p1', 'f2', []),
+    ('p2', None, [3]),
+    ('p3', None, []),
+]
+
+
+@pytest.mark.parametrize(
+    'platform, fixture, expected_candidates',
+    TESTDATA_7,
+    ids=['platform', 'fixture', 'missing fixture', 'other platform',
+         'no platform']
+)
+def test_dutpool_candidates(dut_pool, platform, fixture, expected_candidates):
+    assert dut_pool.candidates(platform, fixture) == expected_candidates
+
+
+def test_dutpool_acquire_release(dut_pool):
+    dut, wait_time = dut_pool.acquire('p1', 'f1')
+
+    assert dut is dut_pool.duts[0]
+    assert wait_time >= 0
+    assert dut.available == 0
+    assert dut.counter == 1
+
+    other_dut, _ = dut_pool.acquire('p1')
+
+    assert other_dut is dut_pool.duts[1]
+
+    dut_pool.release(dut)
+
+    assert dut.available == 1
+    assert dut.busy_time > 0
+
+    with pytest.raises(TwisterException, match='No device to serve as p3'):
+        dut_pool.acquire('p3')
+
+
+def test_dutpool_fifo(dut_pool):
+    dut, _ = dut_pool.acquire('p2')
+    served = []
+
+    def waiter(name):
+        acquired, wait_time = dut_pool.acquire('p2')
+        served.append((name, wait_time))
+        dut_pool.release(acquired)
+
+    threads = []
+    for name in ['first', 'second', 'third']:
+        thread = threading.Thread(target=waiter, args=(name,))
+        thread.start()
+        threads.append(thread)
+        # let each waiter take its ticket before starting the next one
+        while sum(1 for t in dut_pool._tickets if t) < len(threads):
+            time.sleep(0.001)
+
+    dut_pool.release(dut)
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert [name for name, _ in served] == ['first', 'second', 'third']
+    assert all(wait_time > 0 for _, wait_time in served)
@@ -14,7 +14,7 @@ import pytest
 ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
 sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
 
-from twisterlib.harness import Gtest
+from twisterlib.harness import Gtest, Ztest
 from twisterlib.testinstance import TestInstance
 
 GTEST_START_STATE = " RUN      "
@@ -34,6 +34,23 @@ def process_logs(harness, logs):
         harness.handle(line)
 
 
+@pytest.fixture
+def ztest():
+    mock_platform = mock.Mock()
+    mock_platform.name = "mock_platform"
+    mock_testsuite = mock.Mock()
+    mock_testsuite.name = "mock_testsuite"
+    mock_testsuite.detailed_test_id = True
+    mock_testsuite.id = "id"
+    mock_testsuite.testcases = []
+    mock_testsuite.harness_config = {}
+    instance = TestInstance(testsuite=mock_testsuite, platform=mock_platform, outdir="")
+
+    harness = Ztest()
+    harness.configure(instance)
+    return harness
+
+
 @pytest.fixture
 def gtest():
     mock_platform = mock.Mock()
@@ -248,3 +265,34 @@ def test_gtest_repeated_run(gtest):
                 ),
             ],
         )
+
+
+def test_ztest_results(ztest):
+    process_logs(
+        ztest,
+        [
+            "Running TESTSUITE suite_a",
+            "START - test_a",
+            " PASS - test_a in 0.001 seconds",
+            "START - test_b",
+            "Assertion failed at main.c:10",
+            " FAIL - test_b in 0.002 seconds",
+            "START - test_c",
+            " SKIP - test_c in 0.000 seconds",
+            "PROJECT EXECUTION FAILED",
+        ],
+    )
+    assert ztest.state == "failed"
+    assert ztest.detected_suite_names == ["suite_a"]
+    assert [(tc.name, tc.status) for tc in ztest.instance.testcases] == [
+        ("id.a", "passed"),
+        ("id.b", "failed"),
+        ("id.c", "skipped"),
+    ]
+    assert ztest.instance.get_case_by_name("id.a").output == ""
+    assert ztest.instance.get_case_by_name("id.b").output == (
+        "START - test_b\n"
+        "Assertion failed at main.c:10\n"
+        " FAIL - test_b in 0.002 seconds\n"
+    )
+    assert ztest.testcase_output == []
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for reports.py classes' methods
+"""
+
+import json
+import mock
+import pytest
+import xml.etree.ElementTree as ET
+
+from twisterlib.reports import Reporting
+from twisterlib.testsuite import TestCase
+
+
+def make_instance(build_dir, name, platform, status, reason=None):
+    case = TestCase(name=f'{name}.case')
+    case.status = status
+    case.duration = 1.5
+    return mock.Mock(
+        build_dir=str(build_dir),
+        metrics={'handler_time': 2, 'build_time': 3, 'used_ram': 100},
+        testsuite=mock.Mock(source_dir_rel='tests/dummy'),
+        platform=mock.Mock(arch='arm'),
+        run_id='run id',
+        status=status,
+        reason=reason,
+        run=True,
+        retries=0,
+        dut=None,
+        testcases=[case],
+        **{'testsuite.name': name, 'platform.name': platform}
+    )
+
+
+@pytest.fixture
+def mocked_reporting(tmp_path):
+    (tmp_path / 'failed').mkdir()
+    (tmp_path / 'failed' / 'handler.log').write_bytes(
+        'boot\x00 \x1b[0mfailed é\n'.encode('utf-8')
+    )
+    instances = {
+        'p1/passed': make_instance(tmp_path / 'passed', 'passed', 'p1', 'passed'),
+        'p1/failed': make_instance(tmp_path / 'failed', 'failed', 'p1', 'failed',
+                                   'Timeout'),
+        'p2/filtered': make_instance(tmp_path / 'filtered', 'filtered', 'p2',
+                                     'filtered', 'Filtered'),
+    }
+    plan = mock.Mock(instances=instances, selected_platforms=['p1', 'p2'])
+    env = mock.Mock(toolchain='zephyr', commit_date='commit date',
+                    run_date='run date')
+    env.options = mock.Mock(outdir=str(tmp_path), device_testing=False,
+                            detailed_skipped_report=False,
+                            report_log_paths=False)
+
+    return Reporting(plan, env)
+
+
+def test_reporting_process_log(tmp_path):
+    log = tmp_path / 'handler.log'
+    log.write_bytes('a\x00b\tcéd\n\x7f'.encode('utf-8') + b'\xff')
+
+    assert Reporting.process_log(str(log)) == 'ab\tcd\n'
+    assert Reporting.process_log(str(tmp_path / 'missing.log')) == ''
+
+
+@pytest.mark.parametrize(
+    'report_log_paths',
+    [False, True],
+    ids=['embedded logs', 'log paths']
+)
+def test_reporting_json_report(tmp_path, mocked_reporting, report_log_paths):
+    mocked_reporting.env.options.report_log_paths = report_log_paths
+    filename = tmp_path / 'twister.json'
+
+    mocked_reporting.json_report(str(filename), version='1.0')
+
+    text = filename.read_text()
+    report = json.loads(text)
+    assert text == json.dumps(report, indent=4, separators=(',',':'))
+
+    suites = {suite['name']: suite for suite in report['testsuites']}
+    assert report['environment']['zephyr_version'] == '1.0'
+    assert list(suites) == ['passed', 'failed', 'filtered']
+    assert suites['passed']['testcases'] == [
+        {'identifier': 'passed.case', 'execution_time': '2.00', 'status': 'passed'}
+    ]
+    if report_log_paths:
+        assert 'log' not in suites['failed']
+        assert suites['failed']['log_file'] == \
+            str(tmp_path / 'failed' / 'handler.log')
+    else:
+        assert suites['failed']['log'] == 'boot [0mfailed \n'
+
+
+def test_reporting_json_report_empty(tmp_path, mocked_reporting):
+    mocked_reporting.instances = {}
+    filename = tmp_path / 'twister.json'
+
+    mocked_reporting.json_report(str(filename))
+
+    text = filename.read_text()
+    assert text == json.dumps(json.loads(text), indent=4, separators=(',',':'))
+
+
+def test_reporting_xunit_report(tmp_path, mocked_reporting):
+    json_file = tmp_path / 'twister.json'
+    mocked_reporting.json_report(str(json_file))
+
+    mocked_reporting.xunit_report(str(json_file), str(tmp_path / 'twister.xml'))
+    mocked_reporting.xunit_report(str(json_file), str(tmp_path / 'p2.xml'), 'p2')
+    mocked_reporting.xunit_report_suites(str(json_file),
+                                         str(tmp_path / 'suites.xml'))
+
+    root = ET.parse(tmp_path / 'twister.xml').getroot()
+    assert [ts.get('name') for ts in root] == ['p1']
+    assert root[0].get('tests') == '2'
+    assert root[0].get('failures') == '1'
+    assert root.find('.//failure').text == 'boot [0mfailed \n'
+
+    assert (tmp_path / 'p2.xml').read_bytes() == b'<testsuites />'
+
+    root = ET.parse(tmp_path / 'suites.xml').getroot()
+    assert [ts.get('name') for ts in root] == ['passed', 'failed']
@@ -7,14 +7,18 @@ Tests for runner.py classes
 """
 
 import errno
+import json
 import mock
+import multiprocessing
 import os
 import pathlib
 import pytest
 import queue
 import re
+import shutil
 import subprocess
 import sys
+import time
 import yaml
 
 from contextlib import nullcontext
@@ -748,7 +752,9 @@ def test_filterbuilder_parse_generated(
          mock.patch('builtins.open', mock_open), \
          mock.patch('expr_parser.parse', mock_parser), \
          mock.patch('pickle.load', mock_pickle), \
-         mock.patch('os.path.exists', return_value=edt_exists), \
+         mock.patch('os.path.exists',
+                    lambda path: edt_exists and
+                    not path.endswith('edt.snapshot')), \
          mock.patch('os.environ', environ_mock), \
          pytest.raises(expected_return) if \
              isinstance(parse_results, type) and \
@@ -768,6 +774,39 @@ def test_filterbuilder_parse_generated(
     assert result == expected_return
 
 
+def test_filterbuilder_parse_generated_prefers_snapshot(mocked_jobserver):
+    edt_snapshot = mock.Mock()
+
+    def mock_parser(filter, filter_data, edt):
+        assert edt is edt_snapshot
+        return True
+
+    testsuite_mock = mock.Mock(sysbuild=None, filter='dt_compat_enabled("x")')
+    testsuite_mock.name = 'dummy.testsuite.name'
+    platform_mock = mock.Mock(arch='dummy arch')
+    platform_mock.name = 'other'
+    build_dir = os.path.join('build', 'dir')
+
+    fb = FilterBuilder(testsuite_mock, platform_mock,
+                       os.path.join('source', 'dir'), build_dir,
+                       mocked_jobserver)
+    fb.env = mock.Mock()
+
+    with mock.patch('twisterlib.runner.CMakeCache.from_file',
+                    side_effect=FileNotFoundError), \
+         mock.patch('expr_parser.parse', mock_parser), \
+         mock.patch('twisterlib.runner.edtsnapshot.load_snapshot',
+                    return_value=edt_snapshot) as mock_load, \
+         mock.patch('pickle.load',
+                    side_effect=AssertionError('pickle loaded')), \
+         mock.patch('os.path.exists', return_value=True):
+        result = fb.parse_generated(['dts'])
+
+    mock_load.assert_called_once_with(
+        os.path.join(build_dir, 'zephyr', 'edt.snapshot'))
+    assert result == {os.path.join('other', 'dummy.testsuite.name'): False}
+
+
 TESTDATA_4 = [
     (False, False, [f"see: {os.path.join('dummy', 'path', 'dummy_file.log')}"]),
     (True, False, [os.path.join('dummy', 'path', 'dummy_file.log'),
@@ -1475,12 +1514,14 @@ def test_projectbuilder_process(
     instance_mock.status = instance_status
     instance_mock.reason = instance_reason
     instance_mock.run = instance_run
+    instance_mock.build_time = 0
     instance_mock.handler = mock.Mock()
     instance_mock.handler.ready = instance_handler_ready
     env_mock = mock.Mock()
 
     pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
     pb.options = mock.Mock()
+    pb.options.build_cache = None
     pb.options.coverage = options_coverage
     pb.options.prep_artifacts_for_testing = options_prep_artifacts
     pb.options.runtime_artifact_cleanup = options_runtime_artifacts
@@ -1515,11 +1556,267 @@ def test_projectbuilder_process(
     assert pb.instance.status == expected_status
     assert pb.instance.reason == expected_reason
     assert results_mock.skipped_runtime == expected_skipped
+    assert pb.instance.build_time >= 0
 
     if expected_missing:
         pb.instance.add_missing_case_status.assert_called_with(*expected_missing)
 
 
+@pytest.mark.parametrize(
+    'leader_status',
+    [None, 'error'],
+    ids=['configured', 'cmake failure']
+)
+def test_projectbuilder_process_filter_followers(mocked_jobserver, leader_status):
+    def make_instance(name):
+        instance = mock.Mock(status=None, build_time=0)
+        instance.name = name
+        return instance
+
+    leader = make_instance('p/leader')
+    followers = [make_instance('p/kept'), make_instance('p/filtered')]
+    env_mock = mock.Mock()
+    events = []
+
+    def mock_cmake(filter_stages):
+        leader.status = leader_status
+        return {'filter': {'p/leader': False}}
+
+    def mock_filter_from(self, build_dir):
+        events.append(('filter_from', self.instance.name, build_dir))
+        return {'filter': {'p/filtered': True}}
+
+    pb = ProjectBuilder(leader, env_mock, mocked_jobserver)
+    pb.cmake = mock.Mock(side_effect=mock_cmake)
+    pipeline_mock = mock.Mock(
+        put=mock.Mock(side_effect=lambda m: events.append((m['op'], m['test'].name)))
+    )
+    results_mock = mock.Mock(skipped_runtime=0)
+
+    with mock.patch.object(ProjectBuilder, 'filter_from', mock_filter_from):
+        pb.process(pipeline_mock, mock.Mock(),
+                   {'op': 'filter', 'test': leader, 'followers': followers},
+                   mock.Mock(), results_mock)
+
+    pb.cmake.assert_called_once()
+    if leader_status:
+        assert events == [('report', 'p/leader'), ('filter', 'p/kept'),
+                          ('filter', 'p/filtered')]
+    else:
+        # followers are filtered before the leader's build directory is
+        # reconfigured by its next operation
+        assert events == [('filter_from', 'p/kept', leader.build_dir),
+                          ('filter_from', 'p/filtered', leader.build_dir),
+                          ('cmake', 'p/leader'), ('cmake', 'p/kept'),
+                          ('report', 'p/filtered')]
+        assert followers[1].status == 'filtered'
+        assert results_mock.skipped_runtime == 1
+
+
+@mock.patch('twisterlib.build_cache.read_compiler_deps', return_value=[])
+def test_projectbuilder_process_build_cache(compiler_deps_mock, mocked_jobserver, tmp_path):
+    instance_mock = mock.Mock()
+    instance_mock.name = 'dummy instance name'
+    instance_mock.status = None
+    instance_mock.run = False
+    instance_mock.build_time = 0
+    instance_mock.build_dir = str(tmp_path / 'build')
+    instance_mock.testsuite.sysbuild = False
+    instance_mock.testsuite.source_dir = str(tmp_path)
+    instance_mock.testsuite.required_snippets = []
+    instance_mock.testsuite.filter = None
+    instance_mock.filter_stages = []
+    instance_mock.platform.name = 'dummy platform'
+    env_mock = mock.Mock(version='v1', toolchain='zephyr', generator='Ninja')
+
+    pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
+    pb.options = mock.Mock(
+        build_cache=str(tmp_path / 'cache'),
+        build_cache_size=1,
+        enable_coverage=False,
+        cmake_only=False,
+        create_rom_ram_report=False,
+        disable_warnings_as_errors=False,
+        extra_args=[]
+    )
+    pb.cmake_assemble_args = mock.Mock(
+        return_value=[f'-DOVERLAY_CONFIG={instance_mock.build_dir}/extra.conf']
+    )
+    pipeline_mock = mock.Mock()
+
+    key = pb.get_build_cache_key()
+    pb.cmake_assemble_args.return_value = ['-DOVERLAY_CONFIG=<build_dir>/extra.conf']
+    assert pb.get_build_cache_key() == key
+
+    # Miss: cmake runs and the key goes with the build message
+    pb.cmake = mock.Mock(return_value={'filter': {}})
+    pb.process(pipeline_mock, mock.Mock(), {'op': 'cmake'}, mock.Mock(), mock.Mock())
+
+    pb.cmake.assert_called_once()
+    pipeline_mock.put.assert_called_with(
+        {'op': 'build', 'test': instance_mock, 'cache_key': key}
+    )
+
+    os.makedirs(os.path.join(instance_mock.build_dir, 'zephyr'))
+    with open(os.path.join(instance_mock.build_dir, 'zephyr', 'zephyr.elf'), 'wb') as f:
+        f.write(b'elf')
+    instance_mock.run_id = 'built run id'
+    pb.get_build_cache().store(key, instance_mock.build_dir,
+                               [os.path.join('zephyr', 'zephyr.elf')], 'built run id')
+
+    # Hit: cmake and build are skipped
+    instance_mock.run_id = 'new run id'
+    pb.cmake.reset_mock()
+    pb.process(pipeline_mock, mock.Mock(), {'op': 'cmake'}, mock.Mock(), mock.Mock())
+
+    pb.cmake.assert_not_called()
+    pipeline_mock.put.assert_called_with(
+        {'op': 'build', 'test': instance_mock, 'cached': True}
+    )
+    assert instance_mock.run_id == 'built run id'
+
+    pb.build = mock.Mock()
+    pb.determine_testcases = mock.Mock()
+    pb.process(pipeline_mock, mock.Mock(), {'op': 'build', 'cached': True},
+               mock.Mock(), mock.Mock())
+
+    pb.build.assert_not_called()
+    assert instance_mock.status == 'passed'
+    instance_mock.add_missing_case_status.assert_called_with(
+        'skipped', 'Test was built only'
+    )
+    pipeline_mock.put.assert_called_with(
+        {'op': 'gather_metrics', 'test': instance_mock}
+    )
+
+
+@mock.patch('twisterlib.build_cache.read_compiler_deps', return_value=[])
+def test_projectbuilder_build_cache_key_filter(compiler_deps_mock, mocked_jobserver, tmp_path):
+    def make_builder(name, filter, filter_stages):
+        instance_mock = mock.Mock(status=None, run=False, build_time=0,
+                                  filter_stages=filter_stages)
+        instance_mock.name = name
+        instance_mock.build_dir = str(tmp_path / name)
+        instance_mock.testsuite.sysbuild = False
+        instance_mock.testsuite.source_dir = str(tmp_path)
+        instance_mock.testsuite.required_snippets = []
+        instance_mock.testsuite.filter = filter
+        instance_mock.platform.name = 'dummy platform'
+        env_mock = mock.Mock(version='v1', toolchain='zephyr', generator='Ninja')
+
+        pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
+        pb.options = mock.Mock(
+            build_cache=str(tmp_path / 'cache'),
+            build_cache_size=1,
+            enable_coverage=False,
+            cmake_only=False,
+            create_rom_ram_report=False,
+            disable_warnings_as_errors=False,
+            extra_args=[]
+        )
+        pb.cmake_assemble_args = mock.Mock(return_value=[])
+        return pb
+
+    unfiltered = make_builder('unfiltered', None, [])
+    filtered = make_builder('filtered', 'CONFIG_FOO', ['full'])
+    same_filter = make_builder('same_filter', 'CONFIG_FOO', ['full'])
+
+    key = unfiltered.get_build_cache_key()
+    assert filtered.get_build_cache_key() != key
+    assert filtered.get_build_cache_key() == same_filter.get_build_cache_key()
+
+    # The entry of the unfiltered scenario is not used for the filtered one,
+    # which goes through cmake and gets filtered at runtime
+    os.makedirs(os.path.join(unfiltered.instance.build_dir, 'zephyr'))
+    with open(os.path.join(unfiltered.instance.build_dir, 'zephyr', 'zephyr.elf'), 'wb') as f:
+        f.write(b'elf')
+    unfiltered.get_build_cache().store(key, unfiltered.instance.build_dir,
+                                       [os.path.join('zephyr', 'zephyr.elf')], 'run id')
+
+    filtered.cmake = mock.Mock(return_value={'filter': {'filtered': True}})
+    pipeline_mock = mock.Mock()
+    results_mock = mock.Mock(skipped_runtime=0)
+    filtered.process(pipeline_mock, mock.Mock(), {'op': 'cmake'}, mock.Mock(), results_mock)
+
+    filtered.cmake.assert_called_once()
+    assert filtered.instance.status == 'filtered'
+    assert results_mock.skipped_runtime == 1
+
+    # Make builds don't log the compiled sources, they are not cached
+    unfiltered.env.generator = 'Unix Makefiles'
+    assert unfiltered.get_build_cache_key() is None
+    pipeline_mock.put.assert_called_with({'op': 'report', 'test': filtered.instance})
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='runs a shell script')
+@mock.patch('twisterlib.build_cache.read_compiler_deps', return_value=[])
+def test_projectbuilder_build_cache_native(compiler_deps_mock, mocked_jobserver, tmp_path):
+    build_dir = tmp_path / 'build'
+    instance_mock = mock.Mock()
+    instance_mock.name = 'dummy instance name'
+    instance_mock.status = None
+    instance_mock.run = True
+    instance_mock.run_id = 'built run id'
+    instance_mock.build_time = 0
+    instance_mock.build_dir = str(build_dir)
+    instance_mock.testsuite.sysbuild = False
+    instance_mock.testsuite.source_dir = str(tmp_path)
+    instance_mock.testsuite.required_snippets = []
+    instance_mock.testsuite.filter = None
+    instance_mock.filter_stages = []
+    instance_mock.platform.name = 'native_sim'
+    instance_mock.platform.binaries = []
+    instance_mock.handler.type_str = 'native'
+    instance_mock.handler.ready = True
+    instance_mock.handler.call_make_run = False
+    instance_mock.handler.binary = str(build_dir / 'zephyr' / 'zephyr.exe')
+    env_mock = mock.Mock(version='v1', toolchain='zephyr', generator='Ninja')
+
+    pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
+    pb.options = mock.Mock(
+        build_cache=str(tmp_path / 'cache'),
+        build_cache_size=1,
+        enable_coverage=False,
+        cmake_only=False,
+        create_rom_ram_report=False,
+        disable_warnings_as_errors=False,
+        extra_args=[]
+    )
+    pb.cmake_assemble_args = mock.Mock(return_value=[])
+    pb.determine_testcases = mock.Mock()
+    pipeline_mock = mock.Mock()
+
+    key = pb.get_build_cache_key()
+    assert key is not None
+
+    # native_sim builds have no flashable image in runners.yaml
+    (build_dir / 'zephyr').mkdir(parents=True)
+    (build_dir / 'zephyr' / 'runners.yaml').write_text(
+        yaml.dump({'config': {'elf_file': 'zephyr.elf', 'exe_file': 'zephyr.exe'}})
+    )
+    exe = build_dir / 'zephyr' / 'zephyr.exe'
+    exe.write_text('#!/bin/sh\necho "Hello from native"\n')
+    exe.chmod(0o755)
+
+    instance_mock.status = 'passed'
+    pb.build = mock.Mock(return_value={'returncode': 0})
+    pb.process(pipeline_mock, mock.Mock(), {'op': 'build', 'cache_key': key},
+               mock.Mock(), mock.Mock())
+
+    # Restore into a clean build directory and run the executable
+    shutil.rmtree(build_dir)
+    pb.cmake = mock.Mock()
+    pb.process(pipeline_mock, mock.Mock(), {'op': 'cmake'}, mock.Mock(), mock.Mock())
+
+    pb.cmake.assert_not_called()
+    pipeline_mock.put.assert_called_with(
+        {'op': 'build', 'test': instance_mock, 'cached': True}
+    )
+    out = subprocess.run([instance_mock.handler.binary], check=True,
+                         stdout=subprocess.PIPE, text=True).stdout
+    assert out == 'Hello from native\n'
+
+
 TESTDATA_7 = [
     (
         [
@@ -2145,7 +2442,7 @@ TESTDATA_14 = [
 
 @pytest.mark.parametrize(
     'ready, type_str, seed, platform_name, platform_arch, defconfig, harness,' \
-    ' expect_duts, expect_parse_generated, expect_seed,' \
+    ' expect_dut_pool, expect_parse_generated, expect_seed,' \
     ' expect_extra_test_args, expect_pytest, expect_handle',
     TESTDATA_14,
     ids=['pytest full', 'not pytest minimal', 'not ready']
@@ -2159,7 +2456,7 @@ def test_projectbuilder_run(
     platform_arch,
     defconfig,
     harness,
-    expect_duts,
+    expect_dut_pool,
     expect_parse_generated,
     expect_seed,
     expect_extra_test_args,
@@ -2180,7 +2477,7 @@ def test_projectbuilder_run(
     instance_mock.handler.seed = 123
     instance_mock.handler.ready = ready
     instance_mock.handler.type_str = type_str
-    instance_mock.handler.duts = [mock.Mock(name='dummy dut')]
+    instance_mock.handler.dut_pool = mock.Mock(name='dummy dut pool')
     instance_mock.platform.name = platform_name
     instance_mock.platform.arch = platform_arch
     instance_mock.testsuite.harness = harness
@@ -2188,7 +2485,7 @@ def test_projectbuilder_run(
 
     pb = ProjectBuilder(instance_mock, env_mock, mocked_jobserver)
     pb.options.extra_test_args = ['dummy_arg1', 'dummy_arg2']
-    pb.duts = ['another dut']
+    pb.dut_pool = 'another dut pool'
     pb.options.seed = seed
     pb.defconfig = defconfig
     pb.parse_generated = mock.Mock()
@@ -2197,8 +2494,8 @@ def test_projectbuilder_run(
                     mock_harness):
         pb.run()
 
-    if expect_duts:
-        assert pb.instance.handler.duts == ['another dut']
+    if expect_dut_pool:
+        assert pb.instance.handler.dut_pool == 'another dut pool'
 
     if expect_parse_generated:
         pb.parse_generated.assert_called_once()
@@ -2365,6 +2662,7 @@ def test_twisterrunner_run(
     tr.options.retry_build_errors = True
     tr.options.jobs = None
     tr.options.build_only = None
+    tr.options.scheduler = 'manager'
     for k, v in options.items():
         setattr(tr.options, k, v)
     tr.update_counting_before_pipeline = mock.Mock()
@@ -2380,7 +2678,8 @@ def test_twisterrunner_run(
     done_q = queue.LifoQueue()
     done_instance = mock.Mock(
         metrics={'k2': 'v2'},
-        execution_time=30
+        execution_time=30,
+        build_time=120
     )
     done_instance.name='dummy instance'
     done_q.put(done_instance)
@@ -2416,6 +2715,7 @@ def test_twisterrunner_run(
         'k': 'v',
         'k2': 'v2',
         'handler_time': 30,
+        'build_time': 120,
         'unrecognized': []
     }
 
@@ -2555,6 +2855,8 @@ def test_twisterrunner_add_tasks_to_queue(
     tr.get_cmake_filter_stages = mock.Mock(
         side_effect=mock_get_cmake_filter_stages
     )
+    tr.expected_duration = mock.Mock(return_value=0)
+    tr.get_filter_key = mock.Mock(side_effect=id)
 
     pipeline_mock = mock.Mock()
 
@@ -2579,6 +2881,134 @@ def test_twisterrunner_add_tasks_to_queue(
     assert pipeline_mock.put.call_args_list == \
            [mock.call(el) for el in expected_pipeline_elements]
 
+    # durations are only estimated for the queued instances
+    assert len(tr.expected_duration.call_args_list) == \
+           len(expected_pipeline_elements)
+
+
+def test_twisterrunner_add_tasks_to_queue_longest_first():
+    instances = {
+        'short': mock.Mock(status=None, retries=0),
+        'long': mock.Mock(status=None, retries=0),
+        'medium': mock.Mock(status=None, retries=0),
+    }
+    for name, instance in instances.items():
+        instance.name = name
+        instance.testsuite.filter = None
+    durations = {'short': 1, 'long': 100, 'medium': 10}
+    suites = []
+    env_mock = mock.Mock()
+
+    tr = TwisterRunner(instances, suites, env=env_mock)
+    tr.expected_duration = mock.Mock(side_effect=lambda i: durations[i.name])
+
+    pipeline = queue.LifoQueue()
+    tr.add_tasks_to_queue(pipeline)
+
+    assert [pipeline.get_nowait()['test'].name for _ in range(3)] == \
+           ['long', 'medium', 'short']
+
+
+def test_twisterrunner_add_tasks_to_queue_filter_groups(tmp_path):
+    def make_instance(name, platform, extra_args):
+        instance = mock.Mock(status=None, retries=0, run=True)
+        instance.name = name
+        instance.build_dir = str(tmp_path / name)
+        instance.platform.name = platform
+        instance.testsuite = mock.Mock(
+            filter='dt_compat_enabled("foo")',
+            source_dir=str(tmp_path),
+            extra_args=extra_args,
+            extra_conf_files=[],
+            extra_overlay_confs=[],
+            extra_dtc_overlay_files=[],
+            required_snippets=[]
+        )
+        return instance
+
+    instances = {
+        'p1/a': make_instance('p1/a', 'p1', []),
+        'p1/b': make_instance('p1/b', 'p1', []),
+        'p1/c': make_instance('p1/c', 'p1', ['CONFIG_FOO=y']),
+        'p2/a': make_instance('p2/a', 'p2', []),
+    }
+    env_mock = mock.Mock()
+    env_mock.options.extra_args = []
+
+    tr = TwisterRunner(instances, [], env=env_mock)
+    tr.expected_duration = mock.Mock(return_value=0)
+
+    pipeline = queue.Queue()
+    tr.add_tasks_to_queue(pipeline)
+
+    tasks = [pipeline.get_nowait() for _ in range(pipeline.qsize())]
+    assert [(t['op'], t['test'].name, [f.name for f in t.get('followers', [])])
+            for t in tasks] == [
+        ('filter', 'p1/a', ['p1/b']),
+        ('filter', 'p1/c', []),
+        ('filter', 'p2/a', []),
+    ]
+
+
+def test_twisterrunner_load_durations(tmp_path):
+    report = {
+        'testsuites': [
+            {'name': 'suite.a', 'platform': 'p1',
+             'execution_time': '1.50', 'build_time': '20.00'},
+            {'name': 'suite.b', 'platform': 'p1', 'execution_time': '3.00'},
+            {'name': 'suite.c', 'platform': 'p2', 'status': 'filtered'},
+        ]
+    }
+    report_file = tmp_path / 'twister.json'
+    report_file.write_text(json.dumps(report))
+
+    durations = TwisterRunner.load_durations(str(report_file))
+
+    assert durations == {
+        os.path.join('p1', 'suite.a'): (20.0, 1.5),
+        os.path.join('p1', 'suite.b'): (None, 3.0),
+    }
+    assert TwisterRunner.load_durations(str(tmp_path / 'missing.json')) == {}
+
+
+def test_twisterrunner_load_durations_missing(caplog, tmp_path):
+    missing = str(tmp_path / 'missing.json')
+
+    assert TwisterRunner.load_durations(missing) == {}
+    assert 'not found' not in caplog.text
+
+    assert TwisterRunner.load_durations(missing, required=True) == {}
+    assert f'Durations file {missing} not found' in caplog.text
+
+
+def test_twisterrunner_expected_duration(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.c').write_text('x' * 10240)
+
+    def make_instance(name, sysbuild=False, arch='arm', run=False):
+        instance = mock.Mock(run=run)
+        instance.name = name
+        instance.testsuite = mock.Mock(source_dir=str(tmp_path),
+                                       sysbuild=sysbuild, timeout=60)
+        instance.platform = mock.Mock(arch=arch)
+        return instance
+
+    env_mock = mock.Mock()
+    tr = TwisterRunner({}, [], env=env_mock)
+    tr.durations = {'p/recorded': (200.0, 5.0), 'p/run_only': (None, 5.0)}
+
+    base = make_instance('p/unseen')
+    assert tr.expected_duration(make_instance('p/recorded')) == 205.0
+    assert tr.expected_duration(make_instance('p/run_only')) == \
+           tr.expected_duration(base) + 5.0
+    assert tr.expected_duration(base) == pytest.approx(30.5)
+    assert tr.expected_duration(make_instance('p/sysbuild', sysbuild=True)) == \
+           pytest.approx(61)
+    assert tr.expected_duration(make_instance('p/posix', arch='posix')) == \
+           pytest.approx(15.25)
+    assert tr.expected_duration(make_instance('p/run', run=True)) == \
+           pytest.approx(36.5)
+
 
 TESTDATA_19 = [
     ('linux'),
@@ -2626,6 +3056,239 @@ def test_twisterrunner_pipeline_mgr(mocked_jobserver, platform):
         tr.jobserver.get_job.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    'platform',
+    TESTDATA_19,
+)
+def test_twisterrunner_local_pipeline_mgr(platform):
+    def mock_process(pipeline, done, task, lock, results):
+        # Follow-up operations stay on the worker's local queue, the ones of
+        # followers go to the parent
+        if task['op'] == 'filter':
+            pipeline.put({'op': 'cmake', 'test': follower})
+        if task['op'] in ['filter', 'cmake']:
+            pipeline.put({'op': 'report', 'test': task['test']})
+        else:
+            done.put(task['test'].name)
+
+    instances = {'dummy1': mock.Mock(), 'dummy2': mock.Mock(), 'dummy3': mock.Mock()}
+    updated_instance = mock.Mock()
+    follower = mock.Mock()
+    follower.name = 'follower'
+    suites = []
+    env_mock = mock.Mock()
+
+    tr = TwisterRunner(instances, suites, env=env_mock)
+    tr.jobserver = mock.Mock(
+        get_job=mock.Mock(
+            return_value=nullcontext()
+        )
+    )
+
+    tokens = queue.Queue()
+    tokens.put(('dummy1', 'cmake', None, None))
+    tokens.put(('dummy2', 'run', updated_instance, None))
+    tokens.put(('dummy3', 'filter', None, [follower]))
+    tokens.put(None)
+    conn = mock.Mock(recv=tokens.get_nowait)
+
+    with mock.patch('sys.platform', platform), \
+         mock.patch('twisterlib.runner.ProjectBuilder') as pb:
+        pb().process = mock.Mock(side_effect=mock_process)
+        pb.reset_mock()
+        tr.local_pipeline_mgr(conn, mock.Mock(), mock.Mock())
+
+    assert [c.args[0] for c in pb.call_args_list] == \
+           [instances['dummy1'], instances['dummy1'], updated_instance,
+            instances['dummy3'], instances['dummy3']]
+    assert [c.args[2]['op'] for c in pb().process.call_args_list] == \
+           ['cmake', 'report', 'run', 'filter', 'report']
+    assert pb().process.call_args_list[3].args[2]['followers'] == [follower]
+    assert tr.instances['dummy2'] == updated_instance
+    assert tokens.empty()
+    # reported instances and new tokens, each token ends with a None
+    assert [c.args[0] for c in conn.send.call_args_list] == \
+           [instances['dummy1'].name, None, updated_instance.name, None,
+            ('token', ('follower', 'cmake', follower, None)),
+            instances['dummy3'].name, None]
+
+    if platform == 'linux':
+        assert len(tr.jobserver.get_job.call_args_list) == 3
+
+
+class DummyInstance:
+    """A picklable stand-in for TestInstance in the local scheduler tests."""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = None
+        self.reason = None
+        self.retries = 0
+        self.missing_case_status = None
+
+    def add_missing_case_status(self, status, reason=None):
+        self.missing_case_status = (status, reason)
+
+
+class DummyProjectBuilder:
+    """
+    Runs filter, cmake and report operations of DummyInstances in the
+    workers of the local scheduler. The worker working on 'crash' reports
+    its followers and dies, the one working on 'slow' takes a while.
+    """
+
+    reported_out = []
+
+    def __init__(self, instance, env, jobserver):
+        self.instance = instance
+
+    def process(self, pipeline, done, task, lock, results):
+        if task['op'] == 'filter':
+            for follower in task['followers']:
+                if self.instance.name == 'crash':
+                    follower.status = 'passed'
+                    done.put(follower)
+                else:
+                    pipeline.put({'op': 'cmake', 'test': follower})
+        if self.instance.name == 'crash':
+            os._exit(1)
+        if task['op'] == 'filter':
+            pipeline.put({'op': 'cmake', 'test': self.instance})
+        elif task['op'] == 'cmake':
+            if self.instance.name == 'slow':
+                time.sleep(0.5)
+            pipeline.put({'op': 'report', 'test': self.instance})
+        else:
+            self.instance.status = 'passed'
+            self.instance.pid = os.getpid()
+            done.put(self.instance)
+
+    def report_out(self, results):
+        self.reported_out.append(self.instance.name)
+
+
+def execute_local(tr, done):
+    """Run tr.execute() with DummyProjectBuilder, return the reported instances."""
+    with mock.patch('twisterlib.runner.ProjectBuilder', DummyProjectBuilder):
+        tr.execute(None, done)
+    reported = {}
+    while not done.empty():
+        instance = done.get_nowait()
+        reported[instance.name] = instance
+    return reported
+
+
+@pytest.fixture
+def local_runner():
+    instances = {name: DummyInstance(name) for name in ['dummy1', 'dummy2', 'dummy3']}
+    env_mock = mock.Mock()
+
+    def mock_add_tasks_to_queue(pipeline, *args, **kwargs):
+        for name in ['dummy1', 'dummy2', 'dummy3']:
+            pipeline.put({'op': 'cmake', 'test': instances[name]})
+
+    tr = TwisterRunner(instances, [], env=env_mock)
+    tr.options.scheduler = 'local'
+    tr.add_tasks_to_queue = mock.Mock(side_effect=mock_add_tasks_to_queue)
+    tr.jobs = 2
+    tr.jobserver = mock.Mock(get_job=mock.Mock(return_value=nullcontext()))
+    DummyProjectBuilder.reported_out = []
+    yield tr
+    tr.stop_workers()
+
+
+# The workers need the patched ProjectBuilder
+requires_fork = pytest.mark.skipif(
+    multiprocessing.get_start_method() != 'fork',
+    reason='workers are not forked'
+)
+
+
+@requires_fork
+def test_twisterrunner_execute_local(caplog, local_runner):
+    tr = local_runner
+    done = queue.LifoQueue()
+
+    reported = execute_local(tr, done)
+
+    assert sorted(reported) == ['dummy1', 'dummy2', 'dummy3']
+    assert all(instance.status == 'passed' for instance in reported.values())
+    assert 'Launch process 0' in caplog.text
+    assert 'Launch process 1' in caplog.text
+    assert len(tr.workers) == 2
+
+    # Workers are kept, tokens now carry the updated instances
+    caplog.clear()
+    tr.instances['dummy1'].retries = 1
+    reported = execute_local(tr, done)
+
+    assert sorted(reported) == ['dummy1', 'dummy2', 'dummy3']
+    assert reported['dummy1'].retries == 1
+    assert 'Launch process' not in caplog.text
+
+    processes = [worker.process for worker in tr.workers]
+    tr.stop_workers()
+
+    assert not any(process.is_alive() for process in processes)
+    assert tr.workers == []
+
+
+@requires_fork
+def test_twisterrunner_execute_local_dead_worker(caplog, local_runner):
+    tr = local_runner
+    crash = DummyInstance('crash')
+    follower = DummyInstance('follower')
+    tr.instances['crash'] = crash
+    tr.instances['follower'] = follower
+    add_tasks = tr.add_tasks_to_queue.side_effect
+
+    def mock_add_tasks_to_queue(pipeline, *args, **kwargs):
+        add_tasks(pipeline)
+        pipeline.put({'op': 'filter', 'test': crash, 'followers': [follower]})
+
+    tr.add_tasks_to_queue.side_effect = mock_add_tasks_to_queue
+    done = queue.LifoQueue()
+
+    reported = execute_local(tr, done)
+
+    assert re.search('Worker process [01] exited unexpectedly while working on crash',
+                     caplog.text)
+    assert sorted(reported) == ['crash', 'dummy1', 'dummy2', 'dummy3', 'follower']
+    assert reported['crash'].status == 'error'
+    assert reported['crash'].reason == 'Worker process died'
+    assert reported['crash'].missing_case_status == ('blocked', 'Worker process died')
+    assert DummyProjectBuilder.reported_out == ['crash']
+    # the follower was reported before the worker died
+    assert reported['follower'].status == 'passed'
+    assert all(reported[name].status == 'passed'
+               for name in ['dummy1', 'dummy2', 'dummy3'])
+
+    # The dead worker was replaced
+    assert len(tr.workers) == 2
+    assert all(worker.process.is_alive() for worker in tr.workers)
+    assert caplog.text.count('Launch process') == 3
+
+
+@requires_fork
+def test_twisterrunner_execute_local_followers(local_runner):
+    tr = local_runner
+    slow = DummyInstance('slow')
+    followers = [DummyInstance('follower1'), DummyInstance('follower2')]
+    tr.instances['slow'] = slow
+    tr.add_tasks_to_queue.side_effect = lambda pipeline, *args, **kwargs: \
+        pipeline.put({'op': 'filter', 'test': slow, 'followers': followers})
+    done = queue.LifoQueue()
+
+    reported = execute_local(tr, done)
+
+    assert sorted(reported) == ['follower1', 'follower2', 'slow']
+    assert all(instance.status == 'passed' for instance in reported.values())
+    # The followers were built by the other worker while the leader's
+    # worker was busy with its own build
+    assert reported['follower1'].pid == reported['follower2'].pid
+    assert reported['follower1'].pid != reported['slow'].pid
+
+
 def test_twisterrunner_execute(caplog):
     counter = 0
     def mock_join():
@@ -2639,6 +3302,7 @@ def test_twisterrunner_execute(caplog):
     env_mock = mock.Mock()
 
     tr = TwisterRunner(instances, suites, env=env_mock)
+    tr.options.scheduler = 'manager'
     tr.add_tasks_to_queue = mock.Mock()
     tr.jobs = 5
 
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Intel Corporation
+#
+# SPDX-License-Identifier: Apache-2.0
+"""
+Tests for size_calc.py classes' methods
+"""
+
+import os
+import pytest
+import sys
+
+ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
+sys.path.insert(0, os.path.join(ZEPHYR_BASE, "scripts/pylib/twister"))
+
+from twisterlib.size_calc import SHF_ALLOC, SHF_TLS, SizeCalculator
+
+
+SEGMENTS = [
+    {'p_type': 'PT_LOAD', 'p_offset': 0x1000, 'p_vaddr': 0x10000,
+     'p_paddr': 0x10000, 'p_filesz': 0x100, 'p_memsz': 0x100},
+    {'p_type': 'PT_LOAD', 'p_offset': 0x2000, 'p_vaddr': 0x200000,
+     'p_paddr': 0x10100, 'p_filesz': 0x10, 'p_memsz': 0x200},
+    {'p_type': 'PT_TLS', 'p_offset': 0x2010, 'p_vaddr': 0x200010,
+     'p_paddr': 0x10110, 'p_filesz': 0x4, 'p_memsz': 0x8},
+]
+
+TESTDATA_1 = [
+    ('SHT_PROGBITS', SHF_ALLOC, 0x1020, 0x10020, 0x20, 0x10020),
+    ('SHT_PROGBITS', SHF_ALLOC, 0x2000, 0x200000, 0x10, 0x10100),
+    ('SHT_NOBITS', SHF_ALLOC, 0x2010, 0x200040, 0x100, 0x10140),
+    ('SHT_PROGBITS', SHF_ALLOC | SHF_TLS, 0x2010, 0x200010, 0x4, 0x10110),
+    ('SHT_PROGBITS', 0, 0x3000, 0, 0x40, None),
+    ('SHT_NOBITS', SHF_ALLOC, 0x2010, 0x300000, 0x100, None),
+]
+
+
+@pytest.mark.parametrize(
+    'sh_type, sh_flags, sh_offset, sh_addr, sh_size, expected_lma',
+    TESTDATA_1,
+    ids=['text', 'data', 'bss', 'tls', 'not allocated', 'outside segments']
+)
+def test_sizecalculator_get_load_address(
+    sh_type,
+    sh_flags,
+    sh_offset,
+    sh_addr,
+    sh_size,
+    expected_lma
+):
+    sh = {'sh_type': sh_type, 'sh_flags': sh_flags, 'sh_offset': sh_offset,
+          'sh_addr': sh_addr, 'sh_size': sh_size}
+
+    assert SizeCalculator._get_load_address(SEGMENTS, sh) == expected_lma
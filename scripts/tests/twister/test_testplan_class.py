@@ -8,6 +8,8 @@ This test file contains testsuites for Testsuite class of twister
 '''
 import sys
 import os
+import mock
+import json
 import pytest
 
 ZEPHYR_BASE = os.getenv("ZEPHYR_BASE")
@@ -18,6 +20,7 @@ from twisterlib.testinstance import TestInstance
 from twisterlib.testsuite import TestSuite
 from twisterlib.platform import Platform
 from twisterlib.quarantine import Quarantine
+from twisterlib.error import TwisterRuntimeError
 
 
 def test_testplan_add_testsuites(class_testplan):
@@ -48,6 +51,28 @@ def test_testplan_add_testsuites(class_testplan):
     assert suite.name == tests_rel_dir + 'test_a/test_a.check_1'
     assert all(isinstance(n, TestSuite) for n in class_testplan.testsuites.values())
 
+def test_testplan_add_testsuites_parallel(class_testplan, caplog):
+    """ Testing that loading testsuites in worker processes gives the same
+    testsuites and errors, in the same order, as loading them serially """
+    def add_testsuites(plan, jobs):
+        caplog.clear()
+        plan.SAMPLE_FILENAME = 'test_sample_app.yaml'
+        plan.TESTSUITE_FILENAME = 'test_data.yaml'
+        plan.DISCOVERY_SUITES_PER_JOB = 1
+        plan.options.jobs = jobs
+        plan.add_testsuites()
+        suites = [(name, [tc.name for tc in suite.testcases])
+                  for name, suite in plan.testsuites.items()]
+        errors = [r.getMessage() for r in caplog.records if r.levelname == 'ERROR']
+        return suites, errors, plan.load_errors
+
+    serial = add_testsuites(class_testplan, 1)
+    parallel = add_testsuites(TestPlan(class_testplan.env), 2)
+
+    assert serial[0] and serial[1]
+    assert parallel == serial
+
+
 @pytest.mark.parametrize("board_root_dir", [("board_config_file_not_exist"), ("board_config")])
 def test_add_configurations(test_data, class_env, board_root_dir):
     """ Testing add_configurations function of TestPlan class in Twister
@@ -241,6 +266,34 @@ def test_apply_filters_part3(class_testplan, all_testsuites_dict, platforms_list
     filtered_instances = list(filter(lambda item:  item.status == "filtered", class_testplan.instances.values()))
     assert not filtered_instances
 
+def test_apply_filters_integration_error(class_testplan, all_testsuites_dict, platforms_list):
+    """ Testing apply_filters function of TestPlan class in Twister
+    Ensure that instances filtered on their integration platforms are turned
+    into errors and are prepared like the instances which are built
+    """
+    plan = class_testplan
+    plan.platforms = platforms_list
+    plan.platform_names = [p.name for p in platforms_list]
+    plan.testsuites = all_testsuites_dict
+    plan.options.integration = True
+    for testsuite in plan.testsuites.values():
+        testsuite.integration_platforms = ['demo_board_2']
+        testsuite.platform_exclude = ['demo_board_2']
+
+    with mock.patch.object(TestInstance, 'create_overlay', autospec=True) as overlay_mock:
+        plan.apply_filters()
+
+    errors = [i for i in plan.instances.values() if i.status == 'error']
+    assert errors
+    for instance in errors:
+        assert instance.reason == \
+            "In test case platform exclude but is one of the integration platforms"
+        assert instance.run is not None
+        assert all(tc.status == 'error' for tc in instance.testcases)
+    overlay_instances = [c.args[0] for c in overlay_mock.call_args_list]
+    assert all(instance in overlay_instances for instance in errors)
+
+
 def test_add_instances(test_data, class_env, all_testsuites_dict, platforms_list):
     """ Testing add_instances() function of TestPlan class in Twister
     Test 1: instances dictionary keys have expected values (Platform Name + Testcase Name)
@@ -405,3 +458,128 @@ def test_required_snippets_multiple(class_testplan, all_testsuites_dict, platfor
     assert len(filtered_instances) == 2
     for d in filtered_instances:
         assert d.reason == "Snippet not supported"
+
+def test_load_from_file_build_time(class_testplan, all_testsuites_dict, platforms_list, tmp_path):
+    """ Testing load_from_file function of TestPlan class in Twister
+    Ensure that the build time of the loaded instances is restored, so
+    --test-only runs report it instead of 0
+    """
+    plan = class_testplan
+    plan.platforms = platforms_list
+    plan.testsuites = all_testsuites_dict
+    testsuite = next(iter(all_testsuites_dict))
+    report = {
+        'testsuites': [
+            {'name': testsuite, 'platform': 'demo_board_2', 'status': 'passed',
+             'build_time': '12.50', 'execution_time': '1.00'},
+        ]
+    }
+    report_file = tmp_path / 'twister.json'
+    report_file.write_text(json.dumps(report))
+
+    plan.load_from_file(str(report_file))
+
+    instance = plan.instances[os.path.join('demo_board_2', testsuite)]
+    assert instance.build_time == 12.5
+
+
+def test_save_load_plan(class_testplan, all_testsuites_dict, platforms_list, tmp_path):
+    """ Testing save_plan and load_plan functions of TestPlan class in Twister
+    Ensure that a saved plan is restored without discovering and filtering
+    the testsuites again, in the new output directory
+    """
+    plan = class_testplan
+    plan.platforms = platforms_list
+    plan.platform_names = [p.name for p in platforms_list]
+    plan.testsuites = all_testsuites_dict
+    plan.apply_filters()
+    plan_file = tmp_path / 'plan.jsonl'
+    plan.save_plan(str(plan_file))
+
+    header = json.loads(plan_file.read_text().splitlines()[0])
+    assert header['version'] == TestPlan.PLAN_VERSION
+
+    plan.env.outdir = str(tmp_path / 'out')
+    plan.options.load_plan = str(plan_file)
+    loaded = TestPlan(plan.env)
+    with mock.patch.object(loaded, 'add_testsuites') as add_testsuites_mock, \
+         mock.patch.object(loaded, 'apply_filters') as apply_filters_mock:
+        loaded.discover()
+        loaded.load()
+
+    add_testsuites_mock.assert_not_called()
+    apply_filters_mock.assert_not_called()
+    assert [p.name for p in loaded.platforms] == plan.platform_names
+    for platform in loaded.platforms:
+        assert vars(platform) == vars(plan.get_platform(platform.name))
+    assert list(loaded.testsuites) == list(plan.testsuites)
+    for name, testsuite in loaded.testsuites.items():
+        expected = plan.testsuites[name]
+        assert {k: v for k, v in vars(testsuite).items() if k != 'testcases'} == \
+            {k: v for k, v in vars(expected).items() if k != 'testcases'}
+        assert [(tc.name, tc.freeform) for tc in testsuite.testcases] == \
+            [(tc.name, tc.freeform) for tc in expected.testcases]
+    assert loaded.selected_platforms == plan.selected_platforms
+    assert list(loaded.instances) == list(plan.instances)
+    for name, instance in loaded.instances.items():
+        assert instance.status == plan.instances[name].status
+        assert instance.reason == plan.instances[name].reason
+        assert instance.filters == plan.instances[name].filters
+        assert [(tc.name, tc.status) for tc in instance.testcases] == \
+            [(tc.name, tc.status) for tc in plan.instances[name].testcases]
+        assert instance.run_id != plan.instances[name].run_id
+        assert instance.build_dir.startswith(str(tmp_path / 'out'))
+
+
+TESTDATA_PLAN = [
+    ('{"version": 1}\n', 'another version'),
+    ('\x80\x04}q\x00.', "Can't load test plan"),
+    ('{"version": %d, "zephyr_base": "/somewhere/else"}\n' % TestPlan.PLAN_VERSION,
+     'generated for ZEPHYR_BASE'),
+    ('{"version": %d, "zephyr_base": "%s", "default_platforms": []}\n'
+     '{"instance": {"testsuite": "no.such.testsuite", "platform": "demo_board_1"}}\n'
+     % (TestPlan.PLAN_VERSION, ZEPHYR_BASE), 'testsuite no.such.testsuite not found'),
+]
+
+
+@pytest.mark.parametrize(
+    'content, expected_error',
+    TESTDATA_PLAN,
+    ids=['old version', 'pickle', 'other zephyr base', 'unknown testsuite']
+)
+def test_load_plan_errors(class_testplan, tmp_path, content, expected_error):
+    """ Testing load_plan function of TestPlan class in Twister
+    Ensure that unusable plans are rejected
+    """
+    plan_file = tmp_path / 'plan.jsonl'
+    plan_file.write_text(content)
+
+    with pytest.raises(TwisterRuntimeError, match=expected_error):
+        class_testplan.load_plan(str(plan_file))
+
+
+def test_generate_balanced_subset(class_testplan):
+    """ Testing generate_balanced_subset function of TestPlan class in Twister
+    Ensure that the subsets are disjoint, cover all instances and have
+    the same expected duration
+    """
+    durations = [100, 90, 60, 50, 40, 30, 20, 10, 5, 5]
+    instances = {}
+    for name, status in [(f'p/{i}', None) for i in range(len(durations))] + \
+                        [('p/skipped', 'skipped')]:
+        instances[name] = mock.Mock(status=status)
+        instances[name].name = name
+    class_testplan.durations = {name: (d, 0) for name, d in zip(instances, durations)}
+
+    subsets = []
+    for subset in range(1, 4):
+        class_testplan.instances = dict(instances)
+        class_testplan.generate_balanced_subset(subset, 3)
+        subsets.append(list(class_testplan.instances))
+
+    # 140s, 135s and 135s
+    assert subsets == [
+        ['p/0', 'p/5', 'p/7', 'p/skipped'],
+        ['p/1', 'p/4', 'p/8'],
+        ['p/2', 'p/3', 'p/6', 'p/9'],
+    ]
@@ -426,86 +426,32 @@ def test_get_search_area_boundary(
     assert result == expected
 
 
-TESTDATA_7 = [
-    (True, [os.path.join('', 'home', 'user', 'dummy_path', 'dummy.c'),
-            os.path.join('', 'home', 'user', 'dummy_path', 'dummy.cpp')]),
-    (False, [])
-]
-
-@pytest.mark.parametrize(
-    'isdir, expected',
-    TESTDATA_7,
-    ids=['valid', 'not a directory']
-)
-def test_find_c_files_in(isdir, expected):
-    old_dir = os.path.join('', 'home', 'user', 'dummy_base_dir')
-    new_path = os.path.join('', 'home', 'user', 'dummy_path')
-    cur_dir = old_dir
-
-    def mock_chdir(path, *args, **kwargs):
-        nonlocal cur_dir
-        cur_dir = path
-
+def test_find_c_files_in(tmp_path):
     # We simulate such a structure:
-    # <new_path>
+    # <tmp_path>
     # ┣ dummy.c
     # ┣ wrong_dummy.h
+    # ┣ .hidden.c
     # ┗ dummy_dir
     #   ┣ dummy.cpp
-    #   ┗ wrong_dummy.hpp
-    # <old_dir>
-    # ┗ wrong_dummy.c
-    new_path_base = ['dummy.c', 'wrong_dummy.h']
-    new_path_subs = ['dummy.cpp', 'wrong_dummy.hpp']
-    old_dir_base = ['wrong_dummy.c']
-
-    def format_tester(fmt):
-        formats = [
-            {'name': 'subdirs', 'fmt': '**/*.'},
-            {'name': 'base', 'fmt': '*.'}
-        ]
-
-        for format in formats:
-            if fmt.startswith(format['fmt']):
-                return format['name'], fmt[len(format['fmt']):]
-
-        raise ValueError('This test wasn\'t designed for those globs.'
-                         ' Please fix the test before PR!')
-
-    def mock_glob(fmt, *args, **kwargs):
-        from_where, extension = format_tester(fmt)
-
-        if cur_dir == old_dir:
-            if from_where == 'subdirs':
-                return []
-            elif from_where == 'base':
-                return list(filter(lambda fn: fn.endswith(extension),
-                                   old_dir_base))
-            else:
-                return []
-        if cur_dir == new_path:
-            if from_where == 'subdirs':
-                return list(filter(lambda fn: fn.endswith(extension),
-                                   new_path_subs))
-            elif from_where == 'base':
-                return list(filter(lambda fn: fn.endswith(extension),
-                                   new_path_base))
-            else:
-                return []
-
-        raise ValueError('This test wasn\'t designed for those dirs.'
-                         'Please fix the test before PR!')
-
-    with mock.patch('os.path.isdir', return_value=isdir), \
-         mock.patch('os.getcwd', return_value=cur_dir), \
-         mock.patch('glob.glob', mock_glob), \
-         mock.patch('os.chdir', side_effect=mock_chdir) as chdir_mock:
-        filenames = find_c_files_in(new_path)
-
-    assert sorted(filenames) == sorted(expected)
-
-    assert chdir_mock.call_args is None or \
-           chdir_mock.call_args == mock.call(old_dir)
+    #   ┣ wrong_dummy.hpp
+    #   ┗ nested_dir
+    #     ┗ too_deep.c
+    (tmp_path / 'dummy.c').write_text('')
+    (tmp_path / 'wrong_dummy.h').write_text('')
+    (tmp_path / '.hidden.c').write_text('')
+    (tmp_path / 'dummy_dir' / 'nested_dir').mkdir(parents=True)
+    (tmp_path / 'dummy_dir' / 'dummy.cpp').write_text('')
+    (tmp_path / 'dummy_dir' / 'wrong_dummy.hpp').write_text('')
+    (tmp_path / 'dummy_dir' / 'nested_dir' / 'too_deep.c').write_text('')
+
+    filenames = find_c_files_in(str(tmp_path))
+
+    assert sorted(filenames) == sorted([
+        os.path.join(str(tmp_path), 'dummy.c'),
+        os.path.join(str(tmp_path), 'dummy_dir', 'dummy.cpp'),
+    ])
+    assert find_c_files_in(str(tmp_path / 'dummy.c')) == []
 
 
 TESTDATA_8 = [